@@ -1 +1,91 @@
-"""Python package marker for application modules."""
\ No newline at end of file
+"""
+应用工厂
+
+create_app 只负责组装 Flask 应用（配置、扩展、蓝图、命令），不做任何数据库操作。
+建表与初始化管理员账号通过 `flask init-db` / `flask seed-admin` 显式执行。
+"""
+
+import os
+import time
+
+
+def create_app(config=None):
+    """
+    创建 Flask 应用实例
+
+    Args:
+        config: 配置类或配置名称（development / testing / production），
+            为None时读取环境变量 APP_ENV，默认 development
+
+    Returns:
+        Flask: 应用实例
+    """
+    started = time.perf_counter()
+
+    from flask import Flask, jsonify
+    from flask_cors import CORS
+    from flask_migrate import Migrate
+    from flask_jwt_extended import JWTManager
+    from config import config_by_name
+    from app.model import db, init_engine
+    from app.utils.password_hasher import password_hasher
+    from app.service.user_service import user_service
+    from app.service.search_service import user_search_index
+    from app.service.activity_service import login_activity
+    from app.service.token_service import token_revocation
+    from app.service.feed_service import feed_cache
+    from app.service.avatar_service import avatar_service
+    from app.utils.rate_limit import rate_limiter
+    from app.utils.compression import compression
+    from app.utils.metrics import request_metrics
+    from app.utils.query_audit import query_auditor
+    from app.cli import register_commands
+    from app.utils.json_provider import FastJSONProvider
+
+    if config is None:
+        config = os.getenv("APP_ENV", "development")
+    if isinstance(config, str):
+        config = config_by_name[config]
+
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.json = FastJSONProvider(app)
+    JWTManager(app)
+    # 只有 /api 下的接口允许跨域访问，/metrics 等运维接口不返回 CORS 头
+    CORS(app, resources={r"/api/*": {}})
+    init_engine(app)
+    # 迁移目录使用绝对路径，flask 命令不必在 backend 目录下执行
+    Migrate(app, db, directory=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations"),
+            render_as_batch=True)
+    password_hasher.init_app(app)
+    user_service.init_app(app)
+    user_search_index.init_app(app)
+    login_activity.init_app(app)
+    token_revocation.init_app(app)
+    feed_cache.init_app(app)
+    avatar_service.init_app(app)
+    rate_limiter.init_app(app)
+    compression.init_app(app)
+    request_metrics.init_app(app)
+    query_auditor.init_app(app)
+    register_commands(app)
+
+    # 注册蓝图（在工厂内导入，避免导入 app 包时加载全部路由）
+    from app.api.user import bp as user_bp
+    from app.api.auth import bp as auth_bp
+    from app.api.post import bp as post_bp
+    from app.api.avatar import bp as avatar_bp
+
+    app.register_blueprint(user_bp)
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(post_bp)
+    app.register_blueprint(avatar_bp)
+
+    @app.get("/api/hello")
+    def hello():
+        return jsonify({"message": "Hello, World!"})
+
+    startup_ms = (time.perf_counter() - started) * 1000
+    app.extensions["startup_ms"] = startup_ms
+    app.logger.info("Application created in %.1f ms", startup_ms)
+    return app
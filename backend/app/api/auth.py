@@ -5,7 +5,7 @@
 严格遵循路由层和服务层分离的设计原则。
 """
 
-from flask import Blueprint, request, make_response
+from flask import Blueprint, request, make_response, current_app
 from datetime import datetime, UTC
 from flask_jwt_extended import (
     create_access_token,
@@ -15,6 +15,7 @@ from flask_jwt_extended import (
 )
 from app.service.auth_service import auth_service
 from app.utils.responses import success, fail
+from app.utils.rate_limit import rate_limiter, throttled
 from app.exception.api_exception import ApiException
 
 # 创建认证路由蓝图
@@ -37,7 +38,35 @@ def get_session_token():
     return request.cookies.get('session_token')
 
 
+def get_refresh_token():
+    """
+    从请求中获取刷新令牌
+    
+    依次从请求体 refresh_token 字段、refresh_token Cookie、Authorization 头中获取
+    
+    Returns:
+        str: 刷新令牌，如果不存在则返回None
+    """
+    data = request.get_json(silent=True) or {}
+    if data.get('refresh_token'):
+        return data['refresh_token']
+    if request.cookies.get('refresh_token'):
+        return request.cookies.get('refresh_token')
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        return auth_header[7:]
+    return None
+
+
+def set_refresh_cookie(response, refresh_token):
+    """将刷新令牌写入仅认证接口可见的 HttpOnly Cookie"""
+    max_age = int(current_app.config['JWT_REFRESH_TOKEN_EXPIRES'].total_seconds())
+    response.set_cookie('refresh_token', refresh_token, max_age=max_age, httponly=True,
+                        secure=False, samesite='Lax', path='/api/auth')
+
+
 @bp.route("/register", methods=["POST"])
+@rate_limiter.limit("RATE_LIMIT_REGISTER_PER_IP")
 def register():
     """
     用户注册接口
@@ -108,12 +137,17 @@ def register():
 
 
 @bp.route("/login", methods=["POST"])
+@rate_limiter.limit("RATE_LIMIT_LOGIN_PER_IP")
 def login():
     """
     用户登录接口
     
     POST /api/auth/login
     
+    username 字段可以填写用户名或邮箱，均不区分大小写。
+    按IP限流（RATE_LIMIT_LOGIN_PER_IP），并按解析出的账号限流（RATE_LIMIT_LOGIN_PER_ACCOUNT），
+    同一账号用用户名和邮箱登录共用一个计数
+    
     Headers:
         Content-Type: application/json
         
@@ -142,6 +176,7 @@ def login():
             "message": "success",
             "data": {
                 "token": "abc123...",
+                "refresh_token": "def456...",
                 "user": {
                     "id": 1,
                     "username": "admin",
@@ -168,11 +203,15 @@ def login():
         login_result = auth_service.login_user(username, password)
         access_token = create_access_token(identity=str(login_result['user']['id']))
         login_result['token'] = access_token
+        login_result['refresh_token'] = auth_service.issue_refresh_token(login_result['user']['id'])
         response = make_response(success(login_result, "登录成功"))
         response.set_cookie('session_token', access_token, max_age=7*24*60*60, httponly=True, secure=False, samesite='Lax')
+        set_refresh_cookie(response, login_result['refresh_token'])
         return response
         
     except ApiException as e:
+        if e.code == 429:
+            return throttled(e.data['retry_after'])
         return fail(e.code, e.message, e.data if hasattr(e, 'data') else None)
     except Exception as e:
         return fail(500, f"服务器内部错误: {str(e)}")
@@ -210,8 +249,8 @@ def logout():
         if not session_token:
             return fail(401, "未提供会话令牌")
         
-        # 调用服务层进行用户登出
-        logout_success = auth_service.logout_user(session_token)
+        # 调用服务层进行用户登出，同时吊销刷新令牌家族
+        logout_success = auth_service.logout_user(session_token, request.cookies.get('refresh_token'))
         
         if not logout_success:
             return fail(400, "登出失败，会话可能已失效")
@@ -219,6 +258,7 @@ def logout():
         # 创建响应并清除Cookie
         response = make_response(success({"logged_out": True}, "登出成功"))
         response.set_cookie('session_token', '', expires=0)
+        response.set_cookie('refresh_token', '', expires=0, path='/api/auth')
         
         return response
         
@@ -316,22 +356,30 @@ def check_status():
 
 
 @bp.route("/refresh", methods=["POST"])
-@jwt_required()
 def refresh_session():
     """
     刷新会话接口
     
     POST /api/auth/refresh
     
+    使用刷新令牌换取新的访问令牌，访问令牌已过期时同样可用。每次刷新都会轮换
+    刷新令牌，旧刷新令牌立即失效；重复使用旧令牌会吊销该登录下的全部刷新令牌。
+    
     Headers:
-        Authorization: Bearer {session_token}
+        Cookie: refresh_token={refresh_token}
+        或 Authorization: Bearer {refresh_token}
+        
+    Body (可选):
+        {
+            "refresh_token": "def456..."
+        }
         
     Returns:
         JSON: 刷新结果响应
         
     Example:
         POST /api/auth/refresh
-        Headers: Authorization: Bearer abc123...
+        Cookie: refresh_token=def456...
         
         Response:
         {
@@ -339,24 +387,22 @@ def refresh_session():
             "message": "success",
             "data": {
                 "token": "abc123...",
+                "refresh_token": "ghi789...",
                 "expires_at": "2024-01-22T10:30:00",
                 "refreshed_at": "2024-01-15T12:00:00"
             }
         }
     """
     try:
-        user_id = get_jwt_identity()
-        if not user_id:
-            return fail(401, "未认证")
-        new_token = create_access_token(identity=str(user_id))
-        jwt_payload = get_jwt()
-        exp = jwt_payload.get('exp')
-        response = make_response(success({
-            'token': new_token,
-            'expires_at': datetime.fromtimestamp(exp, tz=UTC).isoformat() if exp else None,
-            'refreshed_at': datetime.now(UTC).isoformat()
-        }, "会话刷新成功"))
-        response.set_cookie('session_token', new_token, max_age=7*24*60*60, httponly=True, secure=False, samesite='Lax')
+        refresh_token = get_refresh_token()
+        if not refresh_token:
+            return fail(401, "未提供刷新令牌")
+        result = auth_service.refresh_session(refresh_token)
+        if not result:
+            return fail(401, "刷新令牌无效或已过期")
+        response = make_response(success(result, "会话刷新成功"))
+        response.set_cookie('session_token', result['token'], max_age=7*24*60*60, httponly=True, secure=False, samesite='Lax')
+        set_refresh_cookie(response, result['refresh_token'])
         return response
         
     except ApiException as e:
@@ -0,0 +1,118 @@
+"""
+头像API路由层
+
+负责头像上传与头像文件的访问。
+严格遵循路由层和服务层分离的设计原则。
+"""
+
+import os
+from flask import Blueprint, request, send_file
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from werkzeug.exceptions import RequestEntityTooLarge
+from app.service.avatar_service import avatar_service
+from app.service.user_service import user_service
+from app.utils.responses import success, fail
+from app.exception.api_exception import ApiException
+
+# 创建头像路由蓝图
+bp = Blueprint("avatar", __name__, url_prefix="/api/avatars")
+
+# 内容寻址的文件永不变化，允许任何缓存保存一年且无需回源验证
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+@bp.post("/")
+@jwt_required()
+def upload_avatar():
+    """
+    上传头像接口
+    
+    POST /api/avatars/
+    
+    请求体为图片本身（Content-Type: image/png 等），或 multipart/form-data 中名为
+    avatar 的文件字段。上传成功后用户头像更新为默认尺寸的缩略图。
+    
+    Headers:
+        Authorization: Bearer {session_token}
+        
+    Returns:
+        JSON: 头像地址响应
+        
+    Example:
+        POST /api/avatars/
+        Content-Type: image/png
+        
+        Response:
+        {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "digest": "9f86d0...",
+                "original": "/api/avatars/9f86d0....png",
+                "thumbnails": {
+                    "64": "/api/avatars/9f86d0..._64.png",
+                    "128": "/api/avatars/9f86d0..._128.png",
+                    "256": "/api/avatars/9f86d0..._256.png"
+                },
+                "avatar": "/api/avatars/9f86d0..._128.png"
+            }
+        }
+    """
+    try:
+        user_id = get_jwt_identity()
+        if not user_id:
+            return fail(401, "未认证")
+        current_user = user_service.get_user_by_id(int(user_id))
+        if not current_user:
+            return fail(401, "用户不存在或会话无效")
+        
+        # 先按声明长度拒绝过大的请求，并限制本次请求可读取的字节数（也覆盖分块传输），
+        # 避免 werkzeug 把超大的 multipart 请求体完整写入临时文件后才检查
+        multipart = request.mimetype == "multipart/form-data"
+        request.max_content_length = avatar_service.upload_limit(request.content_length, multipart)
+        if multipart:
+            upload = request.files.get("avatar")
+            if upload is None:
+                return fail(400, "缺少头像文件")
+            result = avatar_service.save_upload(upload.stream)
+        else:
+            # 直接读取请求体流，不经过 request.data 整体缓冲
+            result = avatar_service.save_upload(request.stream, request.content_length)
+        
+        user_service.update_user_info(current_user['id'], {'avatar': result['avatar']})
+        return success(result, "头像上传成功")
+        
+    except RequestEntityTooLarge:
+        e = avatar_service.oversize_error()
+        return fail(e.code, e.message)
+    except ApiException as e:
+        return fail(e.code, e.message, e.data if hasattr(e, 'data') else None)
+    except Exception as e:
+        return fail(500, f"服务器内部错误: {str(e)}")
+
+
+@bp.get("/<name>")
+def get_avatar(name):
+    """
+    获取头像文件接口
+    
+    GET /api/avatars/{sha256}.{ext}
+    GET /api/avatars/{sha256}_{size}.{ext}
+    
+    Args:
+        name (str): 头像文件名
+        
+    Returns:
+        Response: 图片文件，带长期不可变缓存头
+    """
+    path = avatar_service.resolve(name)
+    if path is None:
+        return fail(404, "头像不存在")
+    response = send_file(path, conditional=True, max_age=IMMUTABLE_MAX_AGE)
+    if os.path.basename(path) == name:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    else:
+        # 缩略图暂不可用时回退为原图，不能让这个URL被长期缓存
+        response.cache_control.max_age = 60
+    return response
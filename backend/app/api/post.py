@@ -1,9 +1,140 @@
-from flask import Blueprint
-from app.utils import success
+"""
+帖子API路由层
 
+负责处理帖子相关的HTTP请求，包括信息流、帖子详情与发帖。
+严格遵循路由层和服务层分离的设计原则。
+"""
+
+from flask import Blueprint, request
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.service.post_service import post_service
+from app.service.user_service import user_service
+from app.utils.responses import success, fail
+from app.exception.api_exception import ApiException
+
+# 创建帖子路由蓝图
 bp = Blueprint("post", __name__, url_prefix="/api/posts")
 
 
 @bp.get("/")
 def list_posts():
-    return success({"items": []})
\ No newline at end of file
+    """
+    获取帖子信息流接口
+    
+    GET /api/posts/?per_page=20&cursor=...&author_id=1
+    
+    Query Parameters:
+        cursor (str, optional): 分页游标，首页不传，之后回传 next_cursor
+        per_page (int, optional): 每页数量，默认为20，最大100
+        author_id (int, optional): 只看指定作者的帖子
+        
+    Headers (可选):
+        If-None-Match: 上次响应的 ETag，该页内容未变化时返回空的 304
+        
+    Returns:
+        JSON: 帖子列表响应
+        
+    Example:
+        GET /api/posts/?per_page=20
+        
+        Response:
+        {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "posts": [
+                    {
+                        "id": 42,
+                        "author_id": 1,
+                        "content": "Hello",
+                        "created_at": "2024-01-15T10:30:00",
+                        "author": {"id": 1, "username": "admin", ...}
+                    }
+                ],
+                "pagination": {
+                    "per_page": 20,
+                    "has_more": true,
+                    "next_cursor": "eyJ0IjoiMjAyNC0wMS0xNVQxMDozMDowMCIsImlkIjo0Mn0"
+                }
+            }
+        }
+    """
+    try:
+        cursor = request.args.get('cursor', None)
+        per_page = request.args.get('per_page', 20, type=int)
+        author_id = request.args.get('author_id', None, type=int)
+        if per_page < 1 or per_page > 100:
+            per_page = 20
+        
+        posts_data = post_service.list_posts(cursor, per_page, author_id)
+        return success(posts_data, "获取帖子列表成功", etag=post_service.page_etag(posts_data))
+        
+    except ApiException as e:
+        return fail(e.code, e.message, e.data if hasattr(e, 'data') else None)
+    except Exception as e:
+        return fail(500, f"服务器内部错误: {str(e)}")
+
+
+@bp.get("/<int:post_id>")
+def get_post(post_id):
+    """
+    获取帖子详情接口
+    
+    GET /api/posts/{post_id}
+    
+    Args:
+        post_id (int): 帖子ID
+        
+    Returns:
+        JSON: 帖子信息响应
+    """
+    try:
+        post = post_service.get_post(post_id)
+        if not post:
+            return fail(404, "帖子不存在")
+        return success(post, "获取帖子成功")
+        
+    except ApiException as e:
+        return fail(e.code, e.message, e.data if hasattr(e, 'data') else None)
+    except Exception as e:
+        return fail(500, f"服务器内部错误: {str(e)}")
+
+
+@bp.post("/")
+@jwt_required()
+def create_post():
+    """
+    发布帖子接口
+    
+    POST /api/posts/
+    
+    Headers:
+        Authorization: Bearer {session_token}
+        
+    Body:
+        {
+            "content": "Hello"
+        }
+        
+    Returns:
+        JSON: 新帖子信息响应
+    """
+    try:
+        user_id = get_jwt_identity()
+        if not user_id:
+            return fail(401, "未认证")
+        current_user = user_service.get_user_by_id(int(user_id))
+        if not current_user:
+            return fail(401, "用户不存在或会话无效")
+        
+        data = request.get_json(silent=True)
+        if not data:
+            return fail(400, "请求数据不能为空")
+        
+        post = post_service.create_post(current_user['id'], data.get('content'))
+        return success(post, "发布成功")
+        
+    except ApiException as e:
+        return fail(e.code, e.message, e.data if hasattr(e, 'data') else None)
+    except Exception as e:
+        return fail(500, f"服务器内部错误: {str(e)}")
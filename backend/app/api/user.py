@@ -9,7 +9,8 @@ from flask import Blueprint, request, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.service.user_service import user_service
 from app.service.auth_service import auth_service
-from app.utils.responses import success, fail
+from app.utils.responses import success, fail, is_not_modified, not_modified
+from app.utils.cursor import encode_cursor
 from app.exception.api_exception import ApiException
 
 # 创建用户路由蓝图
@@ -42,6 +43,9 @@ def get_user_info(user_id):
     Args:
         user_id (int): 用户ID
         
+    Headers (可选):
+        If-None-Match: 上次响应的 ETag，未变化时返回空的 304
+        
     Returns:
         JSON: 用户信息响应
         
@@ -63,13 +67,21 @@ def get_user_info(user_id):
         }
     """
     try:
+        # 先按版本戳判断客户端缓存是否有效，有效时不加载用户数据
+        version = user_service.get_user_version(user_id)
+        if not version:
+            return fail(404, "用户不存在")
+        etag, last_modified = version
+        if is_not_modified(etag, last_modified):
+            return not_modified(etag, last_modified)
+        
         # 获取用户公开信息
         user_info = user_service.get_user_public_info(user_id)
         
         if not user_info:
             return fail(404, "用户不存在")
         
-        return success(user_info, "获取用户信息成功")
+        return success(user_info, "获取用户信息成功", etag=etag, last_modified=last_modified)
         
     except ApiException as e:
         return fail(e.code, e.message, e.data if hasattr(e, 'data') else None)
@@ -119,7 +131,7 @@ def get_user_session():
         user_id = get_jwt_identity()
         if not user_id:
             return fail(401, "未认证")
-        current_user = user_service.get_user_by_id(user_id)
+        current_user = user_service.get_user_by_id(int(user_id))
         if not current_user:
             return fail(401, "用户不存在或会话无效")
         return success({
@@ -149,6 +161,7 @@ def get_user_detailed_info():
     
     Headers:
         Authorization: Bearer {session_token}
+        If-None-Match (可选): 上次响应的 ETag，未变化时返回空的 304
         
     Returns:
         JSON: 用户详细信息响应
@@ -180,10 +193,17 @@ def get_user_detailed_info():
         user_id = get_jwt_identity()
         if not user_id:
             return fail(401, "未认证")
+        user_id = int(user_id)
+        version = user_service.get_user_version(user_id)
+        if not version:
+            return fail(401, "用户不存在或会话无效")
+        etag, last_modified = version
+        if is_not_modified(etag, last_modified):
+            return not_modified(etag, last_modified)
         user_info = user_service.get_user_by_id(user_id)
         if not user_info:
             return fail(401, "用户不存在或会话无效")
-        return success(user_info, "获取用户详细信息成功")
+        return success(user_info, "获取用户详细信息成功", etag=etag, last_modified=last_modified)
         
     except ApiException as e:
         return fail(e.code, e.message, e.data if hasattr(e, 'data') else None)
@@ -242,7 +262,7 @@ def update_user_profile():
         user_id = get_jwt_identity()
         if not user_id:
             return fail(401, "未认证")
-        current_user = user_service.get_user_by_id(user_id)
+        current_user = user_service.get_user_by_id(int(user_id))
         if not current_user:
             return fail(401, "用户不存在或会话无效")
         
@@ -269,6 +289,8 @@ def get_users_list():
     获取用户列表接口（管理员功能）
     
     GET /api/user/list?page=1&per_page=10&search=keyword
+    GET /api/user/list?cursor=&per_page=10&count=cached
+    GET /api/user/list?is_active=0&sort=last_login_at
     
     Headers:
         Authorization: Bearer {session_token}
@@ -276,7 +298,14 @@ def get_users_list():
     Query Parameters:
         page (int, optional): 页码，默认为1
         per_page (int, optional): 每页数量，默认为10
-        search (str, optional): 搜索关键词
+        search (str, optional): 搜索关键词，以 * 结尾表示前缀匹配
+        cursor (str, optional): 键集分页游标，传空值获取第一页，之后回传 next_cursor
+        after_id (int, optional): 键集分页起点，返回ID大于该值的用户
+        count (str, optional): 计数模式 exact / cached / estimate / none
+        sort (str, optional): 排序方式 id / relevance（按搜索相关度）/ created_at（注册时间倒序）/
+            last_login_at（最近登录倒序），除 id 外只能用于偏移分页
+        is_active (int, optional): 按激活状态筛选，1 / 0
+        permission (int, optional): 按权限等级筛选
         
     Returns:
         JSON: 用户列表响应
@@ -299,12 +328,27 @@ def get_users_list():
                 }
             }
         }
+        
+        键集分页响应:
+        {
+            "code": 200,
+            "message": "success",
+            "data": {
+                "users": [...],
+                "pagination": {
+                    "per_page": 10,
+                    "total": null,
+                    "has_more": true,
+                    "next_cursor": "eyJpZCI6MTB9"
+                }
+            }
+        }
     """
     try:
         user_id = get_jwt_identity()
         if not user_id:
             return fail(401, "未认证")
-        current_user = user_service.get_user_by_id(user_id)
+        current_user = user_service.get_user_by_id(int(user_id))
         if not current_user:
             return fail(401, "用户不存在或会话无效")
         
@@ -316,6 +360,16 @@ def get_users_list():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         search = request.args.get('search', None)
+        cursor = request.args.get('cursor', None)
+        after_id = request.args.get('after_id', None, type=int)
+        count = request.args.get('count', None)
+        sort = request.args.get('sort', 'id')
+        is_active = request.args.get('is_active', None)
+        permission = request.args.get('permission', None, type=int)
+        if is_active is not None:
+            is_active = is_active.lower() in ('1', 'true')
+        if cursor is None and after_id is not None:
+            cursor = encode_cursor({'id': max(after_id, 0)})
         
         # 参数验证
         if page < 1:
@@ -324,7 +378,8 @@ def get_users_list():
             per_page = 10
         
         # 获取用户列表
-        users_data = user_service.get_users_list(page, per_page, search)
+        users_data = user_service.get_users_list(page, per_page, search, cursor=cursor, count=count, sort=sort,
+                                                 is_active=is_active, permission=permission)
         
         return success(users_data, "获取用户列表成功")
         
@@ -0,0 +1,185 @@
+"""
+命令行工具
+
+通过 Flask CLI 注册的运维命令：
+- flask init-db          按迁移历史升级数据库结构并创建搜索索引
+- flask seed-admin       创建默认管理员账号
+- flask search rebuild   重建用户搜索索引
+- flask tokens sweep     清理已过期的令牌吊销记录与刷新令牌会话
+- flask static compress  预先生成静态文件的压缩缓存
+- flask users import     从 CSV / JSONL 批量导入用户
+- flask users export     流式导出用户到 CSV / JSONL
+- flask schema check-plans  检查关键查询的执行计划是否使用预期索引
+"""
+
+import os
+from datetime import datetime, UTC
+import click
+from flask.cli import AppGroup, with_appcontext
+from flask_migrate import upgrade
+from app.model import db
+from app.model.user import User
+from app.model.session import UserSession
+from app.service.search_service import user_search_index
+from app.service.token_service import token_revocation
+from app.service.bulk_user_service import bulk_user_service, read_rows
+from app.utils.compression import compression
+from app.utils.password_hasher import password_hasher
+from app.utils.query_plans import check_query_plans
+
+search_cli = AppGroup("search", help="用户搜索索引管理")
+tokens_cli = AppGroup("tokens", help="令牌吊销记录管理")
+static_cli = AppGroup("static", help="静态文件管理")
+users_cli = AppGroup("users", help="用户批量导入导出")
+schema_cli = AppGroup("schema", help="数据库结构检查")
+
+
+def _detect_format(path: str, fmt: str) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def create_schema() -> None:
+    """按模型直接创建全部数据表及搜索索引（幂等，用于测试与基准，部署使用 migrate_schema）"""
+    db.create_all()
+    user_search_index.ensure_schema()
+
+
+def migrate_schema() -> None:
+    """按迁移历史升级到最新版本并创建搜索索引（幂等）"""
+    upgrade()
+    user_search_index.ensure_schema()
+
+
+def seed_admin(username: str = "admin", password: str = "admin123",
+               email: str = "admin@jufirex.com") -> bool:
+    """
+    创建默认管理员账号
+
+    Args:
+        username (str): 管理员用户名
+        password (str): 管理员密码
+        email (str): 管理员邮箱
+
+    Returns:
+        bool: 是否新建了账号（已存在时返回False）
+    """
+    if User.query.filter_by(username=username).first():
+        return False
+    admin = User(
+        username=username,
+        nickname="Administrator",
+        email=email,
+        password=password_hasher.hash(password),
+        avatar="/static/avatars/admin.jpg",
+        permission=3,
+        is_active=True,
+        is_verified=True
+    )
+    db.session.add(admin)
+    db.session.commit()
+    return True
+
+
+@click.command("init-db")
+@with_appcontext
+def init_db_command():
+    """按迁移历史升级数据库结构并创建搜索索引"""
+    migrate_schema()
+    click.echo("数据库结构已升级到最新版本")
+
+
+@click.command("seed-admin")
+@with_appcontext
+@click.option("--username", default="admin", show_default=True, help="管理员用户名")
+@click.option("--email", default="admin@jufirex.com", show_default=True, help="管理员邮箱")
+def seed_admin_command(username, email):
+    """创建默认管理员账号（密码取自环境变量 ADMIN_PASSWORD）"""
+    created = seed_admin(username, os.getenv("ADMIN_PASSWORD", "admin123"), email)
+    click.echo("管理员账号已创建" if created else "管理员账号已存在，跳过")
+
+
+@search_cli.command("rebuild")
+def rebuild_search_index():
+    """根据现有用户数据重建搜索索引"""
+    if not user_search_index.ensure_schema():
+        raise click.ClickException("当前数据库不支持索引搜索，将继续使用 LIKE 查询")
+    user_search_index.rebuild()
+    click.echo(f"搜索索引已重建（后端: {user_search_index.backend}）")
+
+
+@tokens_cli.command("sweep")
+def sweep_revoked_tokens():
+    """清理已过期的令牌吊销记录与刷新令牌会话"""
+    deleted = token_revocation.sweep()
+    sessions = UserSession.query.filter(UserSession.expires_at < datetime.now(UTC)).delete()
+    db.session.commit()
+    click.echo(f"已清理 {deleted} 条过期吊销记录、{sessions} 条过期会话")
+
+
+@static_cli.command("compress")
+def compress_static_files():
+    """预先压缩 static 目录下的文件并写入磁盘缓存"""
+    count = compression.precompress_static()
+    click.echo(f"已生成 {count} 个静态文件的压缩缓存")
+
+
+@users_cli.command("import")
+@click.argument("path", type=click.Path(allow_dash=True))
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="文件格式，默认按扩展名判断")
+@click.option("--batch-size", default=1000, show_default=True, help="每批写入的用户数")
+@click.option("--workers", default=os.cpu_count() or 1, show_default=True, help="密码哈希进程数，0 表示不用进程池")
+@click.option("--dry-run", is_flag=True, help="只校验不写入")
+def import_users(path, fmt, batch_size, workers, dry_run):
+    """从 CSV / JSONL 文件批量导入用户（PATH 为 - 时读取标准输入）"""
+    fmt = _detect_format(path, fmt)
+    with click.open_file(path, "r", encoding="utf-8") as stream:
+        report = bulk_user_service.import_users(read_rows(stream, fmt), batch_size, workers, dry_run)
+    for line_no, errors in report.errors[:50]:
+        click.echo(f"第 {line_no} 行: " + "; ".join(f"{key}: {value}" for key, value in errors.items()), err=True)
+    if len(report.errors) > 50:
+        click.echo(f"... 其余 {len(report.errors) - 50} 行错误未显示", err=True)
+    prefix = "校验通过" if dry_run else "已导入"
+    click.echo(f"{prefix} {report.imported} 个用户，跳过重复 {report.skipped} 个，失败 {len(report.errors)} 个")
+
+
+@users_cli.command("export")
+@click.argument("path", type=click.Path(allow_dash=True), default="-")
+@click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="文件格式，默认按扩展名判断")
+@click.option("--with-password-hash", is_flag=True, help="导出密码哈希（用于迁移到其他实例）")
+@click.option("--batch-size", default=1000, show_default=True, help="每次查询的用户数")
+def export_users(path, fmt, with_password_hash, batch_size):
+    """流式导出用户（PATH 默认为标准输出）"""
+    fmt = _detect_format(path, fmt)
+    with click.open_file(path, "w", encoding="utf-8") as out:
+        count = bulk_user_service.export_users(out, fmt, with_password_hash, batch_size)
+    click.echo(f"已导出 {count} 个用户", err=path == "-")
+
+
+@schema_cli.command("check-plans")
+@click.option("--verbose", "-v", is_flag=True, help="输出每条查询的完整执行计划")
+def check_plans(verbose):
+    """检查关键查询的执行计划是否使用预期索引"""
+    results = check_query_plans()
+    for result in results:
+        status = "ok  " if result.ok else "FAIL"
+        click.echo(f"[{status}] {result.name}" + (f": {'; '.join(result.problems)}" if result.problems else ""))
+        if verbose or not result.ok:
+            for line in result.plan:
+                click.echo(f"         {line}")
+    failed = sum(not result.ok for result in results)
+    if failed:
+        raise click.ClickException(f"{failed} 条查询的执行计划不符合预期")
+    click.echo(f"{len(results)} 条查询的执行计划均符合预期")
+
+
+def register_commands(app) -> None:
+    """将全部命令注册到应用"""
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_admin_command)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(tokens_cli)
+    app.cli.add_command(static_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(schema_cli)
@@ -1,5 +1,6 @@
 class ApiException(Exception):
-    def __init__(self, code: int, message: str):
+    def __init__(self, code: int, message: str, data=None):
         super().__init__(message)
         self.code = code
-        self.message = message
\ No newline at end of file
+        self.message = message
+        self.data = data
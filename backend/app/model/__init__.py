@@ -1,3 +1,38 @@
+from typing import Any, Dict
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
-db = SQLAlchemy()
\ No newline at end of file
+db = SQLAlchemy()
+
+
+def _apply_sqlite_pragmas(pragmas: Dict[str, Any], dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def init_engine(app) -> None:
+    """
+    初始化数据库扩展并配置引擎
+
+    - 按实际生效的连接地址与 DB_POOL 生成引擎参数，SQLALCHEMY_ENGINE_OPTIONS 中的显式配置优先
+    - 为 SQLite 引擎注册连接时执行的 PRAGMA（配置项 SQLITE_PRAGMAS）
+
+    Flask-SQLAlchemy 在 init_app 时即创建引擎，引擎参数必须在此之前确定。
+    只创建引擎对象并挂载事件，不会建立数据库连接。
+    """
+    from config import engine_options
+
+    options = engine_options(app.config["SQLALCHEMY_DATABASE_URI"], **app.config.get("DB_POOL", {}))
+    options.update(app.config.get("SQLALCHEMY_ENGINE_OPTIONS") or {})
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+    db.init_app(app)
+
+    pragmas = app.config.get("SQLITE_PRAGMAS")
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == "sqlite" and pragmas:
+        event.listen(engine, "connect", lambda conn, record: _apply_sqlite_pragmas(pragmas, conn, record))
@@ -0,0 +1,38 @@
+from datetime import datetime, UTC
+from app.model import db
+
+
+class Post(db.Model):
+    """
+    帖子模型类
+
+    信息流按 (created_at, id) 倒序分页，作者主页按 (author_id, created_at) 倒序分页，
+    两个复合索引分别覆盖这两种访问路径
+    """
+    __tablename__ = "posts"
+    __table_args__ = (
+        db.Index("ix_posts_author_id_created_at", "author_id", "created_at"),
+        db.Index("ix_posts_created_at_id", "created_at", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, comment="帖子ID")
+    author_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, comment="作者用户ID")
+    content = db.Column(db.Text, nullable=False, comment="帖子内容")
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), nullable=False, comment="创建时间")
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC), nullable=False, comment="更新时间")
+
+    # 列表接口按这些列做投影查询
+    LIST_FIELDS = ('id', 'author_id', 'content', 'created_at')
+
+    @classmethod
+    def list_columns(cls):
+        """
+        获取列表字段对应的列，用于投影查询
+
+        Returns:
+            list: 列属性列表
+        """
+        return [getattr(cls, name) for name in cls.LIST_FIELDS]
+
+    def __repr__(self) -> str:
+        return f"<Post {self.id} by {self.author_id}>"
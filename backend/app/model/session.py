@@ -0,0 +1,24 @@
+from datetime import datetime, UTC
+from app.model import db
+
+
+class UserSession(db.Model):
+    """
+    刷新令牌会话模型
+
+    每次登录创建一个令牌家族（family_id），每次刷新轮换出一条新记录并在旧记录上
+    标记 replaced_by。已被轮换的刷新令牌再次出现即视为泄露，整个家族随之吊销
+    """
+    __tablename__ = "user_sessions"
+
+    id = db.Column(db.Integer, primary_key=True, comment="会话记录ID")
+    family_id = db.Column(db.String(36), nullable=False, index=True, comment="令牌家族ID")
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True, comment="用户ID")
+    jti = db.Column(db.String(36), unique=True, nullable=False, comment="刷新令牌唯一标识")
+    replaced_by = db.Column(db.String(36), nullable=True, comment="轮换后的新令牌jti")
+    revoked = db.Column(db.Boolean, default=False, nullable=False, comment="是否已吊销")
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), nullable=False, comment="创建时间")
+    expires_at = db.Column(db.DateTime, nullable=False, comment="过期时间")
+
+    def __repr__(self) -> str:
+        return f"<UserSession {self.family_id}:{self.jti}>"
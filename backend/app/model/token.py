@@ -0,0 +1,19 @@
+from datetime import datetime, UTC
+from app.model import db
+
+
+class RevokedToken(db.Model):
+    """
+    已吊销令牌模型
+
+    以 JWT 的 jti 为主键记录登出等原因吊销的令牌，令牌过期后可被清理
+    """
+    __tablename__ = "revoked_tokens"
+
+    jti = db.Column(db.String(36), primary_key=True, comment="令牌唯一标识")
+    user_id = db.Column(db.Integer, nullable=True, comment="用户ID")
+    revoked_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), nullable=False, index=True, comment="吊销时间")
+    expires_at = db.Column(db.DateTime, nullable=False, index=True, comment="令牌过期时间")
+
+    def __repr__(self) -> str:
+        return f"<RevokedToken {self.jti}>"
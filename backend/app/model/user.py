@@ -1,6 +1,9 @@
 from datetime import datetime, UTC
 from app.model import db
 
+# 用户公开字段：只读列表等场景按这些列做投影查询，不加载密码哈希等完整 ORM 对象
+PUBLIC_FIELDS = ('id', 'username', 'nickname', 'avatar', 'permission', 'created_at')
+
 
 class User(db.Model):
     """
@@ -30,6 +33,31 @@ class User(db.Model):
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC), nullable=False, comment="更新时间")
     last_login_at = db.Column(db.DateTime, nullable=True, comment="最后登录时间")
 
+    # 索引与迁移 0002_user_access_indexes 保持一致，修改时需同时新增迁移
+    __table_args__ = (
+        # 管理员列表：按注册时间 / 最近登录排序，按状态或权限筛选后按ID分页
+        db.Index("ix_users_created_at_id", "created_at", "id"),
+        db.Index("ix_users_last_login_at_id", "last_login_at", "id"),
+        db.Index("ix_users_is_active_id", "is_active", "id"),
+        db.Index("ix_users_permission_id", "permission", "id"),
+        # 不区分大小写的用户名 / 邮箱查找（登录、注册查重），同时保证大小写不同的值不能重复注册
+        db.Index("ix_users_username_lower", db.func.lower(username), unique=True),
+        db.Index("ix_users_email_lower", db.func.lower(email), unique=True),
+    )
+
+    @classmethod
+    def public_columns(cls, *extra_fields):
+        """
+        获取公开字段对应的列，用于投影查询
+        
+        Args:
+            *extra_fields (str): 追加的字段名，如 'is_active'
+            
+        Returns:
+            list: 列属性列表
+        """
+        return [getattr(cls, name) for name in PUBLIC_FIELDS + extra_fields]
+    
     def __repr__(self) -> str:
         return f"<User {self.username}({self.email})>"
     
@@ -0,0 +1,153 @@
+"""
+登录活动服务
+
+以 write-behind 方式记录用户最后登录时间：登录请求只把时间戳放入内存缓冲区，
+由后台线程按时间间隔或条数批量写入数据库，同一用户的多次登录在缓冲区中合并。
+"""
+
+import atexit
+import os
+import threading
+from datetime import datetime, UTC
+from typing import Dict, Optional
+from sqlalchemy import case, update
+from app.model import db
+from app.model.user import User
+
+
+class LoginActivityRecorder:
+    """
+    登录活动 write-behind 记录器
+
+    配置项（从 Flask 配置读取）:
+        LOGIN_ACTIVITY_WRITE_BEHIND: 是否启用后台批量写入，关闭时在调用线程中同步写入
+        LOGIN_ACTIVITY_FLUSH_MS: 后台刷新间隔（毫秒）
+        LOGIN_ACTIVITY_BATCH_SIZE: 单条 UPDATE 语句包含的最大用户数，缓冲区达到该值时立即刷新
+        LOGIN_ACTIVITY_MAX_PENDING: 缓冲区容量上限，超出后丢弃新用户的记录并计数
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.flush_interval = 0.5
+        self.batch_size = 500
+        self.max_pending = 10000
+        self.dropped = 0
+        self._app = None
+        self._pending: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        atexit.register(self.shutdown)
+
+    def init_app(self, app) -> None:
+        """绑定应用并加载配置，切换应用前先写出已有缓冲"""
+        if self._app is not None:
+            self.flush()
+        self._app = app
+        self.enabled = app.config.get("LOGIN_ACTIVITY_WRITE_BEHIND", True)
+        self.flush_interval = app.config.get("LOGIN_ACTIVITY_FLUSH_MS", 500) / 1000
+        self.batch_size = max(1, app.config.get("LOGIN_ACTIVITY_BATCH_SIZE", 500))
+        self.max_pending = max(1, app.config.get("LOGIN_ACTIVITY_MAX_PENDING", 10000))
+        self._stopping.clear()
+
+    def record(self, user_id: int, when: Optional[datetime] = None) -> None:
+        """
+        记录一次登录
+
+        Args:
+            user_id (int): 用户ID
+            when (Optional[datetime]): 登录时间，默认为当前时间
+        """
+        when = when or datetime.now(UTC)
+        if not self.enabled:
+            self._write({user_id: when})
+            return
+
+        with self._lock:
+            if user_id not in self._pending and len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                self._wakeup.set()
+                return
+            self._pending[user_id] = when
+            pending = len(self._pending)
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        """当前缓冲区中待写入的用户数"""
+        return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        立即写出缓冲区
+
+        Returns:
+            int: 写入的用户数
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._pending = self._pending, {}
+            if not entries:
+                return 0
+            items = list(entries.items())
+            for start in range(0, len(items), self.batch_size):
+                self._write(dict(items[start:start + self.batch_size]))
+            return len(items)
+
+    def shutdown(self) -> None:
+        """停止后台线程并写出剩余记录（进程退出时自动调用）"""
+        self._stopping.set()
+        self._wakeup.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._thread = None
+        if self._app is not None:
+            self.flush()
+
+    def _ensure_thread(self) -> None:
+        # fork 之后子进程中不存在父进程的线程，按 pid 判断是否需要重新启动
+        pid = os.getpid()
+        if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread_pid == pid and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="login-activity-writer", daemon=True)
+            self._thread_pid = pid
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                if self._app is not None:
+                    self._app.logger.exception("写入登录活动失败")
+
+    def _write(self, entries: Dict[int, datetime]) -> None:
+        from app.service.user_service import user_service
+
+        table = User.__table__
+        statement = (
+            update(table)
+            .where(table.c.id.in_(list(entries)))
+            # 登录活动不算资料修改，保持 updated_at 不变
+            .values(last_login_at=case(entries, value=table.c.id), updated_at=table.c.updated_at)
+        )
+        with self._app.app_context():
+            with db.engine.begin() as conn:
+                conn.execute(statement)
+        for user_id in entries:
+            user_service.invalidate_user(user_id)
+
+
+# 创建服务实例
+login_activity = LoginActivityRecorder()
@@ -7,13 +7,22 @@
 
 import hashlib
 import secrets
-from datetime import datetime, timedelta, UTC
+import uuid
+from datetime import datetime, UTC
 from typing import Dict, Optional, Any
+from flask import current_app
+from flask_jwt_extended import create_access_token, create_refresh_token, decode_token
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
 from app.exception.api_exception import ApiException
 from app.model import db
 from app.model.user import User
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.model.session import UserSession
 from app.service.user_service import user_service
+from app.service.activity_service import login_activity
+from app.service.token_service import token_revocation
+from app.utils.password_hasher import password_hasher
+from app.utils.rate_limit import rate_limiter
 
 
 class AuthService:
@@ -23,7 +32,7 @@ class AuthService:
         pass
     
     def _hash_password(self, password: str) -> str:
-        return generate_password_hash(password)
+        return password_hasher.hash(password)
     
     def _generate_session_token(self) -> str:
         return secrets.token_urlsafe(32)
@@ -46,15 +55,13 @@ class AuthService:
         if errors:
             raise ApiException(400, "注册数据验证失败", errors)
         
-        # 检查用户名和邮箱是否已存在
-        if User.query.filter_by(username=user_data['username'].strip()).first():
-            raise ApiException(400, "用户名已存在")
-        if User.query.filter_by(email=user_data['email'].strip()).first():
-            raise ApiException(400, "邮箱已存在")
+        # 唯一性已在验证阶段用一次查询检查；并发注册的竞争由唯一约束兜底
+        username = user_data['username'].strip()
+        email = user_data['email'].strip()
         user = User(
-            username=user_data['username'].strip(),
+            username=username,
             nickname=user_data['nickname'].strip(),
-            email=user_data['email'].strip(),
+            email=email,
             password=self._hash_password(user_data['password']),
             avatar=user_data.get('avatar', '/static/avatars/default.jpg'),
             permission=user_data.get('permission', 1),
@@ -62,7 +69,12 @@ class AuthService:
             is_verified=False
         )
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            errors = user_service.find_conflicts(username, email)
+            raise ApiException(400, "注册数据验证失败", errors or None)
         return {
             'user_id': user.id,
             'username': user.username,
@@ -76,22 +88,31 @@ class AuthService:
         用户身份验证
         
         Args:
-            username (str): 用户名
+            username (str): 用户名或邮箱（不区分大小写）
             password (str): 密码
             
         Returns:
             Optional[Dict[str, Any]]: 认证成功返回用户信息，失败返回None
+            
+        Raises:
+            ApiException: 该账号的登录尝试超出 RATE_LIMIT_LOGIN_PER_ACCOUNT 时抛出 429
         """
         if not username or not password:
             return None
         
-        user = User.query.filter_by(username=username).first()
+        user = user_service.login_query(username).first()
         if not user:
             return None
-        if not check_password_hash(user.password, password):
+        # 按用户ID而不是提交的标识限流，用户名与邮箱交替尝试共用同一计数；在校验密码前判定，被拒绝时不做哈希
+        rate_limiter.check("RATE_LIMIT_LOGIN_PER_ACCOUNT", str(user.id))
+        if not password_hasher.verify(user.password, password):
             return None
         if not user.is_active:
             return None
+        # 存储的哈希参数已过时，借助本次明文密码透明升级
+        if password_hasher.needs_rehash(user.password):
+            user.password = self._hash_password(password)
+            db.session.commit()
         return user.to_dict()
     
     def login_user(self, username: str, password: str) -> Dict[str, Any]:
@@ -99,7 +120,7 @@ class AuthService:
         用户登录
         
         Args:
-            username (str): 用户名
+            username (str): 用户名或邮箱（不区分大小写）
             password (str): 密码
             
         Returns:
@@ -116,11 +137,9 @@ class AuthService:
         if not user:
             raise ApiException(401, "用户名或密码错误")
         
-        # 更新用户最后登录时间
-        user_obj = db.session.get(User, user['id'])
-        if user_obj:
-            user_obj.last_login_at = datetime.now(UTC)
-            db.session.commit()
+        # 最后登录时间交给 write-behind 队列批量写入，登录请求本身不写库
+        login_activity.record(user['id'])
+        user_service.invalidate_user(user['id'])
         return {
             'token': 'placeholder',
             'user': {
@@ -130,19 +149,71 @@ class AuthService:
                 'avatar': user.get('avatar'),
                 'permission': user.get('permission', 1)
             },
-            'expires_at': (datetime.now(UTC) + timedelta(minutes=30)).isoformat()
+            'expires_at': (datetime.now(UTC) + current_app.config['JWT_ACCESS_TOKEN_EXPIRES']).isoformat()
         }
     
-    def logout_user(self, session_token: str) -> bool:
+    def issue_refresh_token(self, user_id: int, family_id: Optional[str] = None) -> str:
+        """
+        签发刷新令牌并记录会话
+        
+        Args:
+            user_id (int): 用户ID
+            family_id (Optional[str]): 令牌家族ID，为None时开启新家族（即新登录）
+            
+        Returns:
+            str: 刷新令牌
+        """
+        jti = str(uuid.uuid4())
+        family_id = family_id or str(uuid.uuid4())
+        db.session.add(UserSession(
+            family_id=family_id,
+            user_id=user_id,
+            jti=jti,
+            expires_at=datetime.now(UTC) + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+        ))
+        db.session.commit()
+        return create_refresh_token(identity=str(user_id), additional_claims={'jti': jti, 'fam': family_id})
+    
+    def revoke_session_family(self, family_id: str) -> None:
+        """
+        吊销整个刷新令牌家族
+        
+        Args:
+            family_id (str): 令牌家族ID
+        """
+        db.session.execute(
+            update(UserSession).where(UserSession.family_id == family_id).values(revoked=True)
+        )
+        db.session.commit()
+    
+    def logout_user(self, session_token: str, refresh_token: Optional[str] = None) -> bool:
         """
         用户登出
         
         Args:
             session_token (str): 会话令牌
+            refresh_token (Optional[str]): 刷新令牌，提供时一并吊销其令牌家族
             
         Returns:
-            bool: 登出是否成功
+            bool: 登出是否成功，令牌无效或已过期时返回False
         """
+        if refresh_token:
+            try:
+                family_id = decode_token(refresh_token).get('fam')
+            except Exception:
+                family_id = None
+            if family_id:
+                self.revoke_session_family(family_id)
+        try:
+            payload = decode_token(session_token)
+        except Exception:
+            return False
+        jti = payload.get('jti')
+        if not jti:
+            return False
+        expires_at = datetime.fromtimestamp(payload['exp'], tz=UTC) if payload.get('exp') else datetime.now(UTC)
+        user_id = payload.get('sub')
+        token_revocation.revoke(jti, expires_at, int(user_id) if str(user_id).isdigit() else None)
         return True
     
     def get_session_info(self, session_token: str) -> Optional[Dict[str, Any]]:
@@ -188,15 +259,64 @@ class AuthService:
     
     def refresh_session(self, session_token: str) -> Optional[Dict[str, Any]]:
         """
-        刷新会话
+        使用刷新令牌轮换会话
+        
+        只做签名校验和一次按 jti 的条件更新，不经过密码哈希。旧刷新令牌被原子地
+        标记为已轮换；已轮换或已吊销的令牌再次使用时吊销整个令牌家族。
         
         Args:
-            session_token (str): 会话令牌
+            session_token (str): 刷新令牌
             
         Returns:
-            Optional[Dict[str, Any]]: 刷新后的会话信息，如果会话无效则返回None
+            Optional[Dict[str, Any]]: 新的访问令牌与刷新令牌，如果令牌无效则返回None
+            
+        Raises:
+            ApiException: 检测到刷新令牌重复使用或用户已被禁用时抛出 401
         """
-        return None
+        try:
+            payload = decode_token(session_token)
+        except Exception:
+            return None
+        jti, family_id, identity = payload.get('jti'), payload.get('fam'), payload.get('sub')
+        if payload.get('type') != 'refresh' or not jti or not family_id or not str(identity).isdigit():
+            return None
+        
+        new_jti = str(uuid.uuid4())
+        rotated = db.session.execute(
+            update(UserSession)
+            .where(UserSession.jti == jti, UserSession.replaced_by.is_(None), UserSession.revoked.is_(False))
+            .values(replaced_by=new_jti)
+        ).rowcount
+        if not rotated:
+            db.session.rollback()
+            reused = db.session.query(UserSession.id).filter(UserSession.jti == jti).first()
+            if not reused:
+                return None
+            self.revoke_session_family(family_id)
+            raise ApiException(401, "刷新令牌已被使用，请重新登录")
+        
+        user = user_service.get_user_by_id(int(identity))
+        if not user or not user.get('is_active'):
+            db.session.rollback()
+            self.revoke_session_family(family_id)
+            raise ApiException(401, "用户不存在或已被禁用")
+        
+        db.session.add(UserSession(
+            family_id=family_id,
+            user_id=user['id'],
+            jti=new_jti,
+            expires_at=datetime.now(UTC) + current_app.config['JWT_REFRESH_TOKEN_EXPIRES']
+        ))
+        db.session.commit()
+        now = datetime.now(UTC)
+        return {
+            'token': create_access_token(identity=str(identity)),
+            'refresh_token': create_refresh_token(
+                identity=str(identity), additional_claims={'jti': new_jti, 'fam': family_id}
+            ),
+            'expires_at': (now + current_app.config['JWT_ACCESS_TOKEN_EXPIRES']).isoformat(),
+            'refreshed_at': now.isoformat()
+        }
 
 
 # 创建服务实例
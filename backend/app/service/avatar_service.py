@@ -0,0 +1,292 @@
+"""
+头像服务层
+
+头像按内容寻址存储：上传的请求体分块写入临时文件并同时计算 SHA-256，完成后以摘要
+命名（相同图片只保存一份）。缩略图在后台进程池中生成，文件名同样包含摘要与尺寸，
+内容永不变化，因此可以用长期 Cache-Control 缓存。
+
+存储布局（AVATAR_STORAGE_DIR 下）:
+    ab/abcdef....png        原图
+    ab/abcdef..._128.png    128px 缩略图
+
+缩略图依赖 Pillow，按需导入；未安装时只保存原图，缩略图请求回退为原图。
+上传时按图片头部声明的像素数校验尺寸，避免高压缩比的小文件在生成缩略图时解码出巨大的位图。
+"""
+
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Dict, List, Optional
+from flask import current_app
+from app.exception.api_exception import ApiException
+
+# 文件头魔数 -> 扩展名，只接受常见位图格式
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+AVATAR_NAME = re.compile(r"^(?P<digest>[0-9a-f]{64})(?:_(?P<size>\d+))?\.(?P<ext>jpg|png|gif|webp)$")
+_CHUNK_SIZE = 64 * 1024
+# multipart 请求体中边界与字段头的余量
+MULTIPART_OVERHEAD = 16 * 1024
+_HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+
+def _sniff(head: bytes) -> Optional[str]:
+    for signature, ext in _SIGNATURES:
+        if head.startswith(signature):
+            return ext
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _thumbnail_ext(ext: str) -> str:
+    # GIF 缩略图只取首帧，保存为 PNG
+    return "png" if ext == "gif" else ext
+
+
+def _make_thumbnails(source: str, directory: str, digest: str, ext: str, sizes: List[int]) -> List[str]:
+    """生成缩略图（在进程池中执行），返回生成的文件名"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return []
+
+    created = []
+    thumb_ext = _thumbnail_ext(ext)
+    with Image.open(source) as image:
+        image.seek(0)
+        image = image.convert("RGBA" if thumb_ext in ("png", "webp") else "RGB")
+        for size in sizes:
+            name = f"{digest}_{size}.{thumb_ext}"
+            target = os.path.join(directory, name)
+            if os.path.exists(target):
+                continue
+            thumb = image.copy()
+            thumb.thumbnail((size, size), Image.LANCZOS)
+            tmp = f"{target}.{os.getpid()}.tmp"
+            thumb.save(tmp, format={"jpg": "JPEG", "png": "PNG", "webp": "WEBP"}[thumb_ext],
+                       optimize=True, quality=85)
+            os.replace(tmp, target)
+            created.append(name)
+    return created
+
+
+class AvatarService:
+    """
+    头像服务类
+
+    配置项（从 Flask 配置读取）:
+        AVATAR_STORAGE_DIR: 头像存储目录，默认 instance/avatars
+        AVATAR_MAX_BYTES: 单个头像的最大字节数
+        AVATAR_MAX_PIXELS: 单个头像的最大像素数（宽 × 高）
+        AVATAR_THUMBNAIL_SIZES: 缩略图边长列表（像素）
+        AVATAR_DEFAULT_SIZE: 写入 User.avatar 的缩略图尺寸
+        AVATAR_WORKERS: 缩略图进程池大小，0 表示在请求线程内同步生成
+    """
+
+    def __init__(self):
+        self.storage_dir = ""
+        self.max_bytes = 5 * 1024 * 1024
+        self.max_pixels = 4096 * 4096
+        self.sizes = [64, 128, 256]
+        self.default_size = 128
+        self.workers = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """从应用配置加载存储参数，进程池在首次使用时才创建"""
+        self.shutdown()
+        self.storage_dir = app.config.get("AVATAR_STORAGE_DIR") or os.path.join(app.instance_path, "avatars")
+        self.max_bytes = app.config.get("AVATAR_MAX_BYTES", 5 * 1024 * 1024)
+        self.max_pixels = app.config.get("AVATAR_MAX_PIXELS", 4096 * 4096)
+        self.sizes = sorted(app.config.get("AVATAR_THUMBNAIL_SIZES", [64, 128, 256]))
+        self.default_size = app.config.get("AVATAR_DEFAULT_SIZE", 128)
+        self.workers = max(0, app.config.get("AVATAR_WORKERS", 0))
+
+    def shutdown(self) -> None:
+        """关闭缩略图进程池"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._pending.clear()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def upload_limit(self, content_length: Optional[int], multipart: bool = False) -> int:
+        """
+        校验请求声明的长度，返回本次请求允许读取的最大字节数
+
+        Args:
+            content_length (Optional[int]): 请求声明的长度，分块传输时为None
+            multipart (bool): 是否为 multipart/form-data 请求，需要为边界与字段头留出余量
+
+        Returns:
+            int: 请求体字节数上限，用于设置 request.max_content_length
+
+        Raises:
+            ApiException: 声明长度超出上限时抛出 413
+        """
+        limit = self.max_bytes + (MULTIPART_OVERHEAD if multipart else 0)
+        if content_length is not None and content_length > limit:
+            raise self.oversize_error()
+        return limit
+
+    def save_upload(self, stream: IO[bytes], content_length: Optional[int] = None) -> Dict[str, object]:
+        """
+        保存上传的头像并安排生成缩略图
+
+        请求体按块读取写入临时文件，内存占用与文件大小无关。
+
+        Args:
+            stream (IO[bytes]): 请求体流
+            content_length (Optional[int]): 请求声明的长度，超出上限时直接拒绝
+
+        Returns:
+            Dict[str, object]: 原图与各尺寸缩略图的URL，以及写入 User.avatar 的默认URL
+
+        Raises:
+            ApiException: 文件为空、过大、像素数超限或不是支持的图片格式时抛出异常
+        """
+        if content_length is not None and content_length > self.max_bytes:
+            raise self.oversize_error()
+
+        os.makedirs(self.storage_dir, exist_ok=True)
+        tmp = os.path.join(self.storage_dir, f".upload-{os.getpid()}-{threading.get_ident()}.tmp")
+        digest = hashlib.sha256()
+        size = 0
+        ext = None
+        try:
+            with open(tmp, "wb") as f:
+                while True:
+                    chunk = stream.read(_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if ext is None:
+                        ext = _sniff(chunk[:16])
+                        if ext is None:
+                            raise ApiException(400, "仅支持 JPEG、PNG、GIF、WebP 格式的图片")
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise self.oversize_error()
+                    digest.update(chunk)
+                    f.write(chunk)
+            if size == 0:
+                raise ApiException(400, "头像文件不能为空")
+            self._check_dimensions(tmp)
+
+            hexdigest = digest.hexdigest()
+            target = self._path(f"{hexdigest}.{ext}")
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if os.path.exists(target):
+                # 相同内容已存在，直接复用
+                os.remove(tmp)
+            else:
+                os.replace(tmp, target)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+        self._schedule_thumbnails(hexdigest, ext)
+        thumb_ext = _thumbnail_ext(ext)
+        thumbnails = {size: self.url(f"{hexdigest}_{size}.{thumb_ext}") for size in self.sizes}
+        return {
+            'digest': hexdigest,
+            'original': self.url(f"{hexdigest}.{ext}"),
+            'thumbnails': thumbnails,
+            'avatar': thumbnails.get(self.default_size, self.url(f"{hexdigest}.{ext}"))
+        }
+
+    def resolve(self, name: str) -> Optional[str]:
+        """
+        根据文件名获取头像文件路径
+
+        缩略图尚未生成（后台任务未完成、在其他 worker 中进行或生成失败）时不等待，
+        直接回退为原图；本进程没有进行中的任务时在后台补生成。
+
+        Args:
+            name (str): 头像文件名，如 "<sha256>_128.png"
+
+        Returns:
+            Optional[str]: 文件路径；文件名无效或原图不存在时返回None，缩略图不可用时返回原图路径
+        """
+        match = AVATAR_NAME.match(name)
+        if not match:
+            return None
+        path = self._path(name)
+        if os.path.exists(path):
+            return path
+        if match.group("size") is None:
+            return None
+
+        digest = match.group("digest")
+        original = self._find_original(digest)
+        if original is None:
+            return None
+        if self.workers and _HAS_PILLOW and int(match.group("size")) in self.sizes and digest not in self._pending:
+            self._schedule_thumbnails(digest, original.rsplit(".", 1)[1])
+        return original
+
+    def url(self, name: str) -> str:
+        """头像文件名对应的访问URL"""
+        return f"/api/avatars/{name}"
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.storage_dir, name[:2], name)
+
+    def oversize_error(self) -> ApiException:
+        """文件超出大小上限时返回的异常"""
+        return ApiException(413, f"头像文件不能超过{self.max_bytes // 1024 // 1024}MB")
+
+    def _check_dimensions(self, path: str) -> None:
+        # 未安装 Pillow 时不会生成缩略图，无需校验
+        if not _HAS_PILLOW:
+            return
+        from PIL import Image
+
+        try:
+            # Image.open 只解析文件头，不解码像素
+            with Image.open(path) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            width = height = None
+        except Exception:
+            raise ApiException(400, "无法识别的图片文件")
+        if width is None or width * height > self.max_pixels:
+            raise ApiException(400, f"头像尺寸过大，宽高乘积不能超过{self.max_pixels}像素")
+
+    def _find_original(self, digest: str) -> Optional[str]:
+        for ext in ("jpg", "png", "gif", "webp"):
+            path = self._path(f"{digest}.{ext}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _schedule_thumbnails(self, digest: str, ext: str) -> None:
+        source = self._path(f"{digest}.{ext}")
+        args = (source, os.path.dirname(source), digest, ext, self.sizes)
+        if not self.workers:
+            try:
+                _make_thumbnails(*args)
+            except Exception:
+                # 缩略图生成失败不影响上传，访问缩略图时回退为原图
+                current_app.logger.exception("生成头像缩略图失败: %s", digest)
+            return
+        with self._lock:
+            if self._pool is None:
+                # 延迟创建，保证 gunicorn preload 之后每个 worker 拥有自己的进程池
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._pool.submit(_make_thumbnails, *args)
+            self._pending[digest] = future
+        future.add_done_callback(lambda _: self._pending.pop(digest, None))
+
+
+# 创建服务实例
+avatar_service = AvatarService()
@@ -0,0 +1,234 @@
+"""
+批量用户服务层
+
+用于从旧系统迁移或备份用户数据：
+- 导入: 逐行流式读取 CSV / JSONL，按 UserService.validate_user_data 的规则校验，
+  用预加载的用户名/邮箱集合判重（不逐行查询），明文密码在进程池中批量哈希，
+  每批用一条 executemany INSERT 写入并提交
+- 导出: 按主键分批投影查询，逐行写出，内存占用与用户数无关
+"""
+
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import insert
+from app.model import db
+from app.model.user import User
+from app.service.user_service import user_service
+from app.utils.password_hasher import password_hasher
+
+# 导出的字段（默认不包含密码哈希）
+EXPORT_FIELDS = ('id', 'username', 'nickname', 'email', 'avatar', 'permission',
+                 'is_active', 'is_verified', 'created_at', 'last_login_at')
+# 允许直接导入的已有哈希格式（werkzeug 格式）
+HASH_PREFIXES = ('scrypt:', 'pbkdf2:')
+# 必须是字符串的字段（JSONL 中可能出现数字、列表等其他类型）
+STRING_FIELDS = ('username', 'nickname', 'email', 'password', 'password_hash', 'avatar', 'created_at')
+_TRUE_VALUES = ('1', 'true', 'yes', 'y')
+
+
+@dataclass
+class ImportReport:
+    """导入结果统计"""
+    imported: int = 0
+    skipped: int = 0
+    errors: List[Tuple[int, Dict[str, str]]] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'imported': self.imported, 'skipped': self.skipped, 'failed': len(self.errors)}
+
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    逐行读取导入文件
+
+    Args:
+        stream (IO[str]): 文本流
+        fmt (str): csv / jsonl
+
+    Returns:
+        Iterator[Tuple[int, Dict[str, Any]]]: (行号, 行数据)，JSONL 中无法解析的行返回空字典
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, {key: value for key, value in row.items() if value not in (None, '')}
+        return
+    for line_no, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_no, row if isinstance(row, dict) else {}
+
+
+def _as_bool(value: Any, default: bool) -> bool:
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in _TRUE_VALUES
+
+
+class BulkUserService:
+    """批量用户服务类"""
+
+    def import_users(self, rows: Iterator[Tuple[int, Dict[str, Any]]], batch_size: int = 1000,
+                     workers: int = 0, dry_run: bool = False) -> ImportReport:
+        """
+        批量导入用户
+
+        每行可提供明文 password（按当前 PASSWORD_HASH_METHOD 哈希）或旧系统导出的
+        werkzeug 格式 password_hash（原样写入，登录时按需升级）。与已有用户或前面行
+        重复（不区分大小写）的用户名/邮箱计入 skipped。
+
+        Args:
+            rows (Iterator[Tuple[int, Dict[str, Any]]]): read_rows 返回的行迭代器
+            batch_size (int): 每批写入的用户数
+            workers (int): 密码哈希进程数，0 表示在当前进程内计算
+            dry_run (bool): 只校验不写入
+
+        Returns:
+            ImportReport: 导入结果统计与逐行错误
+        """
+        report = ImportReport()
+        usernames, emails = self._existing_keys()
+        batch: List[Dict[str, Any]] = []
+        pool = ProcessPoolExecutor(max_workers=workers) if workers and not dry_run else None
+        try:
+            for line_no, row in rows:
+                record, errors = self._prepare(row)
+                if errors:
+                    report.errors.append((line_no, errors))
+                    continue
+                if record['username'].lower() in usernames or record['email'].lower() in emails:
+                    report.skipped += 1
+                    continue
+                usernames.add(record['username'].lower())
+                emails.add(record['email'].lower())
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    report.imported += self._flush(batch, pool, dry_run)
+                    batch = []
+            if batch:
+                report.imported += self._flush(batch, pool, dry_run)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return report
+
+    def export_users(self, out: IO[str], fmt: str = 'jsonl', include_password_hash: bool = False,
+                     batch_size: int = 1000) -> int:
+        """
+        流式导出用户
+
+        Args:
+            out (IO[str]): 输出文本流
+            fmt (str): csv / jsonl
+            include_password_hash (bool): 是否导出密码哈希（迁移到其他实例时使用）
+            batch_size (int): 每次查询的用户数
+
+        Returns:
+            int: 导出的用户数
+        """
+        fields = EXPORT_FIELDS + (('password_hash',) if include_password_hash else ())
+        columns = [getattr(User, name) for name in EXPORT_FIELDS]
+        if include_password_hash:
+            columns.append(User.password.label('password_hash'))
+
+        writer = None
+        if fmt == 'csv':
+            writer = csv.DictWriter(out, fieldnames=fields)
+            writer.writeheader()
+        count = 0
+        last_id = 0
+        while True:
+            # 按主键键集分批，每批都是一次索引范围扫描
+            rows = (db.session.query(*columns).filter(User.id > last_id)
+                    .order_by(User.id.asc()).limit(batch_size).all())
+            if not rows:
+                break
+            for row in rows:
+                record = {key: value.isoformat() if isinstance(value, datetime) else value
+                          for key, value in row._asdict().items()}
+                if writer is not None:
+                    writer.writerow(record)
+                else:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += len(rows)
+            last_id = rows[-1].id
+            db.session.expunge_all()
+        return count
+
+    def _existing_keys(self) -> Tuple[set, set]:
+        usernames, emails = set(), set()
+        for username, email in db.session.query(User.username, User.email).yield_per(10000):
+            usernames.add(username.lower())
+            emails.add(email.lower())
+        return usernames, emails
+
+    def _prepare(self, row: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        if not row:
+            return {}, {'row': '无法解析的行'}
+        type_errors = {key: '字段类型不正确，应为字符串' for key in STRING_FIELDS
+                       if row.get(key) is not None and not isinstance(row[key], str)}
+        if type_errors:
+            return {}, type_errors
+        data = {key: row[key] for key in ('username', 'nickname', 'email', 'password', 'permission') if key in row}
+        data.setdefault('nickname', row.get('username', ''))
+        if 'permission' in data and isinstance(data['permission'], str):
+            data['permission'] = data['permission'].strip()
+        errors = user_service.validate_user_data(data, check_unique=False)
+
+        password_hash = row.get('password_hash')
+        if password_hash:
+            if not str(password_hash).startswith(HASH_PREFIXES) or '$' not in password_hash:
+                errors['password_hash'] = '不支持的密码哈希格式'
+        elif 'password' not in data:
+            errors['password'] = '密码不能为空'
+        if errors:
+            return {}, errors
+
+        now = datetime.now(UTC)
+        created_at = row.get('created_at')
+        try:
+            created_at = datetime.fromisoformat(created_at) if created_at else now
+        except (TypeError, ValueError):
+            return {}, {'created_at': '时间格式不正确'}
+        return {
+            'username': data['username'].strip(),
+            'nickname': data['nickname'].strip(),
+            'email': data['email'].strip(),
+            'password': password_hash,
+            'plain_password': None if password_hash else data['password'],
+            'avatar': row.get('avatar') or '/static/avatars/default.jpg',
+            'permission': int(data['permission']) if data.get('permission') is not None else 1,
+            'is_active': _as_bool(row.get('is_active'), True),
+            'is_verified': _as_bool(row.get('is_verified'), False),
+            'created_at': created_at,
+            'updated_at': now,
+        }, {}
+
+    def _flush(self, batch: List[Dict[str, Any]], pool: Optional[ProcessPoolExecutor], dry_run: bool) -> int:
+        if dry_run:
+            return len(batch)
+        pending = [record for record in batch if record['plain_password'] is not None]
+        if pending:
+            hashes = password_hasher.hash_many([record['plain_password'] for record in pending], pool)
+            for record, pwhash in zip(pending, hashes):
+                record['password'] = pwhash
+        for record in batch:
+            del record['plain_password']
+        # 列表参数的 insert 走 executemany，一批一次往返
+        db.session.execute(insert(User), batch)
+        db.session.commit()
+        return len(batch)
+
+
+# 创建服务实例
+bulk_user_service = BulkUserService()
@@ -0,0 +1,205 @@
+"""
+信息流缓存服务
+
+为每个信息流（全站 global、作者 author:<id>）在内存中维护最新 N 条帖子的
+(created_at, id) 有序列表：
+- 写入: 发帖时把新帖子插入所有已预热的相关信息流（fan-out on write），超出容量的旧条目被截断
+- 读取: 按游标在有序列表中二分定位，取出一页帖子ID后用一次 IN 查询补全内容，
+  读延迟只与页大小有关，与帖子总量无关
+- 回退: 信息流未预热时用一次只读 (created_at, id) 的索引查询预热；游标超出缓存窗口时
+  返回None，由调用方走查询分页
+- 预热在锁外执行，期间写入的帖子先记录下来，预热完成后合并进新的信息流，
+  避免预热查询的快照早于帖子提交时丢失该帖子
+
+缓存是进程内的，其他 worker 发布的帖子在 FEED_CACHE_TTL 秒后随重新预热可见。
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional, Tuple
+from app.model import db
+from app.model.post import Post
+
+GLOBAL_FEED = "global"
+
+
+def author_feed(author_id: int) -> str:
+    """作者信息流的缓存键"""
+    return f"author:{author_id}"
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # 数据库读出的时间不带时区，统一为 naive UTC 才能与缓存中的条目比较
+    if value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+class _Feed:
+    __slots__ = ("entries", "complete", "warmed_at")
+
+    def __init__(self, entries: List[Tuple[datetime, int]], complete: bool):
+        # 按 (created_at, id) 升序保存，最新的帖子在末尾
+        self.entries = entries
+        # 预热时取到的条目少于容量，说明缓存中已是该信息流的全部帖子
+        self.complete = complete
+        self.warmed_at = time.monotonic()
+
+
+class FeedCache:
+    """
+    信息流缓存
+
+    配置项（从 Flask 配置读取）:
+        FEED_CACHE_ENABLED: 是否启用信息流缓存
+        FEED_CACHE_SIZE: 每个信息流缓存的最新帖子数
+        FEED_CACHE_MAX_FEEDS: 同时缓存的信息流数量，超出后淘汰最久未读的信息流
+        FEED_CACHE_TTL: 信息流重新预热间隔（秒）
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.size = 1000
+        self.max_feeds = 1024
+        self.ttl = 30.0
+        self.hits = 0
+        self.misses = 0
+        self.fallbacks = 0
+        self._feeds: "OrderedDict[str, _Feed]" = OrderedDict()
+        # 正在预热的信息流 -> 预热期间写入的条目（同一信息流可能被多个线程同时预热）
+        self._warming: Dict[str, List[List[Tuple[datetime, int]]]] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """加载配置并清空缓存"""
+        self.enabled = app.config.get("FEED_CACHE_ENABLED", True)
+        self.size = max(1, app.config.get("FEED_CACHE_SIZE", 1000))
+        self.max_feeds = max(1, app.config.get("FEED_CACHE_MAX_FEEDS", 1024))
+        self.ttl = app.config.get("FEED_CACHE_TTL", 30.0)
+        self.clear()
+
+    def clear(self) -> None:
+        """清空全部信息流与统计"""
+        with self._lock:
+            self._feeds.clear()
+        self.hits = self.misses = self.fallbacks = 0
+
+    def push(self, author_id: int, created_at: datetime, post_id: int) -> None:
+        """
+        新帖子写入相关信息流（只更新已预热的信息流）
+
+        Args:
+            author_id (int): 作者用户ID
+            created_at (datetime): 帖子创建时间
+            post_id (int): 帖子ID
+        """
+        if not self.enabled:
+            return
+        entry = (_naive_utc(created_at), post_id)
+        with self._lock:
+            for key in (GLOBAL_FEED, author_feed(author_id)):
+                for pushed in self._warming.get(key, ()):
+                    pushed.append(entry)
+                feed = self._feeds.get(key)
+                if feed is not None:
+                    self._insert(feed, entry)
+
+    def page(self, key: str, position: Optional[Tuple[datetime, int]],
+             per_page: int) -> Optional[Tuple[List[int], bool]]:
+        """
+        从缓存中取一页帖子ID
+
+        Args:
+            key (str): 信息流缓存键
+            position (Optional[Tuple[datetime, int]]): 游标位置 (created_at, id)，None 表示首页
+            per_page (int): 每页数量
+
+        Returns:
+            Optional[Tuple[List[int], bool]]: (按时间倒序的帖子ID, 是否还有下一页)；
+                该页超出缓存窗口时返回None
+        """
+        feed = self._get_or_warm(key)
+        entries = feed.entries
+        end = len(entries) if position is None else bisect_left(entries, (_naive_utc(position[0]), position[1]))
+        start = end - per_page
+        if start < 0 and not feed.complete:
+            self.fallbacks += 1
+            return None
+        self.hits += 1
+        ids = [post_id for _, post_id in reversed(entries[max(start, 0):end])]
+        # 窗口被截断时，读到窗口开头也不代表没有更早的帖子，下一页回退到查询分页
+        return ids, start > 0 or not feed.complete
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            Dict[str, Any]: 信息流数量、命中/预热/回退次数
+        """
+        return {
+            'feeds': len(self._feeds),
+            'size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'fallbacks': self.fallbacks
+        }
+
+    def _get_or_warm(self, key: str) -> _Feed:
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is not None and time.monotonic() - feed.warmed_at < self.ttl:
+                self._feeds.move_to_end(key)
+                return feed
+            pushed: List[Tuple[datetime, int]] = []
+            self._warming.setdefault(key, []).append(pushed)
+        self.misses += 1
+        try:
+            feed = self._warm(key)
+        finally:
+            with self._lock:
+                buffers = self._warming[key]
+                buffers.remove(pushed)
+                if not buffers:
+                    del self._warming[key]
+        with self._lock:
+            for entry in pushed:
+                self._insert(feed, entry)
+            self._feeds[key] = feed
+            self._feeds.move_to_end(key)
+            while len(self._feeds) > self.max_feeds:
+                self._feeds.popitem(last=False)
+        return feed
+
+    def _insert(self, feed: _Feed, entry: Tuple[datetime, int]) -> None:
+        # 调用方持有锁；预热查询可能已经读到该帖子，重复的条目跳过
+        entries = feed.entries
+        if not entries or entry > entries[-1]:
+            entries.append(entry)
+        elif not feed.complete and entry < entries[0]:
+            # 早于被截断的窗口，窗口之前的帖子不在缓存中，不能只补这一条
+            return
+        else:
+            index = bisect_left(entries, entry)
+            if index < len(entries) and entries[index] == entry:
+                return
+            entries.insert(index, entry)
+        if len(entries) > self.size:
+            del entries[:len(entries) - self.size]
+            feed.complete = False
+
+    def _warm(self, key: str) -> _Feed:
+        # 只读 (created_at, id) 两列，由 (created_at, id) / (author_id, created_at) 索引直接提供
+        query = db.session.query(Post.created_at, Post.id)
+        if key != GLOBAL_FEED:
+            query = query.filter(Post.author_id == int(key.split(":", 1)[1]))
+        rows = query.order_by(Post.created_at.desc(), Post.id.desc()).limit(self.size).all()
+        entries = [(_naive_utc(created_at), post_id) for created_at, post_id in reversed(rows)]
+        return _Feed(entries, complete=len(rows) < self.size)
+
+
+# 创建服务实例
+feed_cache = FeedCache()
@@ -1 +1,166 @@
-"""Placeholder service for posts."""
\ No newline at end of file
+"""
+帖子服务层
+
+负责处理帖子相关的业务逻辑，包括发帖、帖子查询与信息流分页。
+信息流按 (created_at, id) 倒序做键集分页，优先从信息流缓存取帖子ID，
+缓存窗口之外回退到查询分页；帖子内容与作者信息按页批量加载。
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import tuple_
+from app.exception.api_exception import ApiException
+from app.model import db
+from app.model.post import Post
+from app.service.user_service import user_service
+from app.service.feed_service import feed_cache, GLOBAL_FEED, author_feed
+from app.utils.cursor import encode_cursor, decode_cursor
+
+# 帖子内容最大长度
+MAX_CONTENT_LENGTH = 5000
+
+
+class PostService:
+    """帖子服务类"""
+
+    def create_post(self, author_id: int, content: Any) -> Dict[str, Any]:
+        """
+        发布帖子
+
+        Args:
+            author_id (int): 作者用户ID
+            content (Any): 帖子内容
+
+        Returns:
+            Dict[str, Any]: 新帖子信息（含作者公开信息）
+
+        Raises:
+            ApiException: 内容为空或过长时抛出异常
+        """
+        if not isinstance(content, str) or not content.strip():
+            raise ApiException(400, "帖子内容不能为空")
+        if len(content) > MAX_CONTENT_LENGTH:
+            raise ApiException(400, f"帖子内容不能超过{MAX_CONTENT_LENGTH}个字符")
+
+        post = Post(author_id=author_id, content=content.strip())
+        db.session.add(post)
+        db.session.commit()
+        result = {field: getattr(post, field) for field in Post.LIST_FIELDS}
+        feed_cache.push(author_id, result['created_at'], result['id'])
+        return self._hydrate([result])[0]
+
+    def get_post(self, post_id: int) -> Optional[Dict[str, Any]]:
+        """
+        获取单个帖子
+
+        Args:
+            post_id (int): 帖子ID
+
+        Returns:
+            Optional[Dict[str, Any]]: 帖子信息，不存在时返回None
+        """
+        row = db.session.query(*Post.list_columns()).filter(Post.id == post_id).first()
+        return self._hydrate([row._asdict()])[0] if row else None
+
+    def list_posts(self, cursor: Optional[str] = None, per_page: int = 20,
+                   author_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        获取帖子信息流（按发布时间倒序）
+
+        信息流缓存覆盖的页直接取缓存中的帖子ID再批量补全；其余页使用 (created_at, id)
+        行值比较做键集分页，命中 (created_at, id) 或 (author_id, created_at) 索引。
+        两种路径的代价都只与页大小有关，与表大小和翻页深度无关。
+
+        Args:
+            cursor (Optional[str]): 分页游标，为空时获取第一页
+            per_page (int): 每页数量
+            author_id (Optional[int]): 只看指定作者的帖子
+
+        Returns:
+            Dict[str, Any]: 包含帖子列表和分页信息的字典
+
+        Raises:
+            ApiException: 游标无效时抛出异常
+        """
+        position = self._decode_position(cursor) if cursor else None
+        
+        cached = None
+        if feed_cache.enabled:
+            key = GLOBAL_FEED if author_id is None else author_feed(author_id)
+            cached = feed_cache.page(key, position, per_page)
+        if cached is not None:
+            post_ids, has_more = cached
+            rows = self._load_posts(post_ids)
+        else:
+            query = db.session.query(*Post.list_columns())
+            if author_id is not None:
+                query = query.filter(Post.author_id == author_id)
+            if position is not None:
+                query = query.filter(tuple_(Post.created_at, Post.id) < position)
+            # 多取一条用于判断是否还有下一页
+            rows = query.order_by(Post.created_at.desc(), Post.id.desc()).limit(per_page + 1).all()
+            has_more = len(rows) > per_page
+            rows = [row._asdict() for row in rows[:per_page]]
+        next_cursor = None
+        if has_more and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor({'t': last['created_at'].isoformat(), 'id': last['id']})
+        return {
+            'posts': self._hydrate(rows),
+            'pagination': {
+                'per_page': per_page,
+                'has_more': has_more,
+                'next_cursor': next_cursor
+            }
+        }
+
+    def page_etag(self, page: Dict[str, Any]) -> str:
+        """
+        计算一页帖子的 ETag
+
+        由帖子ID、作者公开信息与下一页游标决定，不需要序列化整个响应体。
+
+        Args:
+            page (Dict[str, Any]): list_posts 的返回值
+
+        Returns:
+            str: ETag（不含引号）
+        """
+        digest = hashlib.blake2b(digest_size=12)
+        for post in page['posts']:
+            author = post['author'] or {}
+            digest.update(f"{post['id']}|{author.get('nickname')}|{author.get('avatar')}|"
+                          f"{author.get('username')}|{author.get('permission')};".encode())
+        digest.update(str(page['pagination']['next_cursor']).encode())
+        return f"p-{digest.hexdigest()}"
+
+    def _decode_position(self, cursor: str):
+        position = decode_cursor(cursor)
+        try:
+            created_at = datetime.fromisoformat(position['t'])
+        except (KeyError, TypeError, ValueError):
+            raise ApiException(400, "无效的分页游标")
+        post_id = position.get('id')
+        if not isinstance(post_id, int):
+            raise ApiException(400, "无效的分页游标")
+        return created_at, post_id
+
+    def _load_posts(self, post_ids: List[int]) -> List[Dict[str, Any]]:
+        # 一次 IN 查询取回整页帖子，再按缓存给出的顺序排列（已删除的帖子直接跳过）
+        if not post_ids:
+            return []
+        rows = db.session.query(*Post.list_columns()).filter(Post.id.in_(post_ids)).all()
+        by_id = {row.id: row._asdict() for row in rows}
+        return [by_id[post_id] for post_id in post_ids if post_id in by_id]
+    
+    def _hydrate(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # 一页帖子的作者合并为一次查询（命中身份缓存的不查库）
+        authors = user_service.get_users_public_info([post['author_id'] for post in posts])
+        for post in posts:
+            post['author'] = authors.get(post['author_id'])
+        return posts
+
+
+# 创建服务实例
+post_service = PostService()
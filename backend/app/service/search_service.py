@@ -0,0 +1,183 @@
+"""
+用户搜索索引服务
+
+为用户列表搜索提供索引支持，替代无法走索引的 LIKE '%term%' 全表扫描：
+- SQLite: FTS5 trigram 外部内容表 users_fts，由触发器与 users 表保持同步
+- PostgreSQL: pg_trgm GIN 表达式索引，由数据库自动维护
+- 其他数据库或索引不可用时回退到 LIKE 查询
+"""
+
+from typing import Any, Optional, Tuple
+from sqlalchemy import Float, Integer, inspect, literal_column, or_, text
+from app.model import db
+from app.model.user import User
+
+# trigram 分词器至少需要 3 个字符才能命中索引
+MIN_INDEXED_TERM_LENGTH = 3
+
+_SQLITE_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        username, nickname, email,
+        content='users', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, username, nickname, email)
+        VALUES (new.id, new.username, new.nickname, new.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, username, nickname, email)
+        VALUES ('delete', old.id, old.username, old.nickname, old.email);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS users_fts_au AFTER UPDATE OF username, nickname, email ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, username, nickname, email)
+        VALUES ('delete', old.id, old.username, old.nickname, old.email);
+        INSERT INTO users_fts(rowid, username, nickname, email)
+        VALUES (new.id, new.username, new.nickname, new.email);
+    END
+    """
+]
+
+_POSTGRES_SEARCH_EXPR = "(users.username || ' ' || users.nickname || ' ' || users.email)"
+
+_POSTGRES_SCHEMA = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_users_search_trgm ON users "
+    "USING gin ((username || ' ' || nickname || ' ' || email) gin_trgm_ops)"
+]
+
+
+class UserSearchIndex:
+    """用户搜索索引"""
+
+    def __init__(self):
+        self.enabled = True
+        # 检测结果按 engine 缓存，避免多个应用实例共用服务时串用
+        self._backend: Optional[Tuple[Any, str]] = None
+
+    def init_app(self, app) -> None:
+        """从应用配置读取是否启用索引搜索"""
+        self.enabled = app.config.get("USER_SEARCH_INDEX", True)
+        self._backend = None
+
+    def _detect_backend(self) -> str:
+        dialect = db.engine.dialect.name
+        if dialect == "sqlite" and inspect(db.engine).has_table("users_fts"):
+            return "fts5"
+        if dialect == "postgresql":
+            indexes = inspect(db.engine).get_indexes("users")
+            if any(index["name"] == "ix_users_search_trgm" for index in indexes):
+                return "trgm"
+        return "like"
+
+    @property
+    def backend(self) -> str:
+        """当前生效的搜索后端：fts5 / trgm / like"""
+        if not self.enabled:
+            return "like"
+        engine = db.engine
+        if self._backend is None or self._backend[0] is not engine:
+            self._backend = (engine, self._detect_backend())
+        return self._backend[1]
+
+    def ensure_schema(self) -> bool:
+        """
+        创建搜索索引结构（幂等）
+
+        SQLite 首次创建 FTS 表时会从现有用户数据构建索引。
+
+        Returns:
+            bool: 当前数据库是否支持索引搜索
+        """
+        dialect = db.engine.dialect.name
+        if dialect == "sqlite":
+            created = not inspect(db.engine).has_table("users_fts")
+            with db.engine.begin() as conn:
+                for statement in _SQLITE_SCHEMA:
+                    conn.execute(text(statement))
+                if created:
+                    conn.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+        elif dialect == "postgresql":
+            with db.engine.begin() as conn:
+                for statement in _POSTGRES_SCHEMA:
+                    conn.execute(text(statement))
+        else:
+            return False
+        self._backend = None
+        return True
+
+    def rebuild(self) -> None:
+        """根据 users 表现有数据重建搜索索引"""
+        self.ensure_schema()
+        dialect = db.engine.dialect.name
+        with db.engine.begin() as conn:
+            if dialect == "sqlite":
+                conn.execute(text("INSERT INTO users_fts(users_fts) VALUES ('rebuild')"))
+                conn.execute(text("INSERT INTO users_fts(users_fts) VALUES ('optimize')"))
+            elif dialect == "postgresql":
+                conn.execute(text("REINDEX INDEX ix_users_search_trgm"))
+
+    def apply(self, query, term: str, ranked: bool = False):
+        """
+        为用户查询添加搜索条件
+
+        关键词以 * 结尾时按前缀匹配，否则按子串匹配。
+
+        Args:
+            query: User 查询
+            term (str): 搜索关键词
+            ranked (bool): 是否按相关度排序
+
+        Returns:
+            添加了过滤（和排序）条件的查询
+        """
+        prefix = term.endswith("*")
+        term = term.rstrip("*").strip()
+        if not term:
+            return query
+
+        backend = self.backend
+        if len(term) < MIN_INDEXED_TERM_LENGTH or backend == "like":
+            escaped = self._escape(term)
+            pattern = f"{escaped}%" if prefix else f"%{escaped}%"
+            return query.filter(self._like_clause(pattern))
+
+        if backend == "fts5":
+            phrase = '"' + term.replace('"', '""') + '"'
+            matches = text(
+                "SELECT rowid AS id, bm25(users_fts) AS score FROM users_fts WHERE users_fts MATCH :phrase"
+            ).bindparams(phrase=phrase).columns(id=Integer, score=Float).subquery()
+            query = query.join(matches, matches.c.id == User.id)
+            order = matches.c.score.asc()
+        else:
+            expr = literal_column(_POSTGRES_SEARCH_EXPR)
+            query = query.filter(expr.ilike(f"%{self._escape(term)}%", escape="\\"))
+            order = db.func.similarity(expr, term).desc()
+
+        if prefix:
+            query = query.filter(self._like_clause(f"{self._escape(term)}%"))
+        if ranked:
+            query = query.order_by(order)
+        return query
+
+    @staticmethod
+    def _escape(term: str) -> str:
+        return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+    @staticmethod
+    def _like_clause(pattern: str):
+        return or_(
+            User.username.ilike(pattern, escape="\\"),
+            User.nickname.ilike(pattern, escape="\\"),
+            User.email.ilike(pattern, escape="\\")
+        )
+
+
+# 创建服务实例
+user_search_index = UserSearchIndex()
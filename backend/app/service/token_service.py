@@ -0,0 +1,225 @@
+"""
+令牌吊销服务
+
+按 JWT 的 jti 记录已吊销的令牌，并接入 flask_jwt_extended 的 blocklist 检查：
+- 持久层: revoked_tokens 表，多个 worker 共享
+- 内存层: 布隆过滤器 + 确认结果缓存。未吊销的令牌（绝大多数请求）在布隆过滤器
+  处即可判定，不产生数据库查询；命中布隆过滤器时才回表确认
+- 各进程每隔 TOKEN_REVOCATION_SYNC_SECONDS 增量拉取其他 worker 新吊销的 jti
+- 后台线程每隔 TOKEN_REVOCATION_SWEEP_SECONDS 清理已过期的记录并重建过滤器（为 0 时不启动，
+  由 flask tokens sweep 定时执行）。清理在独立事务中进行，不占用请求的会话，也不阻塞吊销检查
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta, UTC
+from typing import Any, Dict, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from app.model import db
+from app.model.token import RevokedToken
+from app.utils.bloom import BloomFilter
+from app.utils.cache import TTLCache
+from app.utils.responses import fail
+
+# 增量同步时回看的时间窗口，覆盖其他 worker 写入时间与提交时间之间的差值
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class TokenRevocationStore:
+    """令牌吊销存储"""
+
+    def __init__(self):
+        self.sync_interval = 5.0
+        self.sweep_interval = 3600.0
+        self.bloom_capacity = 100000
+        self._bloom: Optional[BloomFilter] = None
+        self._confirmed = TTLCache(maxsize=10000, ttl=300.0)
+        self._synced_at: Optional[datetime] = None
+        self._next_sync = 0.0
+        self._app = None
+        self._lock = threading.Lock()
+        self._sweep_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_pid: Optional[int] = None
+        self.bloom_rejects = 0
+        self.db_lookups = 0
+
+    def init_app(self, app) -> None:
+        """加载配置并注册 flask_jwt_extended 的 blocklist 回调"""
+        self.sync_interval = app.config.get("TOKEN_REVOCATION_SYNC_SECONDS", 5.0)
+        self.sweep_interval = app.config.get("TOKEN_REVOCATION_SWEEP_SECONDS", 3600.0)
+        self.bloom_capacity = app.config.get("TOKEN_REVOCATION_BLOOM_CAPACITY", 100000)
+        self._app = app
+        self.reset()
+
+        jwt = app.extensions["flask-jwt-extended"]
+        jwt.token_in_blocklist_loader(self._blocklist_loader)
+        jwt.revoked_token_loader(lambda jwt_header, jwt_payload: fail(401, "令牌已失效，请重新登录"))
+
+    def reset(self) -> None:
+        """清空内存状态，下次检查时从数据库重新加载"""
+        with self._lock:
+            self._bloom = None
+            self._synced_at = None
+            self._next_sync = 0.0
+        self._confirmed.clear()
+
+    def _blocklist_loader(self, jwt_header: Dict[str, Any], jwt_payload: Dict[str, Any]) -> bool:
+        jti = jwt_payload.get("jti")
+        return bool(jti) and self.is_revoked(jti)
+
+    def revoke(self, jti: str, expires_at: datetime, user_id: Optional[int] = None) -> None:
+        """
+        吊销令牌
+
+        Args:
+            jti (str): 令牌唯一标识
+            expires_at (datetime): 令牌过期时间，过期后记录可被清理
+            user_id (Optional[int]): 令牌所属用户ID
+        """
+        if not db.session.get(RevokedToken, jti):
+            db.session.add(RevokedToken(jti=jti, user_id=user_id, expires_at=expires_at))
+            try:
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+        self._ensure_loaded()
+        with self._lock:
+            self._bloom.add(jti)
+        self._confirmed.set(jti, True)
+
+    def is_revoked(self, jti: str) -> bool:
+        """
+        判断令牌是否已吊销
+
+        Args:
+            jti (str): 令牌唯一标识
+
+        Returns:
+            bool: 是否已吊销
+        """
+        self._maybe_refresh()
+        if jti not in self._bloom:
+            self.bloom_rejects += 1
+            return False
+        confirmed = self._confirmed.get(jti)
+        if confirmed is not None:
+            return confirmed
+        self.db_lookups += 1
+        revoked = db.session.get(RevokedToken, jti) is not None
+        self._confirmed.set(jti, revoked)
+        return revoked
+
+    def sweep(self) -> int:
+        """
+        删除已过期的吊销记录并重建布隆过滤器
+
+        删除在独立连接的事务中执行，不会提交调用方会话中的未完成修改；
+        同一时间只有一个线程执行清理，其余调用直接返回 0
+
+        Returns:
+            int: 删除的记录数
+        """
+        if not self._sweep_lock.acquire(blocking=False):
+            return 0
+        try:
+            table = RevokedToken.__table__
+            with db.engine.begin() as conn:
+                deleted = conn.execute(delete(table).where(table.c.expires_at < datetime.now(UTC))).rowcount
+            with self._lock:
+                # 新过滤器构建完成后整体替换，并发检查始终能读到完整的过滤器
+                self._bloom = self._load_bloom()
+            self._confirmed.clear()
+            return deleted
+        finally:
+            self._sweep_lock.release()
+
+    def shutdown(self) -> None:
+        """停止后台清理线程"""
+        self._stopping.set()
+        thread = self._sweeper
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self._sweeper = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取吊销检查统计
+
+        Returns:
+            Dict[str, Any]: 过滤器规模、直接放行次数与回表次数
+        """
+        return {
+            'bloom_items': len(self._bloom) if self._bloom is not None else 0,
+            'bloom_rejects': self.bloom_rejects,
+            'db_lookups': self.db_lookups,
+            'confirmed_cache': self._confirmed.stats()
+        }
+
+    def _load_bloom(self) -> BloomFilter:
+        now = datetime.now(UTC)
+        table = RevokedToken.__table__
+        with db.engine.connect() as conn:
+            jtis = list(conn.scalars(select(table.c.jti).where(table.c.expires_at >= now)))
+        bloom = BloomFilter(max(self.bloom_capacity, len(jtis) * 2))
+        for jti in jtis:
+            bloom.add(jti)
+        self._synced_at = now
+        self._next_sync = time.monotonic() + self.sync_interval
+        return bloom
+
+    def _ensure_loaded(self) -> None:
+        if self._bloom is not None:
+            return
+        with self._lock:
+            if self._bloom is None:
+                self._bloom = self._load_bloom()
+
+    def _ensure_sweeper(self) -> None:
+        # fork 之后子进程中不存在父进程的线程，按 pid 判断是否需要重新启动
+        if self.sweep_interval <= 0 or self._app is None:
+            return
+        pid = os.getpid()
+        if self._sweeper is not None and self._sweeper_pid == pid and self._sweeper.is_alive():
+            return
+        with self._lock:
+            if self._sweeper is not None and self._sweeper_pid == pid and self._sweeper.is_alive():
+                return
+            self._stopping.clear()
+            self._sweeper = threading.Thread(target=self._run_sweeper, name="token-revocation-sweeper", daemon=True)
+            self._sweeper_pid = pid
+            self._sweeper.start()
+
+    def _run_sweeper(self) -> None:
+        while not self._stopping.wait(self.sweep_interval):
+            app = self._app
+            try:
+                with app.app_context():
+                    self.sweep()
+            except Exception:
+                app.logger.exception("清理过期吊销记录失败")
+
+    def _maybe_refresh(self) -> None:
+        self._ensure_loaded()
+        self._ensure_sweeper()
+        now = time.monotonic()
+        if now < self._next_sync:
+            return
+        with self._lock:
+            if now < self._next_sync:
+                return
+            self._next_sync = now + self.sync_interval
+            since, self._synced_at = self._synced_at - SYNC_OVERLAP, datetime.now(UTC)
+            rows = db.session.query(RevokedToken.jti).filter(RevokedToken.revoked_at >= since)
+            for row in rows:
+                if row.jti not in self._bloom:
+                    self._bloom.add(row.jti)
+                # 之前因布隆误判而缓存的“未吊销”结论可能已过时
+                self._confirmed.delete(row.jti)
+
+
+# 创建服务实例
+token_revocation = TokenRevocationStore()
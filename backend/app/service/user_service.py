@@ -5,19 +5,63 @@
 暂时使用模拟数据，不连接实际数据库。
 """
 
+import hashlib
 import re
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+from sqlalchemy import or_
 from app.exception.api_exception import ApiException
 from app.model import db
-from app.model.user import User
+from app.model.user import User, PUBLIC_FIELDS
+from app.utils.cache import TTLCache
+from app.utils.cursor import encode_cursor, decode_cursor
+from app.service.search_service import user_search_index
+
+# 用户列表支持的排序方式
+LIST_SORTS = ('id', 'relevance', 'created_at', 'last_login_at')
 
 
 class UserService:
     """用户服务类"""
     
     def __init__(self):
-        pass
+        # 身份缓存：JWT 接口每次请求都要按ID取用户，短 TTL 缓存可省去数据库往返
+        self._identity_cache = TTLCache(maxsize=4096, ttl=5.0)
+        # 用户列表总数缓存，按搜索关键词区分
+        self._count_cache = TTLCache(maxsize=256, ttl=30.0)
+        # 版本戳缓存：(updated_at, last_login_at)，条件请求命中时无需加载用户数据
+        self._version_cache = TTLCache(maxsize=4096, ttl=5.0)
+    
+    def init_app(self, app) -> None:
+        """从应用配置加载身份缓存参数"""
+        self._identity_cache.configure(
+            app.config.get("USER_CACHE_SIZE", 4096),
+            app.config.get("USER_CACHE_TTL", 5.0)
+        )
+        self._count_cache.configure(256, app.config.get("USER_COUNT_CACHE_TTL", 30.0))
+        self._version_cache.configure(
+            app.config.get("USER_CACHE_SIZE", 4096),
+            app.config.get("USER_CACHE_TTL", 5.0)
+        )
+    
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        使指定用户的缓存失效
+        
+        Args:
+            user_id (int): 用户ID
+        """
+        self._identity_cache.delete(user_id)
+        self._version_cache.delete(user_id)
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        获取身份缓存命中统计
+        
+        Returns:
+            Dict[str, Any]: 缓存统计信息
+        """
+        return self._identity_cache.stats()
     
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -35,10 +79,45 @@ class UserService:
         if not isinstance(user_id, int) or user_id <= 0:
             raise ApiException(400, "用户ID必须是正整数")
         
+        cached = self._identity_cache.get(user_id)
+        if cached is not None:
+            return dict(cached)
+        
         user = db.session.get(User, user_id)
         if not user:
             return None
-        return user.to_dict()
+        user_dict = user.to_dict()
+        self._identity_cache.set(user_id, user_dict)
+        return dict(user_dict)
+    
+    def get_user_version(self, user_id: int) -> Optional[Tuple[str, datetime]]:
+        """
+        获取用户数据的版本戳，用于 HTTP 条件请求
+        
+        版本由 updated_at 与 last_login_at 决定：资料修改会更新 updated_at，登录只更新
+        last_login_at。优先从身份缓存或版本戳缓存中读取，未命中时只查询这两列。
+        
+        Args:
+            user_id (int): 用户ID
+            
+        Returns:
+            Optional[Tuple[str, datetime]]: (ETag, 最后修改时间)，用户不存在时返回None
+        """
+        cached = self._identity_cache.get(user_id)
+        if cached is not None:
+            stamps = (cached['updated_at'], cached['last_login_at'])
+        else:
+            stamps = self._version_cache.get(user_id)
+            if stamps is None:
+                row = db.session.query(User.updated_at, User.last_login_at).filter(User.id == user_id).first()
+                if row is None:
+                    return None
+                stamps = tuple(value.isoformat() if value else None for value in row)
+                self._version_cache.set(user_id, stamps)
+        
+        digest = hashlib.blake2b(f"{user_id}|{stamps[0]}|{stamps[1]}".encode(), digest_size=8).hexdigest()
+        last_modified = max(datetime.fromisoformat(value) for value in stamps if value)
+        return f"u{user_id}-{digest}", last_modified
     
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """
@@ -56,6 +135,23 @@ class UserService:
         user = User.query.filter_by(username=username).first()
         return user.to_dict() if user else None
     
+    def login_query(self, identifier: str):
+        """
+        按登录标识构造用户查询：包含 @ 时按邮箱查找，否则按用户名查找，均不区分大小写
+        
+        用户名不允许包含 @，两种标识不会混淆。比较表达式与 lower(username) /
+        lower(email) 唯一函数索引一致，查询是一次索引点查，不需要 OR 两列。
+        
+        Args:
+            identifier (str): 用户名或邮箱
+            
+        Returns:
+            Query: 最多匹配一个用户的查询
+        """
+        identifier = identifier.strip().lower()
+        column = User.email if '@' in identifier else User.username
+        return User.query.filter(db.func.lower(column) == identifier)
+    
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """
         根据邮箱获取用户信息
@@ -82,27 +178,83 @@ class UserService:
         Returns:
             Optional[Dict[str, Any]]: 用户公开信息字典
         """
-        user = self.get_user_by_id(user_id)
-        if not user:
-            return None
+        if not isinstance(user_id, int) or user_id <= 0:
+            raise ApiException(400, "用户ID必须是正整数")
+        
+        # 身份缓存中已有完整信息时直接截取公开字段
+        cached = self._identity_cache.get(user_id)
+        if cached is not None:
+            return {field: cached[field] for field in PUBLIC_FIELDS}
+        
+        row = db.session.query(*User.public_columns()).filter(User.id == user_id).first()
+        return row._asdict() if row else None
+    
+    def get_users_public_info(self, user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        批量获取用户公开信息
+        
+        先从身份缓存中截取，其余ID合并为一次 IN 投影查询，避免逐个查询的 N+1 问题。
+        
+        Args:
+            user_ids (List[int]): 用户ID列表，可包含重复ID
             
-        # 返回公开信息，排除敏感字段
-        return {
-            'id': user['id'],
-            'username': user['username'],
-            'nickname': user['nickname'],
-            'avatar': user['avatar'],
-            'permission': user['permission'],
-            'created_at': user['created_at']
-        }
+        Returns:
+            Dict[int, Dict[str, Any]]: 用户ID到公开信息的映射，不存在的用户不包含在内
+        """
+        result: Dict[int, Dict[str, Any]] = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            cached = self._identity_cache.get(user_id)
+            if cached is not None:
+                result[user_id] = {field: cached[field] for field in PUBLIC_FIELDS}
+            else:
+                missing.append(user_id)
+        if missing:
+            rows = db.session.query(*User.public_columns()).filter(User.id.in_(missing)).all()
+            for row in rows:
+                result[row.id] = row._asdict()
+        return result
     
-    def validate_user_data(self, user_data: Dict[str, Any], is_update: bool = False) -> Dict[str, str]:
+    def find_conflicts(self, username: Optional[str], email: Optional[str]) -> Dict[str, str]:
+        """
+        检查用户名和邮箱是否已被占用
+        
+        两个字段合并为一次查询，只取唯一列，不构造 User 对象。比较不区分大小写，
+        命中 lower(username) / lower(email) 唯一函数索引。
+        
+        Args:
+            username (Optional[str]): 用户名，为None时不检查
+            email (Optional[str]): 邮箱，为None时不检查
+            
+        Returns:
+            Dict[str, str]: 冲突字段对应的错误信息，没有冲突则返回空字典
+        """
+        conditions = []
+        if username:
+            conditions.append(db.func.lower(User.username) == username.lower())
+        if email:
+            conditions.append(db.func.lower(User.email) == email.lower())
+        if not conditions:
+            return {}
+        
+        errors = {}
+        rows = db.session.query(User.username, User.email).filter(or_(*conditions)).limit(2).all()
+        for row_username, row_email in rows:
+            if username and row_username.lower() == username.lower():
+                errors['username'] = '用户名已存在'
+            if email and row_email.lower() == email.lower():
+                errors['email'] = '邮箱已存在'
+        return errors
+    
+    def validate_user_data(self, user_data: Dict[str, Any], is_update: bool = False,
+                           check_unique: bool = True) -> Dict[str, str]:
         """
         验证用户数据
         
         Args:
             user_data (Dict[str, Any]): 用户数据
             is_update (bool): 是否为更新操作
+            check_unique (bool): 注册时是否查询数据库检查用户名和邮箱唯一性
             
         Returns:
             Dict[str, str]: 验证错误信息，如果验证通过则返回空字典
@@ -118,8 +270,6 @@ class UserService:
                 errors['username'] = '用户名长度必须在3-50个字符之间'
             elif not re.match(r'^[a-zA-Z0-9_]+$', username):
                 errors['username'] = '用户名只能包含字母、数字和下划线'
-            elif not is_update and self.get_user_by_username(username):
-                errors['username'] = '用户名已存在'
         elif not is_update:
             errors['username'] = '用户名不能为空'
         
@@ -140,8 +290,6 @@ class UserService:
                 errors['email'] = '邮箱不能为空'
             elif not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
                 errors['email'] = '邮箱格式不正确'
-            elif not is_update and self.get_user_by_email(email):
-                errors['email'] = '邮箱已存在'
         elif not is_update:
             errors['email'] = '邮箱不能为空'
         
@@ -166,6 +314,16 @@ class UserService:
                 except (ValueError, TypeError):
                     errors['permission'] = '权限等级必须是整数'
         
+        # 唯一性检查（仅在注册时），只检查格式合法的字段
+        if not is_update and check_unique:
+            candidates = {
+                field: user_data[field].strip()
+                for field in ('username', 'email')
+                if field in user_data and field not in errors
+            }
+            if candidates:
+                errors.update(self.find_conflicts(candidates.get('username'), candidates.get('email')))
+        
         return errors
     
     def update_user_info(self, user_id: int, update_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -203,35 +361,138 @@ class UserService:
             except (ValueError, TypeError):
                 pass
         db.session.commit()
+        self.invalidate_user(user_id)
         return user_obj.to_dict()
     
-    def get_users_list(self, page: int = 1, per_page: int = 10, search: str = None) -> Dict[str, Any]:
+    def _count_users(self, query, cache_key: str, filtered: bool, count: str) -> Optional[int]:
+        """
+        按计数模式统计用户总数
+        
+        Args:
+            query: 已应用过滤条件的查询
+            cache_key (str): 计数缓存键，由搜索关键词与筛选条件组成
+            filtered (bool): 是否带有搜索或筛选条件
+            count (str): 计数模式，exact 精确计数 / cached 缓存计数 / estimate 估算 / none 不计数
+            
+        Returns:
+            Optional[int]: 用户总数，none 模式返回None
+        """
+        if count == 'none':
+            return None
+        if count == 'exact':
+            return query.count()
+        if count == 'estimate' and not filtered:
+            # 无过滤条件时用主键最大值估算，只需一次索引查找
+            return db.session.query(db.func.max(User.id)).scalar() or 0
+        total = self._count_cache.get(cache_key)
+        if total is None:
+            total = query.count()
+            self._count_cache.set(cache_key, total)
+        return total
+    
+    def list_query(self, search: Optional[str] = None, is_active: Optional[bool] = None,
+                   permission: Optional[int] = None, sort: str = 'id'):
+        """
+        构造用户列表的投影查询（已排序，未分页）
+        
+        各排序与筛选组合对应的索引见 User.__table_args__，执行计划由
+        `flask schema check-plans` 检查。
+        
+        Args:
+            search (Optional[str]): 搜索关键词
+            is_active (Optional[bool]): 按激活状态筛选
+            permission (Optional[int]): 按权限等级筛选
+            sort (str): id 升序 / relevance 搜索相关度 / created_at 注册时间倒序 /
+                last_login_at 最近登录倒序
+                
+        Returns:
+            Query: 用户列表查询
+        """
+        # 投影查询：只取公开列，每行是轻量的 Row 元组，序列化时直接转为一个字典
+        query = db.session.query(*User.public_columns('is_active'))
+        if is_active is not None:
+            query = query.filter(User.is_active.is_(is_active))
+        if permission is not None:
+            query = query.filter(User.permission == permission)
+        if search:
+            query = user_search_index.apply(query, search, ranked=(sort == 'relevance'))
+        if sort == 'created_at':
+            return query.order_by(User.created_at.desc(), User.id.desc())
+        if sort == 'last_login_at':
+            # 从未登录（NULL）的用户排在最后
+            return query.order_by(User.last_login_at.desc(), User.id.desc())
+        # relevance 的相关度排序已由搜索索引加入 ORDER BY，这里按ID决定并列顺序
+        return query.order_by(User.id.asc())
+    
+    def get_users_list(self, page: int = 1, per_page: int = 10, search: str = None,
+                       cursor: Optional[str] = None, count: Optional[str] = None,
+                       sort: str = 'id', is_active: Optional[bool] = None,
+                       permission: Optional[int] = None) -> Dict[str, Any]:
         """
         获取用户列表
         
+        支持两种分页方式：传入 cursor 时按 User.id 做键集分页（WHERE id > ?），
+        翻页代价与页深无关；否则沿用 page/per_page 偏移分页。
+        
         Args:
-            page (int): 页码
+            page (int): 页码（偏移分页）
             per_page (int): 每页数量
-            search (str): 搜索关键词
+            search (str): 搜索关键词，以 * 结尾表示前缀匹配，否则为子串匹配
+            cursor (Optional[str]): 分页游标，空字符串表示第一页（键集分页）
+            count (Optional[str]): 计数模式 exact / cached / estimate / none，
+                默认偏移分页为 exact、键集分页为 none
+            sort (str): 排序方式 id / relevance / created_at / last_login_at，
+                除 id 外仅在偏移分页时可用，relevance 需要搜索关键词
+            is_active (Optional[bool]): 按激活状态筛选
+            permission (Optional[int]): 按权限等级筛选
             
         Returns:
             Dict[str, Any]: 包含用户列表和分页信息的字典
+            
+        Raises:
+            ApiException: 游标、计数模式或排序方式无效时抛出异常
         """
-        query = User.query
-        if search:
-            like = f"%{search}%"
-            query = query.filter((User.username.like(like)) | (User.nickname.like(like)) | (User.email.like(like)))
-        total = query.count()
-        users = query.order_by(User.id.asc()).offset((page - 1) * per_page).limit(per_page).all()
-        public_users = [u.to_public_dict() | {'is_active': u.is_active} for u in users]
-        return {
-            'users': public_users,
-            'pagination': {
+        if count is None:
+            count = 'exact' if cursor is None else 'none'
+        if count not in ('exact', 'cached', 'estimate', 'none'):
+            raise ApiException(400, "无效的计数模式")
+        if sort not in LIST_SORTS:
+            raise ApiException(400, "无效的排序方式")
+        if sort != 'id' and cursor is not None:
+            raise ApiException(400, "键集分页仅支持按ID排序")
+        
+        query = self.list_query(search, is_active, permission, sort)
+        filtered = bool(search) or is_active is not None or permission is not None
+        cache_key = f"{search or ''}|{is_active}|{permission}"
+        total = self._count_users(query.order_by(None), cache_key, filtered, count)
+        
+        if cursor is None:
+            users = query.offset((page - 1) * per_page).limit(per_page).all()
+            pagination = {
                 'page': page,
                 'per_page': per_page,
                 'total': total,
-                'pages': (total + per_page - 1) // per_page
+                'pages': (total + per_page - 1) // per_page if total is not None else None
             }
+        else:
+            after_id = decode_cursor(cursor).get('id', 0) if cursor else 0
+            if not isinstance(after_id, int):
+                raise ApiException(400, "无效的分页游标")
+            # 多取一条用于判断是否还有下一页
+            users = query.filter(User.id > after_id).limit(per_page + 1).all()
+            has_more = len(users) > per_page
+            users = users[:per_page]
+            pagination = {
+                'per_page': per_page,
+                'total': total,
+                'has_more': has_more,
+                'next_cursor': encode_cursor({'id': users[-1].id}) if has_more else None
+            }
+        
+        public_users = [row._asdict() for row in users]
+        return {
+            'users': public_users,
+            'pagination': pagination
         }
 
 
@@ -0,0 +1,229 @@
+"""
+响应压缩
+
+- 动态响应: after_request 中按 Accept-Encoding 选择 brotli（安装了 brotli 包时）或 gzip，
+  小于 COMPRESS_MIN_SIZE 的响应不压缩；超过 COMPRESS_STREAM_MIN_SIZE 的响应和流式响应
+  按块边压缩边发送，不必等整个响应体压缩完成
+- 静态文件: /static 下的文件首次请求时压缩一次并缓存到磁盘（按源文件修改时间失效），
+  之后直接发送压缩好的文件；JPEG/PNG 等已压缩格式及压缩收益不足的文件原样发送
+"""
+
+import gzip
+import mimetypes
+import os
+import zlib
+from typing import Iterable, Iterator, Optional
+from flask import abort, current_app, request, send_file
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 取决于部署环境
+    brotli = None
+
+# 动态响应中值得压缩的类型
+COMPRESSIBLE_MIMETYPES = {
+    "application/json", "application/javascript", "text/html", "text/css", "text/plain",
+    "text/csv", "text/javascript", "application/xml", "image/svg+xml", "application/x-ndjson",
+}
+# 本身已经压缩过的静态文件格式，再压缩只浪费 CPU
+PRECOMPRESSED_FORMATS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".avif", ".woff", ".woff2",
+    ".gz", ".br", ".zip", ".mp3", ".mp4", ".webm",
+}
+_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+# 压缩后不小于原文件的该比例时不值得压缩
+_MIN_SAVING_RATIO = 0.95
+_CHUNK_SIZE = 16 * 1024
+
+
+class Compression:
+    """
+    响应压缩扩展
+
+    配置项（从 Flask 配置读取）:
+        COMPRESS_ENABLED: 是否压缩动态响应与静态文件
+        COMPRESS_MIN_SIZE: 动态响应的最小压缩字节数
+        COMPRESS_STREAM_MIN_SIZE: 超过该字节数的响应改为分块流式压缩
+        COMPRESS_GZIP_LEVEL: gzip 压缩级别（动态响应）
+        COMPRESS_BROTLI_QUALITY: brotli 压缩质量（动态响应，静态文件固定用最高质量）
+        COMPRESS_CACHE_DIR: 静态文件压缩缓存目录，默认 instance/static-cache
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.min_size = 1024
+        self.stream_min_size = 256 * 1024
+        self.gzip_level = 6
+        self.brotli_quality = 5
+        self.cache_dir: Optional[str] = None
+
+    def init_app(self, app) -> None:
+        """加载配置，注册压缩钩子并接管静态文件路由"""
+        self.enabled = app.config.get("COMPRESS_ENABLED", True)
+        self.min_size = app.config.get("COMPRESS_MIN_SIZE", 1024)
+        self.stream_min_size = app.config.get("COMPRESS_STREAM_MIN_SIZE", 256 * 1024)
+        self.gzip_level = app.config.get("COMPRESS_GZIP_LEVEL", 6)
+        self.brotli_quality = app.config.get("COMPRESS_BROTLI_QUALITY", 5)
+        self.cache_dir = app.config.get("COMPRESS_CACHE_DIR") or os.path.join(app.instance_path, "static-cache")
+        app.after_request(self.compress_response)
+        if "static" in app.view_functions:
+            app.view_functions["static"] = self.send_static
+
+    def choose_encoding(self) -> Optional[str]:
+        """
+        按 Accept-Encoding 选择压缩算法
+
+        Returns:
+            Optional[str]: "br" / "gzip"，客户端不接受压缩时返回None
+        """
+        accepted = request.accept_encodings
+        gzip_quality = accepted.quality("gzip")
+        if brotli is not None and accepted.quality("br") > 0 and accepted.quality("br") >= gzip_quality:
+            return "br"
+        return "gzip" if gzip_quality > 0 else None
+
+    def compress_response(self, response):
+        """after_request 钩子：压缩符合条件的动态响应"""
+        if (not self.enabled or response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES
+                or "no-transform" in response.headers.get("Cache-Control", "")):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            self._stream(response, response.response, encoding)
+            return response
+        body = response.get_data()
+        if len(body) < self.min_size:
+            return response
+        if len(body) >= self.stream_min_size:
+            chunks = (body[start:start + _CHUNK_SIZE] for start in range(0, len(body), _CHUNK_SIZE))
+            self._stream(response, chunks, encoding)
+            return response
+        response.set_data(self._compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    def send_static(self, filename: str):
+        """
+        发送静态文件，客户端接受压缩时优先发送磁盘上缓存的压缩版本
+
+        Args:
+            filename (str): static 目录下的相对路径
+
+        Returns:
+            Response: 文件响应
+        """
+        app = current_app
+        path = safe_join(app.static_folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        encoding = self.choose_encoding() if self.enabled else None
+        compressed = self.precompressed_path(filename, encoding) if encoding else None
+        if compressed is None:
+            response = app.send_static_file(filename)
+        else:
+            response = send_file(
+                compressed,
+                mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+                max_age=app.get_send_file_max_age(filename),
+                conditional=True,
+            )
+            response.headers["Content-Encoding"] = encoding
+        if self.enabled and os.path.splitext(filename)[1].lower() not in PRECOMPRESSED_FORMATS:
+            response.vary.add("Accept-Encoding")
+        return response
+
+    def precompressed_path(self, filename: str, encoding: str) -> Optional[str]:
+        """
+        获取静态文件的压缩缓存路径，缓存不存在或已过期时生成
+
+        Args:
+            filename (str): static 目录下的相对路径
+            encoding (str): "gzip" / "br"
+
+        Returns:
+            Optional[str]: 压缩文件路径，不值得压缩时返回None
+        """
+        if os.path.splitext(filename)[1].lower() in PRECOMPRESSED_FORMATS:
+            return None
+        source = safe_join(current_app.static_folder, filename)
+        target = safe_join(self.cache_dir, filename + _SUFFIXES[encoding])
+        if source is None or target is None:
+            return None
+        source_mtime = os.stat(source).st_mtime_ns
+        # 压缩收益不足时只留一个空的标记文件，避免每次请求都重新尝试
+        marker = target + ".skip"
+        for candidate in (target, marker):
+            try:
+                if os.stat(candidate).st_mtime_ns == source_mtime:
+                    return target if candidate == target else None
+            except FileNotFoundError:
+                pass
+
+        with open(source, "rb") as f:
+            data = f.read()
+        compressed = self._compress(data, encoding, static=True)
+        worth_it = len(compressed) < len(data) * _MIN_SAVING_RATIO
+        path = target if worth_it else marker
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再原子替换，多个 worker 同时生成时不会读到半个文件
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(compressed if worth_it else b"")
+        os.utime(tmp, ns=(source_mtime, source_mtime))
+        os.replace(tmp, path)
+        return target if worth_it else None
+
+    def precompress_static(self) -> int:
+        """
+        预先压缩 static 目录下的全部文件（部署时执行，避免首个请求承担压缩开销）
+
+        Returns:
+            int: 生成或已有压缩缓存的文件数
+        """
+        static_folder = current_app.static_folder
+        if not static_folder or not os.path.isdir(static_folder):
+            return 0
+        encodings = ["gzip"] + (["br"] if brotli is not None else [])
+        count = 0
+        for root, _, files in os.walk(static_folder):
+            for name in files:
+                filename = os.path.relpath(os.path.join(root, name), static_folder).replace(os.sep, "/")
+                results = [self.precompressed_path(filename, encoding) for encoding in encodings]
+                count += any(results)
+        return count
+
+    def _compress(self, data: bytes, encoding: str, static: bool = False) -> bytes:
+        if encoding == "br":
+            return brotli.compress(data, quality=11 if static else self.brotli_quality)
+        return gzip.compress(data, compresslevel=9 if static else self.gzip_level, mtime=0)
+
+    def _stream(self, response, chunks: Iterable[bytes], encoding: str) -> None:
+        response.response = self._compress_chunks(chunks, encoding)
+        response.headers["Content-Encoding"] = encoding
+        response.headers.pop("Content-Length", None)
+
+    def _compress_chunks(self, chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            compress, finish = compressor.process, compressor.finish
+        else:
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+            compress, finish = compressor.compress, compressor.flush
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = compress(chunk)
+            if data:
+                yield data
+        yield finish()
+
+
+# 创建扩展实例
+compression = Compression()
@@ -0,0 +1,47 @@
+"""
+分页游标工具
+
+游标是对定位信息（如最后一条记录的ID）的不透明编码，客户端原样回传即可。
+"""
+
+import base64
+import json
+from typing import Any, Dict
+from app.exception.api_exception import ApiException
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """
+    将定位信息编码为不透明游标
+
+    Args:
+        position (Dict[str, Any]): 定位信息，如 {"id": 42}
+
+    Returns:
+        str: URL 安全的游标字符串
+    """
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    解码游标
+
+    Args:
+        cursor (str): encode_cursor 生成的游标
+
+    Returns:
+        Dict[str, Any]: 定位信息
+
+    Raises:
+        ApiException: 游标格式无效时抛出 400
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ApiException(400, "无效的分页游标")
+    if not isinstance(position, dict):
+        raise ApiException(400, "无效的分页游标")
+    return position
@@ -0,0 +1,72 @@
+"""
+高性能 JSON Provider
+
+安装了 orjson 时使用 orjson 编码，否则回退到标准库 json。两种后端输出一致：
+紧凑格式（不缩进、不排序键）、非 ASCII 字符原样输出、datetime/date 按 ISO 8601 输出。
+"""
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime
+from typing import Any
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 取决于部署环境
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(JSONProvider):
+    """orjson 优先、标准库兜底的 JSON Provider"""
+
+    backend = "orjson" if orjson is not None else "json"
+    mimetype = "application/json"
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """
+        将对象编码为 UTF-8 JSON 字节串
+
+        Args:
+            obj (Any): 待编码对象
+
+        Returns:
+            bytes: JSON 字节串
+        """
+        if orjson is not None:
+            return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            kwargs.setdefault("default", _default)
+            kwargs.setdefault("ensure_ascii", False)
+            return json.dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
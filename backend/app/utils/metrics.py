@@ -0,0 +1,312 @@
+"""
+请求与数据库指标
+
+- 请求: 按 endpoint / method / status 记录延迟直方图，以及每个请求的 SQL 语句数
+- 数据库: 通过 SQLAlchemy 的 before/after_cursor_execute 事件记录每条语句的耗时
+- 密码哈希: 记录哈希与校验耗时（认证接口的主要 CPU 开销）
+- 慢请求: 超过 METRICS_SLOW_REQUEST_MS 的请求写一条 WARNING 日志，包含 SQL 与哈希耗时
+
+指标写入当前线程独占的分片，记录时不加锁；/metrics 抓取时合并全部分片并输出
+Prometheus 文本格式。每个 gunicorn worker 独立统计，抓取请求由哪个 worker 处理
+就返回哪个 worker 的数据（pid 见 process_id 标签）。
+
+/metrics 暴露 endpoint 名称、延迟与内部计数，配置 METRICS_TOKEN 后需携带
+Authorization: Bearer <令牌> 访问；生产环境未配置令牌时不注册该接口，只采集指标与记录慢请求。
+"""
+
+import hmac
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Tuple
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class _Shard:
+    """单个线程的指标分片，只由所属线程写入"""
+    __slots__ = ("histograms", "counters")
+
+    def __init__(self):
+        self.histograms: Dict[Tuple[str, tuple], list] = {}
+        self.counters: Dict[Tuple[str, tuple], float] = {}
+
+
+class MetricsRegistry:
+    """
+    按线程分片的指标注册表
+
+    Args:
+        namespace (str): 指标名前缀
+    """
+
+    def __init__(self, namespace: str = "jufirex"):
+        self.namespace = namespace
+        self._meta: Dict[str, Tuple[str, str, Tuple[str, ...], tuple]] = {}
+        self._shards: List[_Shard] = []
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...], buckets: tuple = DEFAULT_BUCKETS) -> None:
+        """声明直方图"""
+        self._meta[name] = ("histogram", help_text, labels, tuple(buckets))
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...]) -> None:
+        """声明计数器"""
+        self._meta[name] = ("counter", help_text, labels, ())
+
+    def gauge_collector(self, collector: Callable[[], Dict[str, float]]) -> None:
+        """注册抓取时调用的回调，返回 {指标名: 当前值}，用于输出各服务已有的统计"""
+        self._collectors.append(collector)
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def observe(self, name: str, labels: tuple, value: float) -> None:
+        """向直方图记录一个观测值"""
+        histograms = self._shard().histograms
+        series = histograms.get((name, labels))
+        buckets = self._meta[name][3]
+        if series is None:
+            # [各桶计数（非累计，最后一格为 +Inf）, 总和, 总数]
+            series = histograms[(name, labels)] = [[0] * (len(buckets) + 1), 0.0, 0]
+        series[0][bisect_left(buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def inc(self, name: str, labels: tuple, value: float = 1.0) -> None:
+        """计数器累加"""
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0.0) + value
+
+    def reset(self) -> None:
+        """清空全部指标数据"""
+        with self._lock:
+            self._shards = []
+        self._local = threading.local()
+
+    def render(self) -> str:
+        """
+        合并全部线程分片，输出 Prometheus 文本格式
+
+        Returns:
+            str: 指标文本
+        """
+        histograms: Dict[Tuple[str, tuple], list] = {}
+        counters: Dict[Tuple[str, tuple], float] = {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # 分片可能正被所属线程写入，先复制键集合再读取
+            for key, (counts, total, count) in list(shard.histograms.items()):
+                merged = histograms.setdefault(key, [[0] * len(counts), 0.0, 0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+                merged[2] += count
+            for key, value in list(shard.counters.items()):
+                counters[key] = counters.get(key, 0.0) + value
+
+        lines = []
+        pid = f'process_id="{os.getpid()}"'
+        for name, (kind, help_text, label_names, buckets) in self._meta.items():
+            full_name = f"{self.namespace}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            source = histograms if kind == "histogram" else counters
+            for (series_name, labels), value in sorted(source.items(), key=lambda item: item[0]):
+                if series_name != name:
+                    continue
+                label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in zip(label_names, labels))
+                label_text = f"{label_text},{pid}" if label_text else pid
+                if kind == "counter":
+                    lines.append(f"{full_name}{{{label_text}}} {value:g}")
+                    continue
+                counts, total, count = value
+                cumulative = 0
+                for bound, bucket_count in zip(buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    lines.append(f'{full_name}_bucket{{{label_text},le="{le}"}} {cumulative}')
+                lines.append(f"{full_name}_sum{{{label_text}}} {total:.6f}")
+                lines.append(f"{full_name}_count{{{label_text}}} {count}")
+        for collector in self._collectors:
+            for name, value in collector().items():
+                full_name = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {full_name} gauge")
+                lines.append(f"{full_name}{{{pid}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _service_gauges() -> Dict[str, float]:
+    # 各服务已有的进程内统计，抓取时读取当前值
+    from app.service.activity_service import login_activity
+    from app.service.feed_service import feed_cache
+    from app.service.token_service import token_revocation
+    from app.service.user_service import user_service
+    from app.utils.rate_limit import rate_limiter
+
+    identity = user_service.cache_stats()
+    tokens = token_revocation.stats()
+    feeds = feed_cache.stats()
+    return {
+        "user_cache_hits": identity["hits"],
+        "user_cache_misses": identity["misses"],
+        "token_bloom_rejects": tokens["bloom_rejects"],
+        "token_db_lookups": tokens["db_lookups"],
+        "feed_cache_hits": feeds["hits"],
+        "feed_cache_fallbacks": feeds["fallbacks"],
+        "login_activity_pending": login_activity.pending(),
+        "login_activity_dropped": login_activity.dropped,
+        "rate_limit_rejected": rate_limiter.rejected,
+    }
+
+
+class _RequestStats:
+    __slots__ = ("started", "statements", "db_seconds", "hash_seconds")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.hash_seconds = 0.0
+
+
+class RequestMetrics:
+    """
+    请求指标中间件
+
+    配置项（从 Flask 配置读取）:
+        METRICS_ENABLED: 是否记录指标并开放 /metrics
+        METRICS_PATH: 指标接口路径
+        METRICS_TOKEN: 访问 /metrics 所需的 Bearer 令牌，为空时不校验
+        METRICS_REQUIRE_TOKEN: 为 True 且未配置 METRICS_TOKEN 时不注册 /metrics
+        METRICS_SLOW_REQUEST_MS: 慢请求日志阈值（毫秒），0 或负数表示关闭
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.slow_request_ms = 500.0
+        self.token = None
+        self.registry = MetricsRegistry()
+        self._local = threading.local()
+        self._engine_hooked = False
+        self._declare()
+
+    def _declare(self) -> None:
+        registry = self.registry
+        registry.histogram("http_request_duration_seconds", "请求处理耗时", ("endpoint", "method", "status"))
+        registry.histogram("http_request_db_statements", "单个请求执行的 SQL 语句数", ("endpoint",), COUNT_BUCKETS)
+        registry.histogram("db_statement_duration_seconds", "单条 SQL 语句耗时", ("endpoint",), STATEMENT_BUCKETS)
+        registry.histogram("password_hash_duration_seconds", "密码哈希/校验耗时", ("operation",))
+        registry.counter("slow_requests_total", "超过阈值的慢请求数", ("endpoint",))
+
+    def init_app(self, app) -> None:
+        """注册请求钩子、SQL 事件与 /metrics 接口"""
+        self.enabled = app.config.get("METRICS_ENABLED", True)
+        self.slow_request_ms = app.config.get("METRICS_SLOW_REQUEST_MS", 500)
+        self.token = app.config.get("METRICS_TOKEN") or None
+        self.registry.reset()
+        if not self.enabled:
+            return
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        if self.token or not app.config.get("METRICS_REQUIRE_TOKEN", False):
+            app.add_url_rule(app.config.get("METRICS_PATH", "/metrics"), "metrics", self.render_view)
+        if not self._engine_hooked:
+            # 挂在 Engine 类上，覆盖所有应用与后台线程的连接
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self._engine_hooked = True
+            self.registry.gauge_collector(_service_gauges)
+
+    def observe_hash(self, operation: str, seconds: float) -> None:
+        """
+        记录一次密码哈希耗时（由 PasswordHasher 调用）
+
+        Args:
+            operation (str): hash / verify
+            seconds (float): 耗时（秒）
+        """
+        if not self.enabled:
+            return
+        self.registry.observe("password_hash_duration_seconds", (operation,), seconds)
+        stats = getattr(self._local, "stats", None)
+        if stats is not None:
+            stats.hash_seconds += seconds
+
+    def render_view(self):
+        """/metrics 接口"""
+        if self.token is not None:
+            scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+            if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode(), self.token.encode()):
+                return current_app.response_class("unauthorized\n", status=401, mimetype="text/plain",
+                                                  headers={"WWW-Authenticate": "Bearer"})
+        return current_app.response_class(self.registry.render(), mimetype="text/plain; version=0.0.4")
+
+    def _before_request(self) -> None:
+        self._local.stats = _RequestStats()
+
+    def _after_request(self, response):
+        self._finish(response.status_code)
+        return response
+
+    def _teardown_request(self, exc) -> None:
+        # 未被路由捕获的异常不会经过 after_request，这里补记为 500
+        if getattr(self._local, "stats", None) is not None:
+            self._finish(500)
+
+    def _finish(self, status: int) -> None:
+        stats, self._local.stats = self._local.stats, None
+        if stats is None or request.endpoint == "metrics":
+            return
+        endpoint = request.endpoint or "unmatched"
+        elapsed = time.perf_counter() - stats.started
+        self.registry.observe("http_request_duration_seconds", (endpoint, request.method, str(status)), elapsed)
+        self.registry.observe("http_request_db_statements", (endpoint,), stats.statements)
+        if 0 < self.slow_request_ms <= elapsed * 1000:
+            self.registry.inc("slow_requests_total", (endpoint,))
+            current_app.logger.warning(
+                "慢请求 %s %s -> %s 耗时 %.1fms endpoint=%s sql=%d条/%.1fms hash=%.1fms",
+                request.method, request.path, status, elapsed * 1000, endpoint,
+                stats.statements, stats.db_seconds * 1000, stats.hash_seconds * 1000
+            )
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if not self.enabled:
+            return
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info.get("metrics_started")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        stats = getattr(self._local, "stats", None)
+        endpoint = "background"
+        if stats is not None:
+            stats.statements += 1
+            stats.db_seconds += elapsed
+            endpoint = request.endpoint or "unmatched"
+        self.registry.observe("db_statement_duration_seconds", (endpoint,), elapsed)
+
+
+# 创建扩展实例
+request_metrics = RequestMetrics()
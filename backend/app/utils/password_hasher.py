@@ -0,0 +1,202 @@
+"""
+密码哈希引擎
+
+将 werkzeug 的 generate_password_hash / check_password_hash 放到有界进程池中执行，
+避免 CPU 密集的 scrypt/pbkdf2 计算阻塞请求线程。进程池排队已满时快速返回 503。
+
+排队名额在任务真正结束时才归还：等待超时的任务如果已经交给子进程，仍会占用名额直到算完，
+积压的请求不会越过 PASSWORD_HASH_MAX_PENDING 继续堆积。
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import List, Optional
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+from app.exception.api_exception import ApiException
+from app.utils.metrics import request_metrics
+
+
+def _generate(password: str, method: str, salt_length: int) -> str:
+    return generate_password_hash(password, method=method, salt_length=salt_length)
+
+
+def _check(pwhash: str, password: str) -> bool:
+    return check_password_hash(pwhash, password)
+
+
+def _method_prefix(method: str) -> str:
+    # 与 werkzeug 展开简写参数的规则一致（如 "scrypt" -> "scrypt:32768:8:1"），不需要实际计算哈希
+    name, *args = method.split(":")
+    if name == "scrypt":
+        n, r, p = args or (2 ** 15, 8, 1)
+        return f"scrypt:{n}:{r}:{p}"
+    if name == "pbkdf2":
+        hash_name = args[0] if args else "sha256"
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    return method
+
+
+def _mp_context():
+    # gunicorn gthread worker 中还运行着登录活动、令牌清理等线程，fork 出的子进程可能继承被占用的锁，
+    # 因此优先用 forkserver 启动子进程
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+class PasswordHasher:
+    """
+    密码哈希引擎
+
+    配置项（从 Flask 配置读取）:
+        PASSWORD_HASH_METHOD: werkzeug 哈希方法及参数，如 "scrypt:32768:8:1"、"pbkdf2:sha256:600000"
+        PASSWORD_HASH_SALT_LENGTH: 盐长度
+        PASSWORD_HASH_WORKERS: 进程池大小，0 表示在当前线程内联计算
+        PASSWORD_HASH_MAX_PENDING: 进程池之外允许排队的任务数
+        PASSWORD_HASH_TIMEOUT: 单次哈希等待上限（秒）
+    """
+
+    def __init__(self):
+        self.method = "scrypt"
+        self.salt_length = 16
+        self.workers = 0
+        self.max_pending = 0
+        self.timeout = None
+        self._method_prefix = _method_prefix(self.method)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        """从应用配置加载哈希参数，进程池在首次使用时才创建"""
+        self.shutdown()
+        self.method = app.config.get("PASSWORD_HASH_METHOD", "scrypt")
+        self.salt_length = app.config.get("PASSWORD_HASH_SALT_LENGTH", 16)
+        self.workers = max(0, app.config.get("PASSWORD_HASH_WORKERS", 0))
+        self.max_pending = max(0, app.config.get("PASSWORD_HASH_MAX_PENDING", 0))
+        self.timeout = app.config.get("PASSWORD_HASH_TIMEOUT")
+        self._method_prefix = _method_prefix(self.method)
+        if self.workers:
+            self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+
+    def shutdown(self) -> None:
+        """关闭进程池（测试或重新加载配置时使用）"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # 延迟创建，保证 gunicorn preload 之后每个 worker 拥有自己的进程池
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=_mp_context())
+        return self._pool
+
+    def _run(self, fn, *args):
+        started = time.perf_counter()
+        try:
+            return self._dispatch(fn, *args)
+        finally:
+            request_metrics.observe_hash("hash" if fn is _generate else "verify", time.perf_counter() - started)
+
+    def _dispatch(self, fn, *args):
+        if not self.workers:
+            return fn(*args)
+
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise ApiException(503, "服务器繁忙，请稍后重试")
+        try:
+            future = self._get_pool().submit(fn, *args)
+        except BrokenProcessPool:
+            slots.release()
+            self.shutdown()
+            raise ApiException(503, "服务器繁忙，请稍后重试")
+        except BaseException:
+            slots.release()
+            raise
+        # 名额随任务结束（完成、失败或取消）归还，而不是随本次等待结束归还
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ApiException(503, "服务器繁忙，请稍后重试")
+        except BrokenProcessPool:
+            self.shutdown()
+            raise ApiException(503, "服务器繁忙，请稍后重试")
+
+    def hash(self, password: str) -> str:
+        """
+        生成密码哈希
+
+        Args:
+            password (str): 明文密码
+
+        Returns:
+            str: 密码哈希
+
+        Raises:
+            ApiException: 进程池饱和或超时时抛出 503
+        """
+        return self._run(_generate, password, self.method, self.salt_length)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        """
+        校验密码
+
+        Args:
+            pwhash (str): 存储的密码哈希
+            password (str): 明文密码
+
+        Returns:
+            bool: 密码是否匹配
+
+        Raises:
+            ApiException: 进程池饱和或超时时抛出 503
+        """
+        if not pwhash:
+            return False
+        return self._run(_check, pwhash, password)
+
+    def hash_many(self, passwords: List[str], executor: Optional[Executor] = None,
+                  chunksize: int = 32) -> List[str]:
+        """
+        批量生成密码哈希（用户导入等离线任务使用，不经过请求路径的排队限制）
+
+        Args:
+            passwords (List[str]): 明文密码列表
+            executor (Optional[Executor]): 调用方持有的进程池，为None时在当前进程内顺序计算
+            chunksize (int): 每次分发给子进程的密码数
+
+        Returns:
+            List[str]: 与输入顺序一致的密码哈希
+        """
+        if executor is None:
+            return [_generate(password, self.method, self.salt_length) for password in passwords]
+        return list(executor.map(_generate, passwords, repeat(self.method), repeat(self.salt_length),
+                                 chunksize=chunksize))
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """
+        判断存储的哈希是否使用了过时的算法或参数
+
+        Args:
+            pwhash (str): 存储的密码哈希
+
+        Returns:
+            bool: 是否需要按当前配置重新哈希
+        """
+        if not pwhash or "$" not in pwhash:
+            return True
+        return pwhash.split("$", 1)[0] != self._method_prefix
+
+
+# 创建哈希引擎实例
+password_hasher = PasswordHasher()
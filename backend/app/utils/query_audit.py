@@ -0,0 +1,224 @@
+"""
+查询审计
+
+测试与预发环境使用的 SQL 检查工具，记录一段代码或一个请求内执行的全部语句：
+- N+1: 同一语句形状（参数与 IN 列表归一化后）重复出现达到阈值时标记
+- 全表扫描: SQLite 上对 SELECT 执行 EXPLAIN QUERY PLAN，计划中出现不走索引的
+  SCAN 时记录（每种语句形状只分析一次）。不带 WHERE、带 LIMIT 且按 rowid 顺序读取的
+  扫描可以提前结束，不计入；带过滤条件或需要临时 B 树排序的仍然计入
+- 预算: 按 endpoint 配置语句数上限（QUERY_AUDIT_BUDGETS），或在测试中断言
+
+开启方式：配置 QUERY_AUDIT_ENABLED=True 时审计每个请求并把问题写入 WARNING 日志；
+测试中使用 conftest 提供的 query_audit fixture 或 query_auditor.audit() 上下文管理器。
+"""
+
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from flask import current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_IN_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))+\s*\)")
+_POSTCOMPILE = re.compile(r"\(?\s*\[POSTCOMPILE_\w+\]\s*\)?")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    将 SQL 归一化为语句形状：字面量与 IN 列表长度不同的语句视为同一形状
+
+    Args:
+        statement (str): SQL 文本
+
+    Returns:
+        str: 归一化后的语句
+    """
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _POSTCOMPILE.sub("(?)", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _LITERAL.sub("?", shape)
+
+
+class QueryAudit:
+    """一次审计的记录结果"""
+
+    def __init__(self, n_plus_one_threshold: int = 3):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.statements: List[str] = []
+        self.full_scans: Dict[str, str] = {}
+
+    @property
+    def count(self) -> int:
+        """执行的语句数"""
+        return len(self.statements)
+
+    def n_plus_one(self) -> Dict[str, int]:
+        """
+        重复出现的语句形状
+
+        Returns:
+            Dict[str, int]: {语句形状: 出现次数}，只包含达到阈值的形状
+        """
+        shapes = Counter(statement_shape(statement) for statement in self.statements)
+        return {shape: times for shape, times in shapes.items() if times >= self.n_plus_one_threshold}
+
+    def problems(self, budget: Optional[int] = None) -> List[str]:
+        """
+        汇总审计发现的问题
+
+        Args:
+            budget (Optional[int]): 语句数上限
+
+        Returns:
+            List[str]: 问题描述
+        """
+        found = []
+        if budget is not None and self.count > budget:
+            found.append(f"执行了 {self.count} 条 SQL，超出预算 {budget} 条")
+        for shape, times in self.n_plus_one().items():
+            found.append(f"疑似 N+1：同一语句执行了 {times} 次: {shape}")
+        for shape, plan in self.full_scans.items():
+            found.append(f"全表扫描 ({plan}): {shape}")
+        return found
+
+    def assert_max(self, budget: int) -> None:
+        """断言语句数不超过预算"""
+        assert self.count <= budget, f"执行了 {self.count} 条 SQL，超出预算 {budget} 条:\n" + "\n".join(self.statements)
+
+    def assert_no_n_plus_one(self) -> None:
+        """断言没有重复的语句形状"""
+        repeated = self.n_plus_one()
+        assert not repeated, "疑似 N+1:\n" + "\n".join(f"{times}x {shape}" for shape, times in repeated.items())
+
+    def assert_no_full_scans(self) -> None:
+        """断言没有全表扫描"""
+        assert not self.full_scans, "全表扫描:\n" + "\n".join(f"{plan}: {shape}" for shape, plan in self.full_scans.items())
+
+
+class QueryAuditor:
+    """
+    查询审计器
+
+    配置项（从 Flask 配置读取）:
+        QUERY_AUDIT_ENABLED: 是否审计每个请求并记录日志
+        QUERY_AUDIT_N_PLUS_ONE: 同一语句形状重复多少次视为 N+1
+        QUERY_AUDIT_EXPLAIN: 是否在 SQLite 上检查查询计划中的全表扫描
+        QUERY_AUDIT_BUDGETS: {endpoint: 最大语句数}
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.n_plus_one_threshold = 3
+        self.explain = True
+        self.budgets: Dict[str, int] = {}
+        self._local = threading.local()
+        self._plans: Dict[str, Optional[str]] = {}
+        self._hooked = False
+
+    def init_app(self, app) -> None:
+        """加载配置，开启时注册请求钩子"""
+        self.enabled = app.config.get("QUERY_AUDIT_ENABLED", False)
+        self.n_plus_one_threshold = app.config.get("QUERY_AUDIT_N_PLUS_ONE", 3)
+        self.explain = app.config.get("QUERY_AUDIT_EXPLAIN", True)
+        self.budgets = dict(app.config.get("QUERY_AUDIT_BUDGETS") or {})
+        self._plans.clear()
+        self._hook_engine()
+        if self.enabled:
+            app.before_request(self._before_request)
+            app.after_request(self._after_request)
+
+    @contextmanager
+    def audit(self) -> Iterator[QueryAudit]:
+        """
+        审计代码块内当前线程执行的 SQL
+
+        Example:
+            with query_auditor.audit() as audit:
+                client.get("/api/user/list")
+            audit.assert_max(2)
+        """
+        self._hook_engine()
+        record = QueryAudit(self.n_plus_one_threshold)
+        stack = self._stack()
+        stack.append(record)
+        try:
+            yield record
+        finally:
+            stack.remove(record)
+
+    def _stack(self) -> List[QueryAudit]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _hook_engine(self) -> None:
+        if not self._hooked:
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self._hooked = True
+
+    def _before_request(self) -> None:
+        record = QueryAudit(self.n_plus_one_threshold)
+        self._local.request_audit = record
+        self._stack().append(record)
+
+    def _after_request(self, response):
+        record = getattr(self._local, "request_audit", None)
+        if record is None:
+            return response
+        self._local.request_audit = None
+        if record in self._stack():
+            self._stack().remove(record)
+        endpoint = request.endpoint or "unmatched"
+        for problem in record.problems(self.budgets.get(endpoint)):
+            current_app.logger.warning("查询审计 %s %s: %s", request.method, request.path, problem)
+        return response
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        stack = getattr(self._local, "stack", None)
+        if not stack:
+            return
+        for record in stack:
+            record.statements.append(statement)
+        if self.explain and conn.dialect.name == "sqlite" and not executemany:
+            plan = self._full_scan_plan(conn, statement, parameters)
+            if plan:
+                shape = statement_shape(statement)
+                for record in stack:
+                    record.full_scans[shape] = plan
+
+    def _full_scan_plan(self, conn, statement: str, parameters) -> Optional[str]:
+        if not statement.lstrip().upper().startswith("SELECT"):
+            return None
+        shape = statement_shape(statement)
+        if shape in self._plans:
+            return self._plans[shape]
+        # 直接使用 DBAPI 游标执行，不会再次触发 SQLAlchemy 事件
+        cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ())
+            details = [row[-1] for row in cursor.fetchall()]
+        except Exception:
+            details = []
+        finally:
+            cursor.close()
+        scans = [detail for detail in details
+                 if detail.startswith("SCAN") and "INDEX" not in detail and "CONSTANT ROW" not in detail
+                 and not detail.startswith("SCAN anon_")]
+        sorts = [detail for detail in details if "TEMP B-TREE" in detail]
+        upper = shape.upper()
+        if scans and " LIMIT " in upper and " WHERE " not in upper and not sorts:
+            # 无过滤条件、按 rowid 顺序读取，读够 LIMIT 条即停止，不需要读完整张表。
+            # 带 WHERE 的扫描（如按无索引列 .first()）可能读完整张表才找到匹配行，仍然计入
+            scans = []
+        plan = "; ".join(scans + sorts) if scans else None
+        self._plans[shape] = plan
+        return plan
+
+
+# 创建审计器实例
+query_auditor = QueryAuditor()
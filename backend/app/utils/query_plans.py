@@ -0,0 +1,126 @@
+"""
+查询计划检查
+
+列出关键查询应当使用的索引，在当前数据库上执行 EXPLAIN 并与预期比对，
+用于在新增迁移、调整查询或数据分布变化后确认索引仍然生效：
+- SQLite: EXPLAIN QUERY PLAN，检查计划中出现预期索引且没有整表排序（USE TEMP B-TREE）
+- PostgreSQL: EXPLAIN，事务内关闭顺序扫描，避免小表上规划器直接选择 Seq Scan
+
+查询尽量由服务层的构造方法生成（如 UserService.list_query），检查的就是线上实际执行的语句。
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+from sqlalchemy import text
+from app.model import db
+from app.model.post import Post
+
+
+@dataclass
+class PlanExpectation:
+    """一条查询的计划预期"""
+    name: str
+    build: Callable[[], Any]
+    index: Optional[str] = None
+    allow_sort: bool = False
+
+
+@dataclass
+class PlanResult:
+    """一条查询的检查结果"""
+    name: str
+    index: Optional[str]
+    plan: List[str]
+    problems: List[str]
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+
+def plan_expectations() -> List[PlanExpectation]:
+    """
+    关键查询及其预期索引
+
+    Returns:
+        List[PlanExpectation]: 预期列表
+    """
+    from app.service.user_service import user_service
+
+    return [
+        PlanExpectation("用户列表（按ID分页）", lambda: user_service.list_query().limit(20)),
+        PlanExpectation("用户列表（按注册时间排序）",
+                        lambda: user_service.list_query(sort='created_at').limit(20), "ix_users_created_at_id"),
+        PlanExpectation("用户列表（按最近登录排序）",
+                        lambda: user_service.list_query(sort='last_login_at').limit(20), "ix_users_last_login_at_id"),
+        PlanExpectation("用户列表（按状态筛选）",
+                        lambda: user_service.list_query(is_active=False).limit(20), "ix_users_is_active_id"),
+        PlanExpectation("用户列表（按权限筛选）",
+                        lambda: user_service.list_query(permission=3).limit(20), "ix_users_permission_id"),
+        PlanExpectation("登录（用户名）", lambda: user_service.login_query("Admin"), "ix_users_username_lower"),
+        PlanExpectation("登录（邮箱）", lambda: user_service.login_query("Admin@JuFireX.com"), "ix_users_email_lower"),
+        PlanExpectation("全站信息流",
+                        lambda: db.session.query(*Post.list_columns())
+                        .order_by(Post.created_at.desc(), Post.id.desc()).limit(20),
+                        "ix_posts_created_at_id"),
+        PlanExpectation("作者信息流",
+                        lambda: db.session.query(*Post.list_columns()).filter(Post.author_id == 1)
+                        .order_by(Post.created_at.desc(), Post.id.desc()).limit(20),
+                        "ix_posts_author_id_created_at"),
+    ]
+
+
+def explain(query) -> List[str]:
+    """
+    获取查询在当前数据库上的执行计划
+
+    Args:
+        query: SQLAlchemy 查询
+
+    Returns:
+        List[str]: 计划的每一行
+
+    Raises:
+        ValueError: 数据库类型不支持时抛出异常
+    """
+    dialect = db.engine.dialect
+    statement = getattr(query, "statement", query)
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    with db.engine.connect() as conn:
+        if dialect.name == "sqlite":
+            return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+        if dialect.name == "postgresql":
+            with conn.begin():
+                conn.execute(text("SET LOCAL enable_seqscan = off"))
+                return [row[0] for row in conn.execute(text(f"EXPLAIN {sql}"))]
+    raise ValueError(f"不支持检查 {dialect.name} 的执行计划")
+
+
+def _full_sort(plan: List[str]) -> bool:
+    for line in plan:
+        detail = line.strip().lstrip("->").strip()
+        if "TEMP B-TREE" in detail or detail.startswith("Sort "):
+            return True
+    return False
+
+
+def check_query_plans(expectations: Optional[List[PlanExpectation]] = None) -> List[PlanResult]:
+    """
+    检查关键查询的执行计划
+
+    Args:
+        expectations (Optional[List[PlanExpectation]]): 要检查的预期，默认为 plan_expectations()
+
+    Returns:
+        List[PlanResult]: 每条查询的计划与发现的问题
+    """
+    results = []
+    for expectation in expectations or plan_expectations():
+        plan = explain(expectation.build())
+        problems = []
+        if expectation.index and not any(expectation.index in line for line in plan):
+            problems.append(f"未使用索引 {expectation.index}")
+        if not expectation.allow_sort and _full_sort(plan):
+            problems.append("需要对结果整体排序")
+        results.append(PlanResult(expectation.name, expectation.index, plan, problems))
+    return results
@@ -0,0 +1,266 @@
+"""
+请求限流工具
+
+采用滑动窗口计数算法：按固定窗口计数，并用上一窗口计数按剩余比例加权估算当前
+滑动窗口内的请求数。每个限流键只保存两个窗口计数，判定为 O(1)，被拒绝的请求不计数、
+不进入路由，因此不会触发密码哈希等高开销操作。
+
+存储后端：
+- memory://  进程内字典，单 worker 或开发环境使用
+- redis://   共享存储（需要安装 redis 包），多 worker / 多实例部署时使用
+
+按IP等请求属性限流用 limit 装饰器；按账号限流需要先解析出账号（登录时用户名与邮箱指向
+同一账号），由服务层在查到用户后调用 check，以用户ID为键。
+"""
+
+import functools
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from flask import current_app, request
+from app.exception.api_exception import ApiException
+from app.utils.responses import fail
+
+_UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    解析限流规则
+
+    Args:
+        rate (str): 形如 "10/minute"、"100/hour" 或 "5/30"（30秒5次）的规则
+
+    Returns:
+        Tuple[int, int]: (次数上限, 窗口秒数)
+
+    Raises:
+        ValueError: 规则格式错误
+    """
+    count, _, period = (part.strip() for part in rate.partition("/"))
+    window = int(period) if period.isdigit() else _UNITS.get(period.rstrip("s"))
+    if not count.isdigit() or not window:
+        raise ValueError(f"无效的限流规则: {rate}")
+    return int(count), window
+
+
+def _retry_after(limit: int, window: int, elapsed: float, previous: int, current: int) -> int:
+    """估算滑动窗口计数降到上限以下所需的秒数"""
+    if current < limit and previous > 0:
+        wait = window * (1 - (limit - current) / previous) - elapsed
+    else:
+        # 当前窗口已满：等到下一窗口，且上一窗口（即当前窗口）的加权计数降到上限以下
+        wait = (window - elapsed) + window * max(0.0, 1 - limit / max(current, 1))
+    return max(1, math.ceil(wait))
+
+
+class MemoryBackend:
+    """进程内滑动窗口计数存储"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._windows: Dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: int) -> Tuple[bool, int, int]:
+        """
+        记录一次请求
+
+        Args:
+            key (str): 限流键
+            limit (int): 窗口内次数上限
+            window (int): 窗口秒数
+
+        Returns:
+            Tuple[bool, int, int]: (是否放行, 剩余次数, 需等待秒数)
+        """
+        now = time.time()
+        index = int(now // window)
+        elapsed = now - index * window
+        with self._lock:
+            entry = self._windows.get(key)
+            if entry is None:
+                if len(self._windows) >= self.max_keys:
+                    self._prune(now)
+                entry = self._windows[key] = [index, 0, 0, window]
+            elif entry[0] != index:
+                # 进入新窗口：相邻窗口的计数成为上一窗口，更早的直接清零
+                entry[2] = entry[1] if entry[0] == index - 1 else 0
+                entry[1] = 0
+                entry[0] = index
+            _, current, previous, _ = entry
+            estimated = previous * (1 - elapsed / window) + current
+            if estimated >= limit:
+                return False, 0, _retry_after(limit, window, elapsed, previous, current)
+            entry[1] += 1
+            return True, max(0, int(limit - estimated - 1)), 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._windows.clear()
+
+    def _prune(self, now: float) -> None:
+        # 键数达到上限时清理两个窗口前就已不再活跃的键；仍然过多则整体清空
+        stale = [key for key, (index, _, _, window) in self._windows.items() if now // window - index > 1]
+        for key in stale:
+            del self._windows[key]
+        if len(self._windows) >= self.max_keys:
+            self._windows.clear()
+
+
+class RedisBackend:
+    """基于 Redis 的共享滑动窗口计数存储"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis
+        except ImportError as exc:  # pragma: no cover - 取决于部署环境
+            raise RuntimeError("使用 redis:// 限流存储需要安装 redis 包") from exc
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def hit(self, key: str, limit: int, window: int) -> Tuple[bool, int, int]:
+        now = time.time()
+        index = int(now // window)
+        elapsed = now - index * window
+        current_key = f"{self.prefix}{key}:{index}"
+        with self._client.pipeline() as pipe:
+            pipe.incr(current_key)
+            pipe.expire(current_key, window * 2)
+            pipe.get(f"{self.prefix}{key}:{index - 1}")
+            current, _, previous = pipe.execute()
+        previous = int(previous or 0)
+        # INCR 已计入本次请求，判定时按计入前的值估算
+        estimated = previous * (1 - elapsed / window) + current - 1
+        if estimated >= limit:
+            self._client.decr(current_key)
+            return False, 0, _retry_after(limit, window, elapsed, previous, current - 1)
+        return True, max(0, int(limit - estimated - 1)), 0
+
+    def reset(self) -> None:
+        for key in self._client.scan_iter(f"{self.prefix}*"):
+            self._client.delete(key)
+
+
+class RateLimiter:
+    """
+    请求限流器
+
+    配置项（从 Flask 配置读取）:
+        RATE_LIMIT_ENABLED: 是否启用限流
+        RATE_LIMIT_STORAGE_URL: 存储后端，memory:// 或 redis://host:port/db
+        RATE_LIMIT_MAX_KEYS: 进程内存储的最大限流键数
+        其余规则项由各接口的 limit 装饰器按名称引用，如 RATE_LIMIT_LOGIN_PER_IP
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.rejected = 0
+        self.backend = MemoryBackend()
+        self._rules: Dict[str, Optional[Tuple[int, int]]] = {}
+
+    def init_app(self, app) -> None:
+        """加载配置并创建存储后端"""
+        self.enabled = app.config.get("RATE_LIMIT_ENABLED", True)
+        url = app.config.get("RATE_LIMIT_STORAGE_URL", "memory://")
+        if url.startswith("redis"):
+            self.backend = RedisBackend(url)
+        else:
+            self.backend = MemoryBackend(app.config.get("RATE_LIMIT_MAX_KEYS", 100000))
+        self._rules = {}
+        self.rejected = 0
+
+    def reset(self) -> None:
+        """清空全部计数"""
+        self.backend.reset()
+        self.rejected = 0
+
+    def _rule(self, config_key: str) -> Optional[Tuple[int, int]]:
+        if config_key not in self._rules:
+            rate = current_app.config.get(config_key)
+            self._rules[config_key] = parse_rate(rate) if rate else None
+        return self._rules[config_key]
+
+    def hit(self, config_key: str, key: str) -> Tuple[bool, int, int]:
+        """
+        按配置规则记录一次请求
+
+        Args:
+            config_key (str): 限流规则配置项名称
+            key (str): 限流键（IP、账号等）
+
+        Returns:
+            Tuple[bool, int, int]: (是否放行, 剩余次数, 需等待秒数)
+        """
+        rule = self._rule(config_key) if self.enabled else None
+        if rule is None:
+            return True, -1, 0
+        allowed, remaining, retry_after = self.backend.hit(f"{config_key}:{key}", *rule)
+        if not allowed:
+            self.rejected += 1
+        return allowed, remaining, retry_after
+
+    def check(self, config_key: str, key: str) -> None:
+        """
+        按配置规则记录一次请求，超出限制时抛出异常（供服务层在解析出限流对象后调用）
+
+        Args:
+            config_key (str): 限流规则配置项名称
+            key (str): 限流键，如用户ID
+
+        Raises:
+            ApiException: 超出限制时抛出 429，data 中携带 retry_after
+        """
+        allowed, _, retry_after = self.hit(config_key, key)
+        if not allowed:
+            raise ApiException(429, "请求过于频繁，请稍后重试", {"retry_after": retry_after})
+
+    def limit(self, config_key: str, key_func: Callable[[], Optional[str]] = None):
+        """
+        路由限流装饰器
+
+        Args:
+            config_key (str): 限流规则配置项名称
+            key_func (Callable): 返回限流键的函数，默认按客户端IP；返回None时不限流
+
+        Returns:
+            Callable: 装饰器，超出限制时返回 429 并携带 Retry-After 头
+        """
+        key_func = key_func or remote_ip
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                key = key_func()
+                if key is not None:
+                    allowed, _, retry_after = self.hit(config_key, key)
+                    if not allowed:
+                        return throttled(retry_after)
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+
+def remote_ip() -> Optional[str]:
+    """按客户端IP限流（部署在反向代理后时需配合 ProxyFix 还原真实IP）"""
+    return request.remote_addr or "unknown"
+
+
+def throttled(retry_after: int):
+    """
+    构造限流响应
+
+    Args:
+        retry_after (int): 需等待秒数
+
+    Returns:
+        tuple: 429 响应，携带 Retry-After 头
+    """
+    response, code = fail(429, "请求过于频繁，请稍后重试", {"retry_after": retry_after})
+    response.headers["Retry-After"] = str(retry_after)
+    return response, code
+
+
+# 创建限流器实例
+rate_limiter = RateLimiter()
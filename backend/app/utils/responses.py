@@ -1,9 +1,62 @@
-from flask import jsonify
+from datetime import datetime, UTC
+from typing import Optional
+from flask import current_app, request
 
 
-def success(data=None, message: str = "ok"):
-    return jsonify({"code": 200, "message": message, "data": data or {}}), 200
+def _json_response(payload, code: int):
+    # 直接交给 JSON Provider 编码为字节串，跳过 jsonify 的参数整理与调试模式下的缩进
+    return current_app.json.response(payload), code
+
+
+def _set_validators(response, etag: Optional[str], last_modified: Optional[datetime]) -> None:
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # 允许浏览器缓存响应体，但每次使用前都要带验证器回源确认，未变化时只收到空的 304
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def is_not_modified(etag: Optional[str] = None, last_modified: Optional[datetime] = None) -> bool:
+    """
+    判断客户端缓存的版本是否仍然有效
+
+    If-None-Match 存在时只比较 ETag（弱比较），否则比较 If-Modified-Since。
+
+    Args:
+        etag (Optional[str]): 当前资源的 ETag（不含引号）
+        last_modified (Optional[datetime]): 当前资源的最后修改时间（naive 时按 UTC 处理）
+
+    Returns:
+        bool: 客户端版本有效时返回True，可直接返回 304
+    """
+    if request.if_none_match:
+        return etag is not None and request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=UTC)
+        # HTTP 日期精确到秒
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def not_modified(etag: Optional[str] = None, last_modified: Optional[datetime] = None):
+    """返回不含响应体的 304 响应"""
+    response = current_app.response_class(status=304)
+    _set_validators(response, etag, last_modified)
+    return response, 304
+
+
+def success(data=None, message: str = "ok", etag: Optional[str] = None,
+            last_modified: Optional[datetime] = None):
+    if (etag is not None or last_modified is not None) and is_not_modified(etag, last_modified):
+        # 客户端版本仍然有效：不编码响应体
+        return not_modified(etag, last_modified)
+    response, code = _json_response({"code": 200, "message": message, "data": data or {}}, 200)
+    if etag is not None or last_modified is not None:
+        _set_validators(response, etag, last_modified)
+    return response, code
 
 
 def fail(code: int = 400, message: str = "error", data=None):
-    return jsonify({"code": code, "message": message, "data": data or {}}), code
\ No newline at end of file
+    return _json_response({"code": code, "message": message, "data": data or {}}, code)
@@ -0,0 +1,445 @@
+"""
+认证与用户接口的压测基准
+
+在临时 SQLite 文件中分阶段写入用户（默认 1000、10000），每个阶段按给定并发数压测
+以下场景，输出吞吐量与 p50/p95/p99 延迟：
+- register: 注册新用户（含密码哈希与写入）
+- login: 已有用户登录（密码校验为主要开销）
+- status: 带令牌查询登录状态
+- list-search: 管理员按前缀搜索用户列表
+- list-deep: 管理员用 OFFSET 分页读取靠后的一页
+- list-cursor: 管理员用键集游标读取同样深度的一页
+- profile: 更新自己的昵称
+
+两种驱动方式：
+- client: 进程内多线程 Flask 测试客户端，不经过网络与 WSGI 服务器，衡量应用本身
+- server: 用 gunicorn.conf.py 启动真实服务，多进程 keep-alive 客户端通过 HTTP 压测
+
+结果可与基线文件比较：吞吐量低于基线或 p95 高于基线超过容差时判定为退化，
+以退出码 1 结束，便于在 CI 中使用。基线与机器相关，更换压测机器后需重新保存。
+
+用法:
+    cd backend
+    python -m benchmarks.bench_api --mode client --users 1000,10000 --concurrency 1,8
+    python -m benchmarks.bench_api --mode both --save-baseline
+    python -m benchmarks.bench_api --mode both --scenarios login,status --tolerance 0.3
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from app import create_app
+from app.cli import create_schema, seed_admin
+from app.model import db
+from app.model.user import User
+from app.utils.password_hasher import password_hasher
+from benchmarks.serve_scaling import BACKEND_DIR, _free_port, _percentile, _wait_ready
+from config import BaseConfig
+
+SCENARIOS = ('register', 'login', 'status', 'list-search', 'list-deep', 'list-cursor', 'profile')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+PASSWORD = "bench1234"
+ADMIN_PASSWORD = "admin123"
+BATCH_SIZE = 20000
+# 每个阶段预先登录的用户数，status / profile 场景轮流使用这些令牌
+TOKEN_POOL = 32
+
+Request = Tuple[str, str, Optional[dict], Dict[str, str]]
+
+
+def seed_users(start: int, stop: int, pwhash: str) -> None:
+    """写入编号 (start, stop] 的用户，所有用户共用同一个密码哈希"""
+    now = datetime(2024, 1, 1)
+    for batch_start in range(start, stop, BATCH_SIZE):
+        rows = [
+            {'username': f'user_{i:07d}', 'nickname': f'User {i}', 'email': f'user_{i:07d}@example.com',
+             'password': pwhash, 'permission': 1, 'is_active': True, 'is_verified': False,
+             'created_at': now, 'updated_at': now}
+            for i in range(batch_start + 1, min(batch_start + BATCH_SIZE, stop) + 1)
+        ]
+        db.session.execute(insert(User), rows)
+        db.session.commit()
+
+
+def login_tokens(client, usernames: List[str], password: str) -> List[str]:
+    tokens = []
+    for username in usernames:
+        resp = client.post("/api/auth/login", json={"username": username, "password": password})
+        if resp.status_code != 200:
+            raise RuntimeError(f"预登录失败 {username}: {resp.status_code} {resp.get_data(as_text=True)[:200]}")
+        tokens.append(resp.get_json()["data"]["token"])
+    return tokens
+
+
+def build_request(scenario: str, state: dict, worker: int, seq: int) -> Request:
+    """
+    生成场景的一次请求
+
+    Args:
+        scenario (str): 场景名
+        state (dict): 阶段数据（用户数、令牌池、运行标识等）
+        worker (int): 并发连接编号
+        seq (int): 该连接发出的第几个请求
+
+    Returns:
+        Request: (方法, 路径, JSON 请求体, 请求头)
+    """
+    users = state['users']
+    per_page = state['per_page']
+    admin = {"Authorization": f"Bearer {state['admin_token']}"}
+    token = state['tokens'][worker % len(state['tokens'])]
+    mine = {"Authorization": f"Bearer {token}"}
+    if scenario == 'register':
+        username = f"b{state['run_id']}_{worker}_{seq}"
+        return "POST", "/api/auth/register", {
+            "username": username, "nickname": username, "email": f"{username}@bench.example.com",
+            "password": PASSWORD}, {}
+    if scenario == 'login':
+        # 按连接与序号散开，避免所有连接总是命中同一批用户
+        user_no = (worker * 7919 + seq * 104729) % users + 1
+        return "POST", "/api/auth/login", {"username": f"user_{user_no:07d}", "password": PASSWORD}, {}
+    if scenario == 'status':
+        return "GET", "/api/auth/status", None, mine
+    if scenario == 'list-search':
+        return "GET", f"/api/user/list?search=user_{seq % 10}*&per_page={per_page}", None, admin
+    if scenario == 'list-deep':
+        page = max(1, users // per_page - 1)
+        return "GET", f"/api/user/list?page={page}&per_page={per_page}", None, admin
+    if scenario == 'list-cursor':
+        after_id = max(0, users - 2 * per_page)
+        return "GET", f"/api/user/list?after_id={after_id}&per_page={per_page}", None, admin
+    if scenario == 'profile':
+        return "PUT", "/api/user/profile", {"nickname": f"Bench {worker}-{seq}"}, mine
+    raise ValueError(f"未知场景: {scenario}")
+
+
+def drive(send_factory: Callable[[], Callable[[Request], int]], scenario: str, state: dict,
+          connections: int, duration: float, worker_offset: int = 0) -> Tuple[List[float], int]:
+    """
+    多线程循环发送请求直到时间用完
+
+    Args:
+        send_factory: 为每个线程创建发送函数，发送函数返回 HTTP 状态码
+        scenario (str): 场景名
+        state (dict): 阶段数据
+        connections (int): 线程（连接）数
+        duration (float): 压测时长（秒）
+        worker_offset (int): 连接编号起点，多进程时避免编号重复
+
+    Returns:
+        Tuple[List[float], int]: 成功请求的延迟（毫秒）与错误数
+    """
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def run(worker):
+        send = send_factory()
+        local, failed, seq = [], 0, 0
+        while time.perf_counter() < deadline:
+            req = build_request(scenario, state, worker, seq)
+            seq += 1
+            started = time.perf_counter()
+            try:
+                status = send(req)
+            except (OSError, http.client.HTTPException):
+                status = 0
+                send = send_factory()
+            if 200 <= status < 400:
+                local.append((time.perf_counter() - started) * 1000)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=run, args=(worker_offset + i,)) for i in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def _test_client_sender(app):
+    def factory():
+        client = app.test_client()
+
+        def send(req):
+            method, path, body, headers = req
+            return client.open(path, method=method, json=body, headers=headers).status_code
+        return send
+    return factory
+
+
+def _http_sender(host, port):
+    def factory():
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+
+        def send(req):
+            method, path, body, headers = req
+            payload = json.dumps(body).encode() if body is not None else None
+            if payload is not None:
+                headers = dict(headers, **{"Content-Type": "application/json"})
+            conn.request(method, path, body=payload, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+            return resp.status
+        return send
+    return factory
+
+
+def _http_client_process(host, port, scenario, state, connections, duration, worker_offset):
+    """server 模式的客户端进程入口"""
+    return drive(_http_sender(host, port), scenario, state, connections, duration, worker_offset)
+
+
+def summarize(latencies: List[float], errors: int, duration: float) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+    }
+
+
+def run_client(app, scenario: str, state: dict, concurrency: int, duration: float) -> Dict[str, float]:
+    latencies, errors = drive(_test_client_sender(app), scenario, state, concurrency, duration)
+    return summarize(latencies, errors, duration)
+
+
+def run_server(port: int, scenario: str, state: dict, concurrency: int, duration: float,
+               processes: int) -> Dict[str, float]:
+    processes = max(1, min(processes, concurrency))
+    shares = [concurrency // processes + (i < concurrency % processes) for i in range(processes)]
+    offsets = [sum(shares[:i]) for i in range(processes)]
+    latencies, errors = [], 0
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        futures = [pool.submit(_http_client_process, "127.0.0.1", port, scenario, state, share, duration, offset)
+                   for share, offset in zip(shares, offsets)]
+        for future in futures:
+            values, errs = future.result()
+            latencies.extend(values)
+            errors += errs
+    return summarize(latencies, errors, duration)
+
+
+def start_server(db_path: str, hash_method: str, workers: int, threads: int) -> Tuple[subprocess.Popen, int]:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{db_path}",
+        PASSWORD_HASH_METHOD=hash_method,
+        RATE_LIMIT_ENABLED="0",
+        METRICS_SLOW_REQUEST_MS="0",
+        SERVER_BIND=f"127.0.0.1:{port}",
+        SERVER_WORKERS=str(workers),
+        SERVER_THREADS=str(threads),
+        SERVER_PIDFILE=os.path.join(tempfile.gettempdir(), f"jufirex-bench-api-{port}.pid"),
+        SERVER_MAX_REQUESTS="0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_ready(port)
+    except RuntimeError:
+        server.kill()
+        raise
+    return server, port
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def result_key(mode: str, users: int, scenario: str, concurrency: int) -> str:
+    return f"{mode}/users={users}/{scenario}/c={concurrency}"
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> Dict[str, List[str]]:
+    """
+    与基线比较
+
+    Args:
+        results: {结果键: 指标}
+        baseline: 基线文件中的 results
+        tolerance (float): 允许的相对退化比例，如 0.25 表示 25%
+
+    Returns:
+        Dict[str, List[str]]: {结果键: 退化描述}，只包含发生退化的结果
+    """
+    regressions: Dict[str, List[str]] = {}
+    for key, current in results.items():
+        expected = baseline.get(key)
+        if not expected:
+            continue
+        found = []
+        if expected["rps"] > 0 and current["rps"] < expected["rps"] * (1 - tolerance):
+            found.append(f"吞吐量 {current['rps']:.1f} < 基线 {expected['rps']:.1f} req/s")
+        if expected["p95"] > 0 and current["p95"] > expected["p95"] * (1 + tolerance):
+            found.append(f"p95 {current['p95']:.2f} > 基线 {expected['p95']:.2f} ms")
+        if current["errors"] > expected.get("errors", 0):
+            found.append(f"错误数 {current['errors']} > 基线 {expected.get('errors', 0)}")
+        if found:
+            regressions[key] = found
+    return regressions
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, meta: dict, results: Dict[str, Dict[str, float]]) -> None:
+    data = load_baseline(path)
+    merged = dict(data.get("results", {}))
+    merged.update({key: {name: round(value, 3) for name, value in metrics.items()}
+                   for key, metrics in results.items()})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": dict(sorted(merged.items()))}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def prepare_stage(app, seeded: int, users: int, pwhash: str, per_page: int) -> dict:
+    """写入用户到目标数量并预登录令牌池，返回该阶段的场景数据"""
+    with app.app_context():
+        seed_users(seeded, users, pwhash)
+        db.session.execute(db.text("ANALYZE"))
+        db.session.commit()
+    client = app.test_client()
+    pool = [f"user_{i:07d}" for i in range(1, min(users, TOKEN_POOL) + 1)]
+    return {
+        'users': users,
+        'per_page': per_page,
+        'run_id': '',
+        'admin_token': login_tokens(client, ["admin"], ADMIN_PASSWORD)[0],
+        'tokens': login_tokens(client, pool, PASSWORD),
+    }
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("client", "server", "both"), default="client")
+    parser.add_argument("--users", default="1000,10000", help="逗号分隔的用户规模，依次递增写入")
+    parser.add_argument("--concurrency", default="1,8", help="逗号分隔的并发数")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="逗号分隔的场景")
+    parser.add_argument("--duration", type=float, default=3.0, help="每个场景每档并发的压测时长（秒）")
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--hash-method", default=BaseConfig.PASSWORD_HASH_METHOD, help="密码哈希算法参数")
+    parser.add_argument("--server-workers", type=int, default=cpus, help="server 模式的 gunicorn worker 数")
+    parser.add_argument("--server-threads", type=int, default=4, help="server 模式每个 worker 的线程数")
+    parser.add_argument("--client-processes", type=int, default=cpus, help="server 模式的客户端进程数")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基线文件路径")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允许的相对退化比例")
+    parser.add_argument("--save-baseline", action="store_true", help="把本次结果写入基线文件（覆盖同名结果）")
+    args = parser.parse_args()
+
+    sizes = sorted(int(value) for value in args.users.split(","))
+    levels = [int(value) for value in args.concurrency.split(",")]
+    scenarios = [name for name in args.scenarios.split(",") if name]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"未知场景: {', '.join(sorted(unknown))}")
+    modes = ["client", "server"] if args.mode == "both" else [args.mode]
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-api-"), "api.db")
+
+    class BenchConfig(BaseConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        PASSWORD_HASH_METHOD = args.hash_method
+        RATE_LIMIT_ENABLED = False
+        METRICS_SLOW_REQUEST_MS = 0
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        create_schema()
+        seed_admin(password=ADMIN_PASSWORD)
+        pwhash = password_hasher.hash(PASSWORD)
+
+    baseline = load_baseline(args.baseline)
+    meta = {"cpus": cpus, "python": platform.python_version(), "hash_method": args.hash_method,
+            "duration": args.duration, "per_page": args.per_page}
+    if baseline and baseline.get("meta", {}).get("hash_method") != args.hash_method:
+        print(f"警告: 基线使用的哈希参数为 {baseline['meta'].get('hash_method')}，结果不可直接比较")
+    print(f"database={path} cpus={cpus} hash={args.hash_method} duration={args.duration}s")
+
+    results: Dict[str, Dict[str, float]] = {}
+    regressions: Dict[str, List[str]] = {}
+    seeded = 0
+    try:
+        for users in sizes:
+            state = prepare_stage(app, seeded, users, pwhash, args.per_page)
+            seeded = users
+            for mode in modes:
+                server = port = None
+                if mode == "server":
+                    server, port = start_server(path, args.hash_method, args.server_workers, args.server_threads)
+                try:
+                    print(f"\n[{mode}] users={users}")
+                    print(f"{'scenario':>12} {'conc':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+                          f"{'p99 ms':>8} {'errors':>7}  baseline")
+                    for scenario in scenarios:
+                        for concurrency in levels:
+                            # 每次运行换一个标识，register 场景不会与之前注册的用户重名
+                            state['run_id'] = uuid.uuid4().hex[:8]
+                            if mode == "client":
+                                result = run_client(app, scenario, state, concurrency, args.duration)
+                            else:
+                                result = run_server(port, scenario, state, concurrency, args.duration,
+                                                    args.client_processes)
+                            key = result_key(mode, users, scenario, concurrency)
+                            results[key] = result
+                            found = compare({key: result}, baseline.get("results", {}), args.tolerance)
+                            regressions.update(found)
+                            expected = baseline.get("results", {}).get(key)
+                            verdict = "退化" if found else ("-" if expected is None else "ok")
+                            print(f"{scenario:>12} {concurrency:>5} {result['rps']:>9.1f} {result['p50']:>8.2f} "
+                                  f"{result['p95']:>8.2f} {result['p99']:>8.2f} {result['errors']:>7}  {verdict}")
+                finally:
+                    if server is not None:
+                        stop_server(server)
+    finally:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    if args.save_baseline:
+        save_baseline(args.baseline, meta, results)
+        print(f"\n基线已写入 {args.baseline}")
+        return
+    if regressions:
+        print(f"\n{len(regressions)} 项结果超出基线容差 {args.tolerance:.0%}:")
+        for key, found in regressions.items():
+            print(f"  {key}: {'; '.join(found)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+响应压缩效果基准
+
+对 /api/user/list?per_page=100 分别以不压缩、gzip、brotli（已安装时）请求，输出：
+- bytes: 响应体字节数
+- server-ms: 服务端生成响应（含压缩）的耗时
+- ttlb-ms: 按给定带宽估算的最后字节到达时间 = server-ms + 传输耗时
+
+用法:
+    cd backend
+    python -m benchmarks.bench_compression --users 500 --bandwidth-mbps 10
+"""
+
+import argparse
+import time
+from sqlalchemy import insert
+from app import create_app
+from app.cli import create_schema, seed_admin
+from app.model import db
+from app.model.user import User
+from app.utils import compression as compression_module
+from config import TestingConfig
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--bandwidth-mbps", type=float, default=10.0)
+    args = parser.parse_args()
+
+    app = create_app(TestingConfig)
+    with app.app_context():
+        create_schema()
+        seed_admin()
+        db.session.execute(insert(User), [
+            {'username': f'user_{i:05d}', 'nickname': f'用户 {i}', 'email': f'user_{i:05d}@example.com',
+             'password': 'x', 'avatar': f'/static/avatars/{i}.jpg', 'permission': 1}
+            for i in range(1, args.users + 1)
+        ])
+        db.session.commit()
+
+    client = app.test_client()
+    token = client.post("/api/auth/login", json={"username": "admin", "password": "admin123"}).get_json()["data"]["token"]
+    url = f"/api/user/list?per_page={args.per_page}"
+    encodings = ["identity", "gzip"] + (["br"] if compression_module.brotli is not None else [])
+
+    print(f"url={url} number={args.number} bandwidth={args.bandwidth_mbps} Mbit/s")
+    print(f"{'encoding':<10} {'bytes':>8} {'server-ms':>10} {'ttlb-ms':>9}")
+    for encoding in encodings:
+        headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": encoding}
+        size = len(client.get(url, headers=headers).get_data())
+        started = time.perf_counter()
+        for _ in range(args.number):
+            client.get(url, headers=headers).get_data()
+        server_ms = (time.perf_counter() - started) / args.number * 1000
+        transfer_ms = size * 8 / (args.bandwidth_mbps * 1e6) * 1000
+        print(f"{encoding:<10} {size:>8} {server_ms:>10.2f} {server_ms + transfer_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
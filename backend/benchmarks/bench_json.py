@@ -0,0 +1,86 @@
+"""
+JSON 编码微基准
+
+比较 /api/user/list 单页 100 行响应体在不同编码方式下的耗时：
+- flask-default: Flask 默认 Provider（调试模式下带缩进）
+- stdlib-compact: 标准库 json 紧凑输出
+- fast-provider: FastJSONProvider（orjson 可用时走 orjson）
+- fast+isoformat: 先像 User.to_dict 那样逐行 isoformat 再用 FastJSONProvider 编码
+- fast-native-dt: FastJSONProvider 直接编码 datetime，省去逐行构造中间字典与字符串
+
+用法:
+    cd backend
+    python -m benchmarks.bench_json --rows 100 --number 2000
+"""
+
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta, UTC
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.utils.json_provider import FastJSONProvider
+
+
+def build_payload(rows: int, native_datetime: bool):
+    base = datetime(2024, 1, 1, tzinfo=UTC)
+    users = []
+    for i in range(1, rows + 1):
+        created_at = base + timedelta(minutes=i, microseconds=i)
+        users.append({
+            'id': i,
+            'username': f'user_{i:06d}',
+            'nickname': f'用户 {i}',
+            'avatar': f'/static/avatars/{i}.jpg',
+            'permission': 1,
+            'created_at': created_at if native_datetime else created_at.isoformat(),
+            'is_active': True
+        })
+    return {
+        'code': 200,
+        'message': '获取用户列表成功',
+        'data': {
+            'users': users,
+            'pagination': {'page': 1, 'per_page': rows, 'total': 100000, 'pages': 100000 // rows}
+        }
+    }
+
+
+def with_isoformat(payload):
+    users = [dict(user, created_at=user['created_at'].isoformat()) for user in payload['data']['users']]
+    return dict(payload, data=dict(payload['data'], users=users))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.debug = True
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    payload = build_payload(args.rows, native_datetime=False)
+    native_payload = build_payload(args.rows, native_datetime=True)
+
+    cases = {
+        "flask-default": lambda: default_provider.dumps(payload, indent=2).encode(),
+        "stdlib-compact": lambda: json.dumps(payload, separators=(",", ":")).encode(),
+        "fast-provider": lambda: fast_provider.dumps_bytes(payload),
+        "fast+isoformat": lambda: fast_provider.dumps_bytes(with_isoformat(native_payload)),
+        "fast-native-dt": lambda: fast_provider.dumps_bytes(native_payload),
+    }
+
+    print(f"backend={FastJSONProvider.backend} rows={args.rows} number={args.number}")
+    print(f"{'case':<16} {'us/op':>10} {'bytes':>8} {'speedup':>8}")
+    baseline = None
+    for name, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=args.number, repeat=3))
+        per_op = seconds / args.number * 1e6
+        baseline = baseline or per_op
+        print(f"{name:<16} {per_op:>10.1f} {len(fn()):>8} {baseline / per_op:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
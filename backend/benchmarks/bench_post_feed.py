@@ -0,0 +1,130 @@
+"""
+帖子信息流分页延迟随表规模变化的基准
+
+在临时 SQLite 文件中分阶段写入帖子（默认直到 10^6 条），每个阶段测量：
+- first-page: 信息流首页
+- deep-page: 从表中间位置的游标开始的一页（OFFSET 分页在这里会随深度线性变慢）
+- author-page: 单个作者的首页（命中 (author_id, created_at) 索引）
+- offset-deep: 同样深度的 OFFSET 分页，作为对照
+- cached-first / cached-author: 启用信息流缓存后的全站首页与作者首页
+
+以上前三项走查询分页（关闭信息流缓存），与两项缓存读取一样都应基本不随表规模增长。
+
+用法:
+    cd backend
+    python -m benchmarks.bench_post_feed --max-posts 1000000 --per-page 20
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import timeit
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app import create_app
+from app.cli import create_schema
+from app.model import db
+from app.model.post import Post
+from app.model.user import User
+from app.service.feed_service import feed_cache
+from app.service.post_service import post_service
+from app.utils.cursor import encode_cursor
+from config import TestingConfig
+
+BATCH_SIZE = 50000
+
+
+def seed_users(count):
+    rows = [
+        {'username': f'user_{i:05d}', 'nickname': f'User {i}', 'email': f'user_{i:05d}@example.com',
+         'password': 'x', 'permission': 1, 'is_active': True, 'is_verified': False,
+         'created_at': datetime(2020, 1, 1), 'updated_at': datetime(2020, 1, 1)}
+        for i in range(1, count + 1)
+    ]
+    db.session.execute(insert(User), rows)
+    db.session.commit()
+
+
+def seed_posts(start, stop, users, rng):
+    base = datetime(2020, 1, 1)
+    for batch_start in range(start, stop, BATCH_SIZE):
+        rows = [
+            {'id': i, 'author_id': rng.randint(1, users), 'content': f'post {i}',
+             # 每秒一条，偶尔同一秒两条，覆盖 (created_at, id) 的并列情况
+             'created_at': base + timedelta(seconds=i - (i % 7 == 0)),
+             'updated_at': base}
+            for i in range(batch_start + 1, min(batch_start + BATCH_SIZE, stop) + 1)
+        ]
+        db.session.execute(insert(Post), rows)
+        db.session.commit()
+
+
+def measure(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-posts", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-posts-"), "posts.db")
+
+    class BenchConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+        USER_CACHE_TTL = 0
+
+    app = create_app(BenchConfig)
+    rng = random.Random(42)
+    stages = []
+    size = 1000
+    while size < args.max_posts:
+        stages.append(size)
+        size *= 10
+    stages.append(args.max_posts)
+
+    print(f"database={path} per_page={args.per_page} number={args.number}")
+    columns = ['first-page', 'deep-page', 'author-page', 'offset-deep', 'cached-first', 'cached-author']
+    print(f"{'posts':>10} " + " ".join(f"{name:>13}" for name in columns) + "  (ms/op)")
+    with app.app_context():
+        create_schema()
+        seed_users(args.users)
+        seeded = 0
+        for stage in stages:
+            seed_posts(seeded, stage, args.users, rng)
+            seeded = stage
+            db.session.execute(db.text("ANALYZE"))
+
+            middle = db.session.get(Post, stage // 2)
+            deep_cursor = encode_cursor({'t': middle.created_at.isoformat(), 'id': middle.id})
+            author_id = middle.author_id
+            offset = stage - stage // 2
+            db.session.expunge_all()
+
+            def offset_page():
+                return (db.session.query(*Post.list_columns())
+                        .order_by(Post.created_at.desc(), Post.id.desc())
+                        .offset(offset).limit(args.per_page).all())
+
+            feed_cache.clear()
+            feed_cache.enabled = False
+            timings = [
+                measure(lambda: post_service.list_posts(per_page=args.per_page), args.number),
+                measure(lambda: post_service.list_posts(deep_cursor, args.per_page), args.number),
+                measure(lambda: post_service.list_posts(per_page=args.per_page, author_id=author_id), args.number),
+                measure(offset_page, max(1, args.number // 20)),
+            ]
+            feed_cache.enabled = True
+            timings += [
+                measure(lambda: post_service.list_posts(per_page=args.per_page), args.number),
+                measure(lambda: post_service.list_posts(per_page=args.per_page, author_id=author_id), args.number),
+            ]
+            print(f"{stage:>10} " + " ".join(f"{value:>13.3f}" for value in timings))
+
+
+if __name__ == "__main__":
+    main()
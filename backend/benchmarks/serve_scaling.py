@@ -0,0 +1,156 @@
+"""
+生产服务吞吐量随 worker 数扩展的压测
+
+对每个 worker 数启动一次 gunicorn（使用 gunicorn.conf.py 与 ProductionConfig），
+用多进程 keep-alive 客户端压测固定时长，输出吞吐量与延迟分位数。
+
+用法:
+    cd backend
+    python -m benchmarks.serve_scaling --workers 1,2,4 --duration 10
+    python -m benchmarks.serve_scaling --path /api/user/1 --threads 1
+"""
+
+import argparse
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _client(host, port, path, connections, duration):
+    """单个客户端进程：多线程 keep-alive 连接循环请求，返回延迟列表（毫秒）与错误数"""
+    import threading
+
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def run():
+        conn = http.client.HTTPConnection(host, port, timeout=10)
+        local = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                resp.read()
+                if resp.status >= 500:
+                    errors[0] += 1
+            except (OSError, http.client.HTTPException):
+                errors[0] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=10)
+                continue
+            local.append((time.perf_counter() - started) * 1000)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=run) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(port, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"gunicorn 未能在 {timeout}s 内启动")
+
+
+def run_level(workers, args):
+    port = _free_port()
+    pidfile = os.path.join(tempfile.gettempdir(), f"jufirex-bench-{port}.pid")
+    env = dict(
+        os.environ,
+        SERVER_BIND=f"127.0.0.1:{port}",
+        SERVER_WORKERS=str(workers),
+        SERVER_THREADS=str(args.threads),
+        SERVER_PIDFILE=pidfile,
+        SERVER_MAX_REQUESTS="0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_ready(port)
+        time.sleep(0.5)
+        with ProcessPoolExecutor(max_workers=args.clients) as pool:
+            futures = [
+                pool.submit(_client, "127.0.0.1", port, args.path, args.connections, args.duration)
+                for _ in range(args.clients)
+            ]
+            latencies, errors = [], 0
+            for future in futures:
+                values, errs = future.result()
+                latencies.extend(values)
+                errors += errs
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    latencies.sort()
+    return {
+        "workers": workers,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / args.duration,
+        "p50": _percentile(latencies, 50),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+    }
+
+
+def main():
+    cpus = os.cpu_count() or 1
+    default_levels = sorted({1, max(1, cpus // 2), cpus, cpus * 2 + 1})
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=",".join(map(str, default_levels)), help="逗号分隔的 worker 数")
+    parser.add_argument("--threads", type=int, default=4, help="每个 worker 的线程数")
+    parser.add_argument("--path", default="/api/hello", help="压测路径")
+    parser.add_argument("--duration", type=float, default=10.0, help="每档压测时长（秒）")
+    parser.add_argument("--clients", type=int, default=cpus, help="客户端进程数")
+    parser.add_argument("--connections", type=int, default=8, help="每个客户端进程的并发连接数")
+    args = parser.parse_args()
+
+    print(f"CPU 核数: {cpus}  路径: {args.path}  线程/worker: {args.threads}")
+    print(f"{'workers':>8} {'req/s':>10} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    baseline = None
+    for workers in (int(value) for value in args.workers.split(",")):
+        result = run_level(workers, args)
+        baseline = baseline or result["rps"] or 1.0
+        print(f"{result['workers']:>8} {result['rps']:>10.1f} {result['rps'] / baseline:>7.2f}x "
+              f"{result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f} {result['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
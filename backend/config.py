@@ -1,10 +1,100 @@
 import os
+from datetime import timedelta
+
+
+def engine_options(uri: str, pool_size: int = 5, max_overflow: int = 10,
+                   pool_timeout: int = 30, pool_recycle: int = 1800) -> dict:
+    """按数据库类型生成 SQLAlchemy 引擎参数，连接池参数可由 DB_POOL_* 环境变量覆盖"""
+    if uri.startswith("sqlite"):
+        # SQLite 的调优通过连接时执行的 PRAGMA 完成（见 SQLITE_PRAGMAS），无需回收与探活
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", pool_size)),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", max_overflow)),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", pool_timeout)),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", pool_recycle)),
+        "pool_pre_ping": True,
+    }
 
 
 class BaseConfig:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///auth_dev.db")
+    # 连接池默认参数，创建应用时按实际生效的 SQLALCHEMY_DATABASE_URI 生成引擎参数（见 engine_options），
+    # 子类只覆盖连接地址时不会沿用父类按其他数据库生成的参数；SQLALCHEMY_ENGINE_OPTIONS 中的显式配置优先
+    DB_POOL = {"pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": 1800}
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite 连接 PRAGMA：WAL 模式下写操作（如登录更新 last_login_at）不阻塞并发读
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+        "temp_store": "MEMORY",
+    }
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "change-this-secret")
+    # 访问令牌短期有效，过期后用刷新令牌轮换，无需重新走密码校验
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=int(os.getenv("JWT_ACCESS_TOKEN_MINUTES", "30")))
+    JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=int(os.getenv("JWT_REFRESH_TOKEN_DAYS", "14")))
+    # 密码哈希：算法参数、进程池大小、排队上限与等待超时（秒）
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_SALT_LENGTH = 16
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+    # 身份缓存：JWT 接口按用户ID查询的结果缓存（秒 / 条目数）
+    USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "5"))
+    USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "4096"))
+    # 用户列表 cached 计数模式的缓存时间（秒）
+    USER_COUNT_CACHE_TTL = float(os.getenv("USER_COUNT_CACHE_TTL", "30"))
+    # 用户搜索走 FTS5 / pg_trgm 索引，关闭后回退到 LIKE 查询
+    USER_SEARCH_INDEX = os.getenv("USER_SEARCH_INDEX", "1") == "1"
+    # 登录时间 write-behind：刷新间隔（毫秒）、单批条数与缓冲区上限
+    LOGIN_ACTIVITY_WRITE_BEHIND = os.getenv("LOGIN_ACTIVITY_WRITE_BEHIND", "1") == "1"
+    LOGIN_ACTIVITY_FLUSH_MS = int(os.getenv("LOGIN_ACTIVITY_FLUSH_MS", "500"))
+    LOGIN_ACTIVITY_BATCH_SIZE = int(os.getenv("LOGIN_ACTIVITY_BATCH_SIZE", "500"))
+    LOGIN_ACTIVITY_MAX_PENDING = int(os.getenv("LOGIN_ACTIVITY_MAX_PENDING", "10000"))
+    # 令牌吊销：跨 worker 增量同步间隔、后台清理过期记录的间隔（秒，0 表示仅由 flask tokens sweep 清理）与布隆过滤器容量
+    TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", "5"))
+    TOKEN_REVOCATION_SWEEP_SECONDS = float(os.getenv("TOKEN_REVOCATION_SWEEP_SECONDS", "3600"))
+    TOKEN_REVOCATION_BLOOM_CAPACITY = int(os.getenv("TOKEN_REVOCATION_BLOOM_CAPACITY", "100000"))
+    # 认证接口限流：存储后端（memory:// 或 redis://）与各规则（次数/时间单位）
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+    RATE_LIMIT_STORAGE_URL = os.getenv("RATE_LIMIT_STORAGE_URL", "memory://")
+    RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+    RATE_LIMIT_LOGIN_PER_IP = os.getenv("RATE_LIMIT_LOGIN_PER_IP", "30/minute")
+    RATE_LIMIT_LOGIN_PER_ACCOUNT = os.getenv("RATE_LIMIT_LOGIN_PER_ACCOUNT", "10/minute")
+    RATE_LIMIT_REGISTER_PER_IP = os.getenv("RATE_LIMIT_REGISTER_PER_IP", "10/hour")
+    # 信息流缓存：每个信息流缓存的最新帖子数、缓存的信息流数与重新预热间隔（秒）
+    FEED_CACHE_ENABLED = os.getenv("FEED_CACHE_ENABLED", "1") == "1"
+    FEED_CACHE_SIZE = int(os.getenv("FEED_CACHE_SIZE", "1000"))
+    FEED_CACHE_MAX_FEEDS = int(os.getenv("FEED_CACHE_MAX_FEEDS", "1024"))
+    FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", "30"))
+    # 响应压缩：最小压缩字节数、流式压缩阈值、压缩级别与静态文件压缩缓存目录
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "1") == "1"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    COMPRESS_STREAM_MIN_SIZE = int(os.getenv("COMPRESS_STREAM_MIN_SIZE", str(256 * 1024)))
+    COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", "6"))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+    COMPRESS_CACHE_DIR = os.getenv("COMPRESS_CACHE_DIR")
+    # 头像：存储目录（默认 instance/avatars）、字节数与像素数上限、缩略图尺寸与生成进程池大小
+    AVATAR_STORAGE_DIR = os.getenv("AVATAR_STORAGE_DIR")
+    AVATAR_MAX_BYTES = int(os.getenv("AVATAR_MAX_BYTES", str(5 * 1024 * 1024)))
+    AVATAR_MAX_PIXELS = int(os.getenv("AVATAR_MAX_PIXELS", str(4096 * 4096)))
+    AVATAR_THUMBNAIL_SIZES = [64, 128, 256]
+    AVATAR_DEFAULT_SIZE = 128
+    AVATAR_WORKERS = int(os.getenv("AVATAR_WORKERS", "2"))
+    # 指标：是否采集并开放 /metrics、接口路径与访问令牌（Authorization: Bearer），以及慢请求日志阈值（毫秒，0 表示关闭）
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN") or None
+    METRICS_REQUIRE_TOKEN = False
+    METRICS_SLOW_REQUEST_MS = float(os.getenv("METRICS_SLOW_REQUEST_MS", "500"))
+    # 查询审计（测试/预发）：N+1 判定阈值、SQLite 全表扫描检查与各 endpoint 的语句数预算
+    QUERY_AUDIT_ENABLED = os.getenv("QUERY_AUDIT_ENABLED", "0") == "1"
+    QUERY_AUDIT_N_PLUS_ONE = int(os.getenv("QUERY_AUDIT_N_PLUS_ONE", "3"))
+    QUERY_AUDIT_EXPLAIN = True
+    QUERY_AUDIT_BUDGETS = {}
     DEBUG = False
     TESTING = False
 
@@ -15,8 +105,43 @@ class DevelopmentConfig(BaseConfig):
 
 class TestingConfig(BaseConfig):
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "sqlite:///test.db")
+    SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "sqlite://")
+    DB_POOL = {"pool_size": 2, "max_overflow": 0}
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"
+    PASSWORD_HASH_WORKERS = 0
+    LOGIN_ACTIVITY_WRITE_BEHIND = False
+    AVATAR_WORKERS = 0
+    TOKEN_REVOCATION_SWEEP_SECONDS = 0
 
 
 class ProductionConfig(BaseConfig):
     DEBUG = False
+    DB_POOL = {"pool_size": 10, "max_overflow": 20, "pool_timeout": 10}
+    # 未配置 METRICS_TOKEN 时不对外开放 /metrics
+    METRICS_REQUIRE_TOKEN = True
+    # gunicorn 服务参数（由 gunicorn.conf.py 读取）
+    SERVER_BIND = os.getenv("SERVER_BIND", "0.0.0.0:5000")
+    # gthread worker 用线程承担 I/O 并发，CPU 密集的密码哈希交给各 worker 自己的进程池。
+    # worker 数默认等于 CPU 数，每个 worker 的哈希进程数由 worker 数推导，
+    # 使哈希进程总数（SERVER_WORKERS × PASSWORD_HASH_WORKERS）约等于 CPU 数
+    SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS",
+                                          str(max(1, (os.cpu_count() or 1) // max(1, SERVER_WORKERS)))))
+    SERVER_THREADS = int(os.getenv("SERVER_THREADS", "4"))
+    SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "2048"))
+    # 预加载时 HUP 只会用 master 中已加载的代码重启 worker，无法发布新代码，因此默认关闭
+    SERVER_PRELOAD = os.getenv("SERVER_PRELOAD", "0") == "1"
+    SERVER_KEEPALIVE = int(os.getenv("SERVER_KEEPALIVE", "5"))
+    SERVER_TIMEOUT = int(os.getenv("SERVER_TIMEOUT", "30"))
+    SERVER_GRACEFUL_TIMEOUT = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))
+    SERVER_MAX_REQUESTS = int(os.getenv("SERVER_MAX_REQUESTS", "10000"))
+    SERVER_MAX_REQUESTS_JITTER = int(os.getenv("SERVER_MAX_REQUESTS_JITTER", "1000"))
+    SERVER_PIDFILE = os.getenv("SERVER_PIDFILE", "gunicorn.pid")
+    SERVER_ACCESS_LOG = os.getenv("SERVER_ACCESS_LOG") or None
+
+
+config_by_name = {
+    "development": DevelopmentConfig,
+    "testing": TestingConfig,
+    "production": ProductionConfig,
+}
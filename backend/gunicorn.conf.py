@@ -0,0 +1,53 @@
+"""
+gunicorn 生产服务配置
+
+所有参数取自 ProductionConfig（可通过同名环境变量覆盖）：
+    make serve     启动服务
+    make reload    平滑重载（向 master 发送 HUP，新 worker 重新导入代码，旧 worker 处理完请求后退出）
+
+开启 SERVER_PRELOAD 后，HUP 只会用 master 中已加载的代码重启 worker，发布新代码需要重启服务
+（或向 master 发送 USR2 启动新的 master，确认正常后向旧 master 发送 QUIT）。
+"""
+
+from config import ProductionConfig as _config
+
+bind = _config.SERVER_BIND
+workers = _config.SERVER_WORKERS
+worker_class = "gthread" if _config.SERVER_THREADS > 1 else "sync"
+threads = _config.SERVER_THREADS
+backlog = _config.SERVER_BACKLOG
+
+# 预加载应用：导入和创建应用只在 master 中执行一次，worker 通过 fork 共享内存页。
+# 默认关闭，保证 make reload 能发布新代码
+preload_app = _config.SERVER_PRELOAD
+
+keepalive = _config.SERVER_KEEPALIVE
+timeout = _config.SERVER_TIMEOUT
+graceful_timeout = _config.SERVER_GRACEFUL_TIMEOUT
+
+# 定期回收 worker，防止内存缓慢增长；加抖动避免所有 worker 同时重启
+max_requests = _config.SERVER_MAX_REQUESTS
+max_requests_jitter = _config.SERVER_MAX_REQUESTS_JITTER
+
+pidfile = _config.SERVER_PIDFILE
+accesslog = _config.SERVER_ACCESS_LOG
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # preload 时 master 可能已创建数据库连接池，fork 后的连接不能跨进程共用
+    # 密码哈希进程池是延迟创建的，每个 worker 首次使用时各自创建
+    from app.model import db
+
+    app = worker.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def worker_exit(server, worker):
+    # 写出尚未落库的登录时间，关闭缩略图进程池
+    from app.service.activity_service import login_activity
+    from app.service.avatar_service import avatar_service
+
+    login_activity.shutdown()
+    avatar_service.shutdown()
@@ -0,0 +1,98 @@
+"""初始数据库结构（引入迁移前由 db.create_all() 建立的表）
+
+迁移引入之前数据库由 db.create_all() 建立，这里只创建缺失的表，
+已有数据库可以直接升级，无需先执行 stamp。
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _existing_tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    existing = _existing_tables()
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False, comment='用户ID'),
+            sa.Column('username', sa.String(length=50), nullable=False, comment='用户名'),
+            sa.Column('nickname', sa.String(length=100), nullable=False, comment='用户昵称'),
+            sa.Column('email', sa.String(length=255), nullable=False, comment='邮箱地址'),
+            sa.Column('password', sa.String(length=255), nullable=False, comment='密码哈希'),
+            sa.Column('avatar', sa.String(length=500), nullable=True, comment='头像路径'),
+            sa.Column('permission', sa.Integer(), nullable=False, comment='权限等级'),
+            sa.Column('is_active', sa.Boolean(), nullable=False, comment='是否激活'),
+            sa.Column('is_verified', sa.Boolean(), nullable=False, comment='是否已验证邮箱'),
+            sa.Column('created_at', sa.DateTime(), nullable=False, comment='创建时间'),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, comment='更新时间'),
+            sa.Column('last_login_at', sa.DateTime(), nullable=True, comment='最后登录时间'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username'),
+        )
+
+    if 'revoked_tokens' not in existing:
+        op.create_table(
+            'revoked_tokens',
+            sa.Column('jti', sa.String(length=36), nullable=False, comment='令牌唯一标识'),
+            sa.Column('user_id', sa.Integer(), nullable=True, comment='用户ID'),
+            sa.Column('revoked_at', sa.DateTime(), nullable=False, comment='吊销时间'),
+            sa.Column('expires_at', sa.DateTime(), nullable=False, comment='令牌过期时间'),
+            sa.PrimaryKeyConstraint('jti'),
+        )
+        op.create_index('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'])
+        op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'])
+
+    if 'user_sessions' not in existing:
+        op.create_table(
+            'user_sessions',
+            sa.Column('id', sa.Integer(), nullable=False, comment='会话记录ID'),
+            sa.Column('family_id', sa.String(length=36), nullable=False, comment='令牌家族ID'),
+            sa.Column('user_id', sa.Integer(), nullable=False, comment='用户ID'),
+            sa.Column('jti', sa.String(length=36), nullable=False, comment='刷新令牌唯一标识'),
+            sa.Column('replaced_by', sa.String(length=36), nullable=True, comment='轮换后的新令牌jti'),
+            sa.Column('revoked', sa.Boolean(), nullable=False, comment='是否已吊销'),
+            sa.Column('created_at', sa.DateTime(), nullable=False, comment='创建时间'),
+            sa.Column('expires_at', sa.DateTime(), nullable=False, comment='过期时间'),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('jti'),
+        )
+        op.create_index('ix_user_sessions_family_id', 'user_sessions', ['family_id'])
+        op.create_index('ix_user_sessions_user_id', 'user_sessions', ['user_id'])
+
+    if 'posts' not in existing:
+        op.create_table(
+            'posts',
+            sa.Column('id', sa.Integer(), nullable=False, comment='帖子ID'),
+            sa.Column('author_id', sa.Integer(), nullable=False, comment='作者用户ID'),
+            sa.Column('content', sa.Text(), nullable=False, comment='帖子内容'),
+            sa.Column('created_at', sa.DateTime(), nullable=False, comment='创建时间'),
+            sa.Column('updated_at', sa.DateTime(), nullable=False, comment='更新时间'),
+            sa.ForeignKeyConstraint(['author_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_posts_author_id_created_at', 'posts', ['author_id', 'created_at'])
+        op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'])
+
+
+def downgrade():
+    op.drop_table('posts')
+    op.drop_table('user_sessions')
+    op.drop_table('revoked_tokens')
+    op.drop_table('users')
@@ -0,0 +1,41 @@
+"""users 表按实际访问路径补充索引
+
+- 管理员列表按注册时间 / 最近登录时间排序：(created_at, id)、(last_login_at, id)
+- 管理员列表按状态 / 权限筛选后按ID分页：(is_active, id)、(permission, id)
+- 不区分大小写的用户名 / 邮箱查找：lower(username)、lower(email) 唯一函数索引
+
+升级前需确认没有仅大小写不同的重复用户名或邮箱，否则唯一索引创建失败：
+    SELECT lower(email), count(*) FROM users GROUP BY 1 HAVING count(*) > 1;
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+    op.create_index('ix_users_last_login_at_id', 'users', ['last_login_at', 'id'])
+    op.create_index('ix_users_is_active_id', 'users', ['is_active', 'id'])
+    op.create_index('ix_users_permission_id', 'users', ['permission', 'id'])
+    op.create_index('ix_users_username_lower', 'users', [sa.text('lower(username)')], unique=True)
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_users_email_lower', table_name='users')
+    op.drop_index('ix_users_username_lower', table_name='users')
+    op.drop_index('ix_users_permission_id', table_name='users')
+    op.drop_index('ix_users_is_active_id', table_name='users')
+    op.drop_index('ix_users_last_login_at_id', table_name='users')
+    op.drop_index('ix_users_created_at_id', table_name='users')
@@ -0,0 +1,49 @@
+import pytest
+
+from app import create_app
+from app.cli import create_schema, seed_admin
+from app.model import db
+from app.utils.query_audit import query_auditor
+from config import TestingConfig
+
+
+@pytest.fixture
+def app():
+  app = create_app(TestingConfig)
+  with app.app_context():
+    create_schema()
+  yield app
+  with app.app_context():
+    db.session.remove()
+    db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+  return app.test_client()
+
+
+@pytest.fixture
+def admin_login(app, client):
+  """返回登录管理员的函数（按需创建管理员账号），结果为登录接口的 data；可传入其他应用的 test_client"""
+  def login(test_client=None):
+    test_client = test_client or client
+    with test_client.application.app_context():
+      seed_admin()
+    resp = test_client.post("/api/auth/login", json={"username": "admin", "password": "admin123"})
+    return resp.get_json()["data"]
+  return login
+
+
+@pytest.fixture
+def admin_headers(admin_login):
+  """返回登录管理员并生成 Authorization 请求头的函数"""
+  def headers(test_client=None):
+    return {"Authorization": f"Bearer {admin_login(test_client)['token']}"}
+  return headers
+
+
+@pytest.fixture
+def query_audit(app):
+  """返回 query_auditor.audit，用法: with query_audit() as audit: ...; audit.assert_max(2)"""
+  return query_auditor.audit
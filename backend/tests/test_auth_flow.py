@@ -1,20 +1,7 @@
 import json
-import importlib.util
-import os
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-APP_PATH = os.path.abspath(os.path.join(BASE_DIR, '..', 'app.py'))
-spec = importlib.util.spec_from_file_location('app_module', APP_PATH)
-app_module = importlib.util.module_from_spec(spec)
-assert spec and spec.loader
-spec.loader.exec_module(app_module)  # type: ignore
-app = getattr(app_module, 'app')
-from app.model import db
 
 
-def test_register_login_status_validate():
-  with app.app_context():
-    db.create_all()
-  client = app.test_client()
+def test_register_login_status_validate(client):
 
   username = f"testuser_{__import__('random').randint(100000, 999999)}"
   email = f"{username}@example.com"
@@ -68,3 +55,38 @@ def test_register_login_status_validate():
   assert resp.status_code == 200
   assert validate_data["code"] == 200
   assert validate_data["data"]["valid"] is True
+
+
+def test_register_duplicate_reports_field_errors(client):
+  username = f"dupuser_{__import__('random').randint(100000, 999999)}"
+  payload = {
+    "username": username,
+    "nickname": "Dup",
+    "email": f"{username}@example.com",
+    "password": "pass1234"
+  }
+  resp = client.post("/api/auth/register", data=json.dumps(payload), content_type="application/json")
+  assert resp.status_code == 200
+
+  resp = client.post("/api/auth/register", data=json.dumps(payload), content_type="application/json")
+  data = resp.get_json()
+  assert resp.status_code == 400
+  assert set(data["data"]) == {"username", "email"}
+
+
+def test_login_by_username_or_email_ignores_case(app, client, query_audit):
+  payload = {"username": "CaseUser", "nickname": "Case", "email": "Case.User@Example.com", "password": "pass1234"}
+  assert client.post("/api/auth/register", json=payload).status_code == 200
+
+  for identifier in ("CaseUser", "caseuser", " CASEUSER ", "case.user@example.com", "CASE.USER@EXAMPLE.COM"):
+    with query_audit() as audit:
+      resp = client.post("/api/auth/login", json={"username": identifier, "password": "pass1234"})
+    assert resp.status_code == 200, identifier
+    assert resp.get_json()["data"]["user"]["username"] == "CaseUser"
+    # 一次索引点查解析标识，不回退到第二次查询或 OR 条件
+    lookups = [statement for statement in audit.statements if "lower(users." in statement]
+    assert len(lookups) == 1 and " OR " not in lookups[0]
+    audit.assert_no_full_scans()
+
+  resp = client.post("/api/auth/login", json={"username": "case.user@example.org", "password": "pass1234"})
+  assert resp.status_code == 401
@@ -0,0 +1,87 @@
+import io
+import struct
+import zlib
+
+import pytest
+
+from app.service.avatar_service import avatar_service
+
+
+def png_bytes(width=300, height=200):
+  def chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+  rows = b"".join(b"\x00" + bytes((x * 7 + y) % 256 for x in range(width * 3)) for y in range(height))
+  return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+          + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b""))
+
+
+@pytest.fixture
+def auth(app, tmp_path, admin_headers):
+  app.config["AVATAR_STORAGE_DIR"] = str(tmp_path / "avatars")
+  avatar_service.init_app(app)
+  return admin_headers()
+
+
+def test_upload_is_content_addressed_and_deduplicated(client, auth, tmp_path):
+  body = png_bytes()
+  first = client.post("/api/avatars/", data=body, headers={**auth, "Content-Type": "image/png"}).get_json()["data"]
+  second = client.post("/api/avatars/", data={"avatar": (io.BytesIO(body), "a.png")}, headers=auth,
+                       content_type="multipart/form-data").get_json()["data"]
+  assert first["digest"] == second["digest"]
+  originals = [p for p in (tmp_path / "avatars").rglob("*.png") if "_" not in p.name]
+  assert len(originals) == 1
+
+  info = client.get("/api/user/1").get_json()["data"]
+  assert info["avatar"] == first["avatar"] == first["thumbnails"]["128"]
+
+  resp = client.get(first["original"])
+  assert resp.get_data() == body
+  assert "immutable" in resp.headers["Cache-Control"]
+  assert "max-age=31536000" in resp.headers["Cache-Control"]
+  resp.close()
+
+
+def test_upload_rejects_non_images_and_oversized(app, client, auth):
+  resp = client.post("/api/avatars/", data=b"not an image", headers={**auth, "Content-Type": "image/png"})
+  assert resp.status_code == 400
+  avatar_service.max_bytes = 1024
+  resp = client.post("/api/avatars/", data=png_bytes(), headers={**auth, "Content-Type": "image/png"})
+  assert resp.status_code == 413
+  assert client.get("/api/avatars/../config.py").status_code == 404
+
+
+def test_thumbnails_generated(client, auth):
+  pytest.importorskip("PIL")
+  data = client.post("/api/avatars/", data=png_bytes(), headers={**auth, "Content-Type": "image/png"}).get_json()["data"]
+  from PIL import Image
+  resp = client.get(data["thumbnails"]["64"])
+  assert max(Image.open(io.BytesIO(resp.get_data())).size) == 64
+  assert "immutable" in resp.headers["Cache-Control"]
+  resp.close()
+
+
+def test_upload_limits_apply_to_multipart_and_pixels(client, auth):
+  avatar_service.max_bytes = 1024
+  resp = client.post("/api/avatars/", data={"avatar": (io.BytesIO(png_bytes()), "a.png")}, headers=auth,
+                     content_type="multipart/form-data")
+  assert resp.status_code == 413
+
+  pytest.importorskip("PIL")
+  avatar_service.max_bytes = 5 * 1024 * 1024
+  avatar_service.max_pixels = 300 * 200 - 1
+  resp = client.post("/api/avatars/", data=png_bytes(), headers={**auth, "Content-Type": "image/png"})
+  assert resp.status_code == 400
+
+
+def test_missing_thumbnail_falls_back_to_original(client, auth, tmp_path):
+  body = png_bytes()
+  data = client.post("/api/avatars/", data=body, headers={**auth, "Content-Type": "image/png"}).get_json()["data"]
+  for path in (tmp_path / "avatars").rglob("*_64.png"):
+    path.unlink()
+
+  # 不在请求线程中等待或补生成缩略图，直接返回原图并禁止长期缓存
+  resp = client.get(data["thumbnails"]["64"])
+  assert resp.get_data() == body
+  assert "max-age=60" in resp.headers["Cache-Control"]
+  resp.close()
+  assert not list((tmp_path / "avatars").rglob("*_64.png"))
@@ -0,0 +1,29 @@
+from app.cli import seed_admin
+from app.utils.password_hasher import password_hasher
+from benchmarks.bench_api import ADMIN_PASSWORD, PASSWORD, compare, prepare_stage, run_client
+
+
+def test_compare_flags_throughput_latency_and_error_regressions():
+  baseline = {"client/users=10/status/c=1": {"rps": 100.0, "p95": 2.0, "errors": 0}}
+  steady = {"client/users=10/status/c=1": {"rps": 90.0, "p95": 2.4, "errors": 0}}
+  slower = {"client/users=10/status/c=1": {"rps": 60.0, "p95": 3.0, "errors": 2}}
+  unknown = {"client/users=10/login/c=1": {"rps": 1.0, "p95": 999.0, "errors": 0}}
+
+  assert compare(steady, baseline, 0.25) == {}
+  assert compare(unknown, baseline, 0.25) == {}
+  found = compare(slower, baseline, 0.25)["client/users=10/status/c=1"]
+  assert len(found) == 3
+
+
+def test_client_mode_drives_seeded_database(app):
+  with app.app_context():
+    seed_admin(password=ADMIN_PASSWORD)
+    pwhash = password_hasher.hash(PASSWORD)
+  state = prepare_stage(app, 0, 5, pwhash, per_page=2)
+  assert len(state['tokens']) == 5
+
+  for scenario in ("status", "list-deep", "list-cursor", "profile"):
+    result = run_client(app, scenario, state, concurrency=1, duration=0.1)
+    assert result["requests"] > 0
+    assert result["errors"] == 0
+    assert result["p50"] <= result["p95"] <= result["p99"]
@@ -0,0 +1,70 @@
+import json
+
+from app.cli import seed_admin
+from app.model import db
+from app.model.user import User
+from app.utils.password_hasher import password_hasher
+
+
+def test_import_csv_validates_dedups_and_hashes(app, tmp_path):
+  with app.app_context():
+    seed_admin()
+  existing_hash = password_hasher.hash("legacy-pass")
+  path = tmp_path / "users.csv"
+  path.write_text(
+    "username,nickname,email,password,password_hash,permission\n"
+    "alice,Alice,alice@example.com,secret1,,1\n"
+    "bob,,bob@example.com,,%s,2\n"
+    "admin,Dup,other@example.com,secret1,,1\n"
+    "carol,Carol,ALICE@example.com,secret1,,1\n"
+    "x,Bad,bad-email,123,,9\n" % existing_hash,
+    encoding="utf-8",
+  )
+  result = app.test_cli_runner().invoke(args=["users", "import", str(path), "--batch-size", "1", "--workers", "0"])
+  assert result.exit_code == 0, result.output
+  assert "已导入 2 个用户，跳过重复 2 个，失败 1 个" in result.output
+  assert "第 6 行" in result.output
+
+  with app.app_context():
+    alice = User.query.filter_by(username="alice").one()
+    bob = User.query.filter_by(username="bob").one()
+    assert password_hasher.verify(alice.password, "secret1")
+    assert bob.password == existing_hash and bob.nickname == "bob" and bob.permission == 2
+
+
+def test_export_then_import_round_trip(app, tmp_path):
+  with app.app_context():
+    seed_admin()
+    pwhash = password_hasher.hash("secret1")
+    for i in range(5):
+      db.session.add(User(username=f"user{i}", nickname=f"U{i}", email=f"u{i}@example.com", password=pwhash))
+    db.session.commit()
+  runner = app.test_cli_runner()
+  out = tmp_path / "users.jsonl"
+  result = runner.invoke(args=["users", "export", str(out), "--with-password-hash", "--batch-size", "2"])
+  assert "已导出 6 个用户" in result.output
+  rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+  assert [row["username"] for row in rows][:2] == ["admin", "user0"]
+  assert "password_hash" in rows[0]
+
+  result = runner.invoke(args=["users", "import", str(out), "--dry-run", "--workers", "0"])
+  assert "校验通过 0 个用户，跳过重复 6 个，失败 0 个" in result.output
+
+
+def test_import_jsonl_keeps_zero_permission_and_reports_bad_types(app, tmp_path):
+  path = tmp_path / "users.jsonl"
+  rows = [
+    {"username": "restricted", "email": "restricted@example.com", "password": "secret1", "permission": 0},
+    {"username": 123, "email": "num@example.com", "password": "secret1"},
+    {"username": "listy", "email": ["a@example.com"], "password": "secret1", "password_hash": 42},
+    {"username": "later", "email": "later@example.com", "password": "secret1", "permission": None},
+  ]
+  path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+  result = app.test_cli_runner().invoke(args=["users", "import", str(path), "--batch-size", "1", "--workers", "0"])
+  assert result.exit_code == 0, result.output
+  assert "已导入 2 个用户，跳过重复 0 个，失败 2 个" in result.output
+  assert "第 2 行" in result.output and "第 3 行" in result.output
+
+  with app.app_context():
+    assert User.query.filter_by(username="restricted").one().permission == 0
+    assert User.query.filter_by(username="later").one().permission == 1
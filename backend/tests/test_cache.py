@@ -0,0 +1,26 @@
+import time
+
+from app.utils.cache import TTLCache
+
+
+def test_ttl_cache_lru_eviction_and_counters():
+  cache = TTLCache(maxsize=2, ttl=60)
+  cache.set(1, "a")
+  cache.set(2, "b")
+  assert cache.get(1) == "a"
+  cache.set(3, "c")
+  assert cache.get(2) is None
+  assert cache.get(1) == "a" and cache.get(3) == "c"
+  stats = cache.stats()
+  assert stats["hits"] == 3 and stats["misses"] == 1 and stats["size"] == 2
+
+
+def test_ttl_cache_expiry_and_delete():
+  cache = TTLCache(maxsize=10, ttl=0.01)
+  cache.set("k", 1)
+  time.sleep(0.02)
+  assert cache.get("k") is None
+  cache.configure(10, 60)
+  cache.set("k", 1)
+  cache.delete("k")
+  assert cache.get("k") is None
@@ -0,0 +1,57 @@
+import gzip
+import os
+
+from app.utils.compression import compression
+
+
+def test_dynamic_responses_compressed_above_threshold(app, client, admin_headers):
+  headers = admin_headers()
+  small = client.get("/api/user/1", headers={"Accept-Encoding": "gzip"})
+  assert "Content-Encoding" not in small.headers
+  assert "Accept-Encoding" in small.headers["Vary"]
+
+  app.config["COMPRESS_MIN_SIZE"] = 100
+  compression.min_size = 100
+  raw = client.get("/api/user/list?per_page=100", headers=headers)
+  resp = client.get("/api/user/list?per_page=100", headers={**headers, "Accept-Encoding": "gzip"})
+  assert resp.headers["Content-Encoding"] == "gzip"
+  assert gzip.decompress(resp.get_data()) == raw.get_data()
+
+
+def test_large_responses_stream_compressed(app, client, admin_headers):
+  compression.min_size = 100
+  compression.stream_min_size = 200
+  headers = admin_headers()
+  raw = client.get("/api/user/list?per_page=100", headers=headers)
+  resp = client.get("/api/user/list?per_page=100", headers={**headers, "Accept-Encoding": "gzip"})
+  assert resp.is_streamed
+  assert "Content-Length" not in resp.headers
+  assert gzip.decompress(resp.get_data()) == raw.get_data()
+
+
+def test_static_files_precompressed_once(app, client, tmp_path, monkeypatch):
+  static = tmp_path / "static"
+  (static / "avatars").mkdir(parents=True)
+  (static / "avatars" / "a.svg").write_text("<svg>" + "<rect/>" * 500 + "</svg>")
+  (static / "avatars" / "b.jpg").write_bytes(os.urandom(4096))
+  app.static_folder = str(static)
+  compression.cache_dir = str(tmp_path / "cache")
+  calls = []
+  original = compression._compress
+  monkeypatch.setattr(compression, "_compress", lambda *args, **kwargs: calls.append(args[1]) or original(*args, **kwargs))
+
+  resp = client.get("/static/avatars/a.svg", headers={"Accept-Encoding": "gzip"})
+  assert resp.headers["Content-Encoding"] == "gzip"
+  assert gzip.decompress(resp.get_data()).startswith(b"<svg>")
+  cached = tmp_path / "cache" / "avatars" / "a.svg.gz"
+  assert cached.exists()
+  resp.close()
+
+  again = client.get("/static/avatars/a.svg", headers={"Accept-Encoding": "gzip"})
+  again.close()
+  assert calls == ["gzip"]
+
+  jpg = client.get("/static/avatars/b.jpg", headers={"Accept-Encoding": "gzip"})
+  assert "Content-Encoding" not in jpg.headers
+  jpg.close()
+  assert client.get("/static/avatars/missing.svg").status_code == 404
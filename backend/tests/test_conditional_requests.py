@@ -0,0 +1,50 @@
+from sqlalchemy import event
+
+from app.cli import seed_admin
+from app.model import db
+
+
+def test_user_info_etag_and_304_without_queries(app, client):
+  with app.app_context():
+    seed_admin()
+  first = client.get("/api/user/1")
+  etag = first.headers["ETag"]
+  assert first.status_code == 200
+  assert first.headers["Cache-Control"] == "private, no-cache"
+  assert first.headers["Last-Modified"]
+
+  with app.app_context():
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+      resp = client.get("/api/user/1", headers={"If-None-Match": etag})
+    finally:
+      event.remove(db.engine, "before_cursor_execute", listener)
+  assert resp.status_code == 304
+  assert resp.data == b""
+  assert statements == []
+
+  resp = client.get("/api/user/1", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+  assert resp.status_code == 304
+
+
+def test_profile_update_changes_etag(app, client, admin_headers):
+  headers = admin_headers()
+  etag = client.get("/api/user/info", headers=headers).headers["ETag"]
+  assert client.get("/api/user/info", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+  client.put("/api/user/profile", json={"nickname": "Root"}, headers=headers)
+  resp = client.get("/api/user/info", headers={**headers, "If-None-Match": etag})
+  assert resp.status_code == 200
+  assert resp.get_json()["data"]["nickname"] == "Root"
+  assert resp.headers["ETag"] != etag
+
+
+def test_post_list_etag(app, client, admin_headers):
+  headers = admin_headers()
+  client.post("/api/posts/", json={"content": "one"}, headers=headers)
+  etag = client.get("/api/posts/").headers["ETag"]
+  assert client.get("/api/posts/", headers={"If-None-Match": etag}).status_code == 304
+  client.post("/api/posts/", json={"content": "two"}, headers=headers)
+  assert client.get("/api/posts/", headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,28 @@
+from datetime import datetime, UTC
+
+import pytest
+from flask import Flask
+
+from app.utils import json_provider
+from app.utils.json_provider import FastJSONProvider
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_backends_produce_identical_compact_output(monkeypatch, use_orjson):
+  if not use_orjson:
+    monkeypatch.setattr(json_provider, "orjson", None)
+  elif json_provider.orjson is None:
+    pytest.skip("orjson not installed")
+  provider = FastJSONProvider(Flask(__name__))
+  when = datetime(2024, 1, 15, 10, 30, 0, 123456, tzinfo=UTC)
+  body = provider.dumps_bytes({"message": "成功", "at": when, "ids": (1, 2)})
+  assert body == ('{"message":"成功","at":"%s","ids":[1,2]}' % when.isoformat()).encode()
+  assert provider.loads(body)["message"] == "成功"
+
+
+def test_success_uses_fast_provider(app):
+  from app.utils.responses import success
+  with app.app_context():
+    resp, code = success({"n": 1}, "好")
+  assert code == 200
+  assert resp.get_data() == '{"code":200,"message":"好","data":{"n":1}}'.encode()
@@ -0,0 +1,45 @@
+from app.cli import seed_admin
+from app.model import db
+from app.model.user import User
+from app.service.activity_service import login_activity
+
+
+def test_login_defers_last_login_write_until_flush(app, client):
+  with app.app_context():
+    seed_admin()
+    updated_at = db.session.get(User, 1).updated_at
+  login_activity.flush_interval = 3600
+  login_activity.enabled = True
+  try:
+    resp = client.post("/api/auth/login", json={"username": "admin", "password": "admin123"})
+    assert resp.status_code == 200
+    with app.app_context():
+      assert db.session.get(User, 1).last_login_at is None
+      db.session.remove()
+    assert login_activity.flush() == 1
+    with app.app_context():
+      user = db.session.get(User, 1)
+      assert user.last_login_at is not None
+      assert user.updated_at == updated_at
+  finally:
+    login_activity.enabled = False
+
+
+def test_flush_batches_and_coalesces(app):
+  with app.app_context():
+    for i in range(5):
+      db.session.add(User(username=f"user{i}", nickname="n", email=f"user{i}@example.com", password="x"))
+    db.session.commit()
+  login_activity.flush_interval = 3600
+  login_activity.enabled = True
+  login_activity.batch_size = 2
+  try:
+    for user_id in [1, 2, 2, 3, 4, 5]:
+      login_activity.record(user_id)
+    login_activity.flush()
+    assert login_activity.pending() == 0
+    with app.app_context():
+      assert User.query.filter(User.last_login_at.is_(None)).count() == 0
+  finally:
+    login_activity.enabled = False
+    login_activity.batch_size = 500
@@ -0,0 +1,67 @@
+import logging
+import re
+
+from app.cli import seed_admin
+from app.utils.metrics import request_metrics
+
+
+def metric(text, name, **labels):
+  for line in text.splitlines():
+    if line.startswith(name + "{") and all(f'{key}="{value}"' in line for key, value in labels.items()):
+      return float(line.rsplit(" ", 1)[1])
+  return None
+
+
+def test_metrics_endpoint_reports_latency_sql_and_hash(app, client):
+  with app.app_context():
+    seed_admin()
+  client.post("/api/auth/login", json={"username": "admin", "password": "admin123"})
+  client.get("/api/user/1")
+  client.get("/api/user/1")
+  client.get("/no/such/route")
+
+  resp = client.get("/metrics")
+  assert resp.mimetype == "text/plain"
+  text = resp.get_data(as_text=True)
+  assert metric(text, "jufirex_http_request_duration_seconds_count",
+                endpoint="user.get_user_info", method="GET", status="200") == 2
+  assert metric(text, "jufirex_http_request_duration_seconds_count", endpoint="unmatched", status="404") == 1
+  assert metric(text, "jufirex_http_request_db_statements_sum", endpoint="auth.login") >= 1
+  assert metric(text, "jufirex_db_statement_duration_seconds_count", endpoint="auth.login") >= 1
+  assert metric(text, "jufirex_password_hash_duration_seconds_count", operation="verify") == 1
+  assert metric(text, "jufirex_http_request_duration_seconds_bucket",
+                endpoint="user.get_user_info", le="+Inf") == 2
+  assert re.search(r"^jufirex_user_cache_hits\{", text, re.M)
+  assert "endpoint=\"metrics\"" not in text
+
+
+def test_slow_requests_are_logged(app, client, caplog):
+  request_metrics.slow_request_ms = 0.0001
+  with caplog.at_level(logging.WARNING):
+    client.get("/api/hello")
+  assert any("慢请求 GET /api/hello" in record.getMessage() for record in caplog.records)
+  assert metric(client.get("/metrics").get_data(as_text=True), "jufirex_slow_requests_total", endpoint="hello") == 1
+
+
+def test_metrics_endpoint_is_restricted():
+  from app import create_app
+  from config import TestingConfig
+
+  class LockedConfig(TestingConfig):
+    METRICS_REQUIRE_TOKEN = True
+
+  class TokenConfig(LockedConfig):
+    METRICS_TOKEN = "scrape-secret"
+
+  assert create_app(LockedConfig).test_client().get("/metrics").status_code == 404
+
+  client = create_app(TokenConfig).test_client()
+  origin = {"Origin": "https://evil.example"}
+  resp = client.get("/metrics", headers=origin)
+  assert resp.status_code == 401
+  resp = client.get("/metrics", headers={**origin, "Authorization": "Bearer wrong"})
+  assert resp.status_code == 401
+  resp = client.get("/metrics", headers={**origin, "Authorization": "Bearer scrape-secret"})
+  assert resp.status_code == 200 and "jufirex_http_request_duration_seconds" in resp.get_data(as_text=True)
+  assert "Access-Control-Allow-Origin" not in resp.headers
+  assert "Access-Control-Allow-Origin" in client.get("/api/hello", headers=origin).headers
@@ -0,0 +1,69 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.exception.api_exception import ApiException
+from app.utils.password_hasher import PasswordHasher, _method_prefix
+
+
+def make_hasher(**config):
+  hasher = PasswordHasher()
+  hasher.init_app(SimpleNamespace(config={"PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000", **config}))
+  return hasher
+
+
+def test_hash_and_verify_inline():
+  hasher = make_hasher(PASSWORD_HASH_WORKERS=0)
+  pwhash = hasher.hash("pass1234")
+  assert pwhash.startswith("pbkdf2:sha256:1000$")
+  assert hasher.verify(pwhash, "pass1234")
+  assert not hasher.verify(pwhash, "wrong")
+
+
+def test_hash_in_process_pool():
+  hasher = make_hasher(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=1, PASSWORD_HASH_TIMEOUT=30)
+  try:
+    assert hasher.verify(hasher.hash("pass1234"), "pass1234")
+  finally:
+    hasher.shutdown()
+
+
+def test_saturated_pool_fails_fast():
+  hasher = make_hasher(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_MAX_PENDING=0)
+  hasher._slots.acquire()
+  with pytest.raises(ApiException) as exc:
+    hasher.hash("pass1234")
+  assert exc.value.code == 503
+
+
+def test_needs_rehash_on_outdated_parameters():
+  old = make_hasher(PASSWORD_HASH_METHOD="pbkdf2:sha256:500").hash("pass1234")
+  hasher = make_hasher()
+  assert hasher.needs_rehash(old)
+  assert not hasher.needs_rehash(hasher.hash("pass1234"))
+
+
+def test_timed_out_hash_keeps_its_slot_until_finished():
+  hasher = make_hasher(PASSWORD_HASH_METHOD="pbkdf2:sha256:3000000", PASSWORD_HASH_WORKERS=1,
+                       PASSWORD_HASH_MAX_PENDING=0, PASSWORD_HASH_TIMEOUT=0.05)
+  try:
+    for _ in range(6):
+      with pytest.raises(ApiException) as exc:
+        hasher.hash("pass1234")
+      assert exc.value.code == 503
+    # 超时的任务仍在子进程中计算，名额未归还，后续请求直接被拒绝而不是继续排队
+    assert len(hasher._pool._pending_work_items) <= 1
+    deadline = time.monotonic() + 60
+    while not hasher._slots.acquire(blocking=False):
+      assert time.monotonic() < deadline
+      time.sleep(0.05)
+    hasher._slots.release()
+  finally:
+    hasher.shutdown()
+
+
+def test_method_prefix_matches_werkzeug():
+  for method in ("scrypt", "scrypt:1024:8:1", "pbkdf2:sha256:1000", "pbkdf2:sha512:2000"):
+    assert _method_prefix(method) == generate_password_hash("x", method=method).split("$", 1)[0]
@@ -0,0 +1,122 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from app.cli import seed_admin
+from app.model import db
+from app.model.post import Post
+from app.model.user import User
+
+
+def seed_posts(app, count=25):
+  with app.app_context():
+    seed_admin()
+    other = User(username="bob", nickname="Bob", email="bob@example.com", password="x")
+    db.session.add(other)
+    db.session.flush()
+    base = datetime(2024, 1, 1)
+    for i in range(count):
+      # 每两条共用一个时间戳，覆盖同一 created_at 下按 id 排序的分支
+      db.session.add(Post(author_id=1 if i % 2 else other.id, content=f"post {i}",
+                          created_at=base + timedelta(minutes=i // 2)))
+    db.session.commit()
+
+
+def test_feed_cursor_walks_all_posts_in_order(app, client):
+  seed_posts(app)
+  seen, cursor = [], None
+  while True:
+    params = {"per_page": 10}
+    if cursor:
+      params["cursor"] = cursor
+    data = client.get("/api/posts/", query_string=params).get_json()["data"]
+    seen.extend((p["created_at"], p["id"]) for p in data["posts"])
+    cursor = data["pagination"]["next_cursor"]
+    if not cursor:
+      break
+  assert len(seen) == 25
+  assert seen == sorted(seen, reverse=True)
+
+
+def test_feed_loads_authors_in_one_query(app):
+  seed_posts(app)
+  from app.service.post_service import post_service
+  with app.app_context():
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.engine, "before_cursor_execute", listener)
+    try:
+      data = post_service.list_posts(per_page=20)
+    finally:
+      event.remove(db.engine, "before_cursor_execute", listener)
+  assert {p["author"]["username"] for p in data["posts"]} == {"admin", "bob"}
+  assert len([sql for sql in statements if "FROM users" in sql]) == 1
+
+
+def test_create_post_and_filter_by_author(app, client, admin_headers):
+  seed_posts(app, count=4)
+  headers = admin_headers()
+  assert client.post("/api/posts/", json={"content": "  "}, headers=headers).status_code == 400
+  created = client.post("/api/posts/", json={"content": "hello"}, headers=headers).get_json()["data"]
+  assert created["author"]["username"] == "admin"
+
+  data = client.get("/api/posts/", query_string={"author_id": 1}).get_json()["data"]
+  assert [p["author_id"] for p in data["posts"]] == [1, 1, 1]
+  assert data["posts"][0]["id"] == created["id"]
+  assert client.get(f"/api/posts/{created['id']}").get_json()["data"]["content"] == "hello"
+  assert client.get("/api/posts/", query_string={"cursor": "bad"}).status_code == 400
+
+
+def test_feed_cache_fan_out_and_fallback(app, client, admin_headers):
+  from app.service.feed_service import feed_cache
+  app.config["FEED_CACHE_SIZE"] = 10
+  feed_cache.init_app(app)
+  seed_posts(app)
+  first = client.get("/api/posts/", query_string={"per_page": 5}).get_json()["data"]
+  assert feed_cache.stats()["misses"] == 1
+
+  created = client.post("/api/posts/", json={"content": "fresh"}, headers=admin_headers()).get_json()["data"]
+  page = client.get("/api/posts/", query_string={"per_page": 5}).get_json()["data"]
+  assert page["posts"][0]["id"] == created["id"]
+  assert [p["id"] for p in page["posts"][1:]] == [p["id"] for p in first["posts"][:4]]
+  assert feed_cache.stats()["misses"] == 1
+
+  # 翻出缓存窗口后回退到查询分页，结果保持连续；每页条数整除窗口大小时恰好停在窗口开头
+  for per_page in (4, 5):
+    fallbacks = feed_cache.stats()["fallbacks"]
+    seen, cursor = [], None
+    while True:
+      params = {"per_page": per_page}
+      if cursor:
+        params["cursor"] = cursor
+      data = client.get("/api/posts/", query_string=params).get_json()["data"]
+      seen.extend(p["id"] for p in data["posts"])
+      cursor = data["pagination"]["next_cursor"]
+      if not cursor:
+        break
+    assert len(seen) == len(set(seen)) == 26, per_page
+    assert feed_cache.stats()["fallbacks"] > fallbacks
+
+
+def test_feed_cache_keeps_posts_pushed_while_warming(app, monkeypatch):
+  from app.service.feed_service import GLOBAL_FEED, feed_cache
+  feed_cache.init_app(app)
+  seed_posts(app, count=4)
+  with app.app_context():
+    existing = db.session.query(Post.created_at, Post.id).order_by(Post.id.desc()).first()
+  warm = feed_cache._warm
+  late = (datetime(2030, 1, 1), 10_000)
+
+  def warm_then_push(key):
+    # 新帖子的 push 在预热查询之后、替换信息流之前到达；已在快照中的帖子也可能再被 push 一次
+    feed = warm(key)
+    feed_cache.push(1, *late)
+    feed_cache.push(1, *existing)
+    return feed
+
+  monkeypatch.setattr(feed_cache, "_warm", warm_then_push)
+  with app.app_context():
+    ids, _ = feed_cache.page(GLOBAL_FEED, None, 10)
+  assert ids[0] == late[1]
+  assert sorted(ids[1:]) == list(range(1, 5))
+  assert not feed_cache._warming
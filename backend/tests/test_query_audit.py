@@ -0,0 +1,87 @@
+import logging
+
+from app import create_app
+from app.cli import create_schema, seed_admin
+from app.model import db
+from app.model.post import Post
+from app.model.user import User
+from app.service.user_service import user_service
+from app.utils.query_audit import statement_shape
+from config import TestingConfig
+
+
+def seed(app, users=5):
+  with app.app_context():
+    seed_admin()
+    for i in range(users):
+      db.session.add(User(username=f"user{i}", nickname=f"U{i}", email=f"u{i}@example.com", password="x"))
+    db.session.flush()
+    for i in range(20):
+      db.session.add(Post(author_id=1 + i % (users + 1), content=f"post {i}"))
+    db.session.commit()
+
+
+def test_statement_shape_normalises_literals_and_in_lists():
+  assert statement_shape("SELECT * FROM users WHERE id IN (?, ?, ?)") == statement_shape("SELECT * FROM users WHERE id IN (?)")
+  assert statement_shape("SELECT *\n FROM t WHERE a = 'x' LIMIT 10") == "SELECT * FROM t WHERE a = ? LIMIT ?"
+
+
+def test_user_list_and_feed_query_budgets(app, client, query_audit, admin_headers):
+  seed(app)
+  headers = admin_headers()
+  client.get("/api/user/list", headers=headers)
+
+  with query_audit() as audit:
+    client.get("/api/user/list?cursor=&per_page=10", headers=headers)
+  audit.assert_max(2)
+  with query_audit() as audit:
+    client.get("/api/user/list?per_page=10", headers=headers)
+  audit.assert_max(3)
+  audit.assert_no_full_scans()
+
+  with query_audit() as audit:
+    client.get("/api/posts/?per_page=20")
+  audit.assert_max(3)
+  audit.assert_no_n_plus_one()
+  audit.assert_no_full_scans()
+
+
+def test_detects_n_plus_one_and_full_scans(app, query_audit):
+  seed(app)
+  with app.app_context():
+    with query_audit() as audit:
+      for user_id in range(1, 6):
+        user_service.get_user_public_info(user_id)
+      User.query.filter_by(nickname="U1").all()
+  assert len(audit.n_plus_one()) == 1
+  assert list(audit.n_plus_one().values()) == [5]
+  assert any("SCAN users" in plan for plan in audit.full_scans.values())
+
+
+def test_limit_does_not_hide_filtered_scans(app, query_audit):
+  seed(app)
+  with app.app_context():
+    with query_audit() as filtered:
+      User.query.filter(User.avatar == "x").first()
+    with query_audit() as ordered:
+      User.query.order_by(User.id).limit(5).all()
+  assert [plan for plan in filtered.full_scans.values()] == ["SCAN users"]
+  ordered.assert_no_full_scans()
+
+
+def test_request_mode_logs_budget_violations(caplog, admin_headers):
+  class AuditConfig(TestingConfig):
+    QUERY_AUDIT_ENABLED = True
+    QUERY_AUDIT_BUDGETS = {"user.get_users_list": 0}
+
+  app = create_app(AuditConfig)
+  with app.app_context():
+    create_schema()
+  client = app.test_client()
+  headers = admin_headers(client)
+  with caplog.at_level(logging.WARNING):
+    client.get("/api/user/list", headers=headers)
+  assert any("超出预算 0 条" in record.getMessage() for record in caplog.records)
+  with app.app_context():
+    db.session.remove()
+    db.engine.dispose()
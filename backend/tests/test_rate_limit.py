@@ -0,0 +1,37 @@
+import pytest
+from app.cli import seed_admin
+from app.utils.rate_limit import MemoryBackend, parse_rate, rate_limiter
+
+
+def test_parse_rate():
+  assert parse_rate("10/minute") == (10, 60)
+  assert parse_rate("100/hours") == (100, 3600)
+  assert parse_rate("5/30") == (5, 30)
+  with pytest.raises(ValueError):
+    parse_rate("ten/minute")
+
+
+def test_memory_backend_rejects_without_counting():
+  backend = MemoryBackend()
+  results = [backend.hit("k", 3, 3600) for _ in range(5)]
+  assert [allowed for allowed, _, _ in results] == [True, True, True, False, False]
+  assert results[-1][2] >= 1
+  assert backend._windows["k"][1] == 3
+
+
+def test_login_is_throttled_per_account(app, client):
+  app.config["RATE_LIMIT_LOGIN_PER_ACCOUNT"] = "2/minute"
+  rate_limiter.init_app(app)
+  with app.app_context():
+    seed_admin()
+  # 用户名与邮箱指向同一账号，交替使用不能绕过按账号的限制
+  for identifier in ("admin", "admin@jufirex.com"):
+    resp = client.post("/api/auth/login", json={"username": identifier, "password": "wrong"})
+    assert resp.status_code == 401
+  resp = client.post("/api/auth/login", json={"username": "Admin", "password": "admin123"})
+  assert resp.status_code == 429
+  assert int(resp.headers["Retry-After"]) >= 1
+  assert resp.get_json()["data"]["retry_after"] == int(resp.headers["Retry-After"])
+  # 其他账号不受影响
+  resp = client.post("/api/auth/login", json={"username": "nobody", "password": "x"})
+  assert resp.status_code != 429
@@ -0,0 +1,19 @@
+def test_refresh_rotates_and_detects_reuse(app, client, admin_login):
+  login = admin_login()
+  first = login["refresh_token"]
+
+  resp = client.post("/api/auth/refresh", json={"refresh_token": first})
+  assert resp.status_code == 200
+  rotated = resp.get_json()["data"]
+  assert rotated["refresh_token"] != first
+  headers = {"Authorization": f"Bearer {rotated['token']}"}
+  assert client.get("/api/auth/status", headers=headers).status_code == 200
+
+  # 旧刷新令牌再次使用：判定为泄露，整个家族失效
+  assert client.post("/api/auth/refresh", json={"refresh_token": first}).status_code == 401
+  assert client.post("/api/auth/refresh", json={"refresh_token": rotated["refresh_token"]}).status_code == 401
+
+
+def test_refresh_rejects_access_token(app, client, admin_login):
+  login = admin_login()
+  assert client.post("/api/auth/refresh", json={"refresh_token": login["token"]}).status_code == 401
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+from app import create_app
+from app.cli import create_schema, migrate_schema, seed_admin
+from app.model import db
+from app.model.user import User
+from app.utils.query_plans import check_query_plans
+from config import TestingConfig
+
+NEW_INDEXES = ["ix_users_created_at_id", "ix_users_last_login_at_id", "ix_users_is_active_id",
+               "ix_users_permission_id", "ix_users_username_lower", "ix_users_email_lower"]
+
+
+def file_app(path):
+  class FileConfig(TestingConfig):
+    SQLALCHEMY_DATABASE_URI = f"sqlite:///{path}"
+
+  return create_app(FileConfig)
+
+
+def index_names():
+  # Inspector 不反射函数索引，直接读取 sqlite_master
+  rows = db.session.execute(db.text(
+    "SELECT tbl_name, name FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite_%'"
+  ))
+  indexes = {}
+  for table, name in rows:
+    indexes.setdefault(table, []).append(name)
+  return {table: sorted(names) for table, names in indexes.items()}
+
+
+def dispose(app):
+  with app.app_context():
+    db.session.remove()
+    db.engine.dispose()
+
+
+def test_migrations_match_models_and_plans_use_indexes(tmp_path):
+  migrated = file_app(tmp_path / "migrated.db")
+  created = file_app(tmp_path / "created.db")
+  with migrated.app_context():
+    migrate_schema()
+    migrated_indexes = index_names()
+    results = check_query_plans()
+  with created.app_context():
+    create_schema()
+    assert index_names() == migrated_indexes
+  dispose(migrated)
+  dispose(created)
+
+  assert set(NEW_INDEXES) <= set(migrated_indexes["users"])
+  assert [result.name for result in results if not result.ok] == []
+
+
+def test_upgrade_database_created_before_migrations(tmp_path):
+  app = file_app(tmp_path / "legacy.db")
+  with app.app_context():
+    create_schema()
+    seed_admin()
+    for name in NEW_INDEXES:
+      db.session.execute(db.text(f"DROP INDEX {name}"))
+    db.session.execute(db.text("DROP TABLE posts"))
+    db.session.commit()
+
+    migrate_schema()
+    indexes = index_names()
+    assert set(NEW_INDEXES) <= set(indexes["users"])
+    assert indexes["posts"] == ["ix_posts_author_id_created_at", "ix_posts_created_at_id"]
+    assert User.query.filter_by(username="admin").count() == 1
+  dispose(app)
+
+
+def test_username_and_email_are_unique_ignoring_case(client):
+  payload = {"username": "Alice", "nickname": "A", "email": "Alice@Example.com", "password": "pass1234"}
+  assert client.post("/api/auth/register", json=payload).status_code == 200
+
+  resp = client.post("/api/auth/register", json=dict(payload, username="alice", email="alice@example.com"))
+  assert resp.status_code == 400
+  assert set(resp.get_json()["data"]) == {"username", "email"}
+
+
+def test_user_list_filters_and_sorts(app, client, admin_headers):
+  now = datetime(2024, 1, 1)
+  with app.app_context():
+    seed_admin()
+    for i in range(4):
+      db.session.add(User(username=f"user{i}", nickname=f"U{i}", email=f"u{i}@example.com", password="x",
+                          is_active=i != 2, created_at=now + timedelta(days=i),
+                          last_login_at=now + timedelta(days=10 - i) if i else None))
+    db.session.commit()
+  headers = admin_headers()
+
+  def usernames(query):
+    resp = client.get(f"/api/user/list?{query}", headers=headers)
+    assert resp.status_code == 200, resp.get_json()
+    return [user["username"] for user in resp.get_json()["data"]["users"]]
+
+  assert usernames("is_active=0") == ["user2"]
+  assert usernames("permission=3") == ["admin"]
+  assert usernames("sort=created_at&per_page=3")[1:] == ["user3", "user2"]
+  # admin 刚登录排在最前，从未登录的 user0 排在最后
+  assert usernames("sort=last_login_at") == ["admin", "user1", "user2", "user3", "user0"]
+  assert client.get("/api/user/list?cursor=&sort=created_at", headers=headers).status_code == 400
@@ -0,0 +1,61 @@
+from app.service.token_service import token_revocation
+from app.utils.bloom import BloomFilter
+
+
+def test_logout_revokes_token_without_per_request_queries(app, client, admin_login):
+  token = admin_login()["token"]
+  other = admin_login()["token"]
+  headers = {"Authorization": f"Bearer {token}"}
+
+  lookups = token_revocation.db_lookups
+  for _ in range(3):
+    assert client.get("/api/auth/status", headers=headers).status_code == 200
+  assert token_revocation.db_lookups == lookups
+
+  assert client.post("/api/auth/logout", headers=headers).status_code == 200
+  resp = client.get("/api/auth/status", headers=headers)
+  assert resp.status_code == 401
+  assert resp.get_json()["code"] == 401
+
+  resp = client.get("/api/auth/status", headers={"Authorization": f"Bearer {other}"})
+  assert resp.status_code == 200
+
+
+def test_logout_rejects_invalid_token(client):
+  resp = client.post("/api/auth/logout", headers={"Authorization": "Bearer not-a-jwt"})
+  assert resp.status_code == 400
+
+
+def test_bloom_filter_membership():
+  bloom = BloomFilter(capacity=1000, error_rate=0.01)
+  for i in range(1000):
+    bloom.add(f"jti-{i}")
+  assert all(f"jti-{i}" in bloom for i in range(1000))
+  false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+  assert false_positives < 300
+
+
+def test_revocation_check_never_sweeps(app):
+  from datetime import datetime, timedelta, UTC
+  from app.model import db
+  from app.model.token import RevokedToken
+  from app.model.user import User
+
+  with app.app_context():
+    token_revocation.revoke("expired-jti", datetime.now(UTC) - timedelta(hours=1))
+    token_revocation.sweep_interval = 60
+    try:
+      # 吊销检查只负责启动后台清理线程，不在请求线程中执行清理
+      assert not token_revocation.is_revoked("other-jti")
+      assert token_revocation._sweeper.is_alive()
+      assert db.session.get(RevokedToken, "expired-jti") is not None
+    finally:
+      token_revocation.shutdown()
+      token_revocation.sweep_interval = 0
+
+    # 清理使用独立事务，不会提交调用方会话中的修改
+    db.session.add(User(username="pending", nickname="pending", email="pending@example.com", password="x"))
+    assert token_revocation.sweep() == 1
+    db.session.rollback()
+    assert User.query.filter_by(username="pending").first() is None
+    assert db.session.get(RevokedToken, "expired-jti") is None
@@ -0,0 +1,87 @@
+from app.cli import seed_admin
+from app.model import db
+from app.model.user import User
+from app.utils.cursor import encode_cursor
+
+
+def seed(app, users=12):
+  with app.app_context():
+    seed_admin()
+    for i in range(users):
+      db.session.add(User(username=f"user{i}", nickname=f"U{i}", email=f"u{i}@example.com", password="x"))
+    db.session.commit()
+    return User.query.count()
+
+
+def user_list(client, headers, **params):
+  resp = client.get("/api/user/list", headers=headers, query_string=params)
+  return resp.status_code, resp.get_json()
+
+
+def test_cursor_walk_reaches_every_user(app, client, admin_headers):
+  total = seed(app)
+  headers = admin_headers()
+
+  seen, cursor, pages = [], "", 0
+  while cursor is not None:
+    status, body = user_list(client, headers, cursor=cursor, per_page=5)
+    assert status == 200
+    pagination = body["data"]["pagination"]
+    assert pagination["total"] is None
+    seen += [user["id"] for user in body["data"]["users"]]
+    assert pagination["has_more"] == (pagination["next_cursor"] is not None)
+    cursor = pagination["next_cursor"]
+    pages += 1
+
+  assert seen == sorted(set(seen)) and len(seen) == total
+  assert pages == (total + 4) // 5
+  # 最后一页恰好填满时不应再返回下一页游标
+  status, body = user_list(client, headers, cursor=encode_cursor({"id": seen[-6]}), per_page=5)
+  assert body["data"]["pagination"] == {"per_page": 5, "total": None, "has_more": False, "next_cursor": None}
+
+  status, body = user_list(client, headers, after_id=seen[4], per_page=5)
+  assert [user["id"] for user in body["data"]["users"]] == seen[5:10]
+
+
+def test_invalid_cursor_is_rejected(app, client, admin_headers):
+  seed(app)
+  headers = admin_headers()
+  tampered = encode_cursor({"id": 3})[:-2] + "!!"
+  for cursor in ("not-a-cursor", tampered, encode_cursor({"id": "3"}), encode_cursor([3])):
+    status, body = user_list(client, headers, cursor=cursor)
+    assert status == 400 and body["code"] == 400, cursor
+
+  status, body = user_list(client, headers, cursor="", count="bogus")
+  assert status == 400
+  status, body = user_list(client, headers, cursor="", sort="created_at")
+  assert status == 400
+
+
+def test_count_modes(app, client, admin_headers):
+  total = seed(app)
+  headers = admin_headers()
+
+  def count(mode, **params):
+    status, body = user_list(client, headers, cursor="", count=mode, **params)
+    assert status == 200
+    return body["data"]["pagination"]["total"]
+
+  assert count("exact") == total
+  assert count("none") is None
+  assert count("cached") == total
+  assert count("estimate") == total
+
+  with app.app_context():
+    db.session.delete(db.session.get(User, 3))
+    db.session.add(User(username="late", nickname="Late", email="late@example.com", password="x"))
+    db.session.commit()
+
+  assert count("exact") == total
+  # cached 在缓存有效期内返回上次的结果，estimate 用最大ID估算，删除的用户仍计入
+  assert count("cached") == total
+  assert count("estimate") == total + 1
+  assert count("estimate", is_active=1) == count("exact", is_active=1) == total
+
+  status, body = user_list(client, headers, page=1, per_page=5)
+  assert body["data"]["pagination"]["total"] == total
+  assert body["data"]["pagination"]["pages"] == (total + 4) // 5
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+from app.model import db
+from app.model.user import PUBLIC_FIELDS, User
+from app.service.user_service import user_service
+
+
+def seed_user(app):
+  with app.app_context():
+    user = User(username="carol", nickname="Carol", email="carol@example.com", password="secret-hash",
+                avatar="/static/avatars/carol.jpg", permission=2, created_at=datetime(2024, 3, 4, 5, 6, 7, 891011))
+    db.session.add(user)
+    db.session.commit()
+    user_service.invalidate_user(user.id)
+    return user.id, user.to_public_dict()
+
+
+def selects_password(audit):
+  return [statement for statement in audit.statements if "users.password" in statement]
+
+
+def test_public_info_matches_on_projected_and_cached_paths(app, client, query_audit):
+  user_id, expected = seed_user(app)
+  assert expected["created_at"] == "2024-03-04T05:06:07.891011"
+
+  with query_audit() as audit:
+    projected = client.get(f"/api/user/{user_id}").get_json()["data"]
+  assert projected == expected
+  assert not selects_password(audit)
+
+  # 身份缓存中保存的是 to_dict() 的结果（created_at 已是字符串），截取后格式保持一致
+  with app.app_context():
+    user_service.get_user_by_id(user_id)
+  with query_audit() as audit:
+    cached = client.get(f"/api/user/{user_id}").get_json()["data"]
+  assert cached == expected
+  assert not selects_password(audit)
+
+
+def test_user_list_returns_public_fields(app, client, admin_headers, query_audit):
+  user_id, expected = seed_user(app)
+  headers = admin_headers()
+  # 先请求一次，让管理员身份进入缓存，审计中只剩列表本身的查询
+  client.get("/api/user/list", headers=headers)
+  for params in ({"per_page": 100}, {"cursor": "", "per_page": 100}):
+    with query_audit() as audit:
+      users = client.get("/api/user/list", headers=headers, query_string=params).get_json()["data"]["users"]
+    assert all(set(user) == set(PUBLIC_FIELDS) | {"is_active"} for user in users)
+    assert next(user for user in users if user["id"] == user_id) == expected | {"is_active": True}
+    assert not selects_password(audit)
@@ -0,0 +1,47 @@
+from flask import Flask
+
+from app.model import db
+from app.model.user import User
+from app.service.search_service import user_search_index
+from app.service.user_service import user_service
+
+
+def make_app():
+  app = Flask(__name__)
+  app.config.update(SQLALCHEMY_DATABASE_URI="sqlite://")
+  db.init_app(app)
+  with app.app_context():
+    db.create_all()
+    for name, nickname in [("alice", "Wonder"), ("bob", "Builder"), ("alicia", "Keys")]:
+      db.session.add(User(username=name, nickname=nickname, email=f"{name}@example.com", password="x"))
+    db.session.commit()
+  return app
+
+
+def search(term, **kwargs):
+  return [u["username"] for u in user_service.get_users_list(1, 10, term, **kwargs)["users"]]
+
+
+def test_fts_index_built_from_existing_rows_and_kept_in_sync():
+  app = make_app()
+  with app.app_context():
+    assert user_search_index.ensure_schema()
+    assert user_search_index.backend == "fts5"
+    assert search("lic") == ["alice", "alicia"]
+    assert search("BUILD") == ["bob"]
+
+    user = db.session.get(User, 2)
+    user.nickname = "Licorice"
+    db.session.commit()
+    assert search("lic") == ["alice", "bob", "alicia"]
+    assert search("build") == []
+
+
+def test_prefix_short_and_ranked_queries():
+  app = make_app()
+  with app.app_context():
+    user_search_index.ensure_schema()
+    assert search("ali*") == ["alice", "alicia"]
+    assert search("ce*") == []
+    assert search("bo") == ["bob"]
+    assert search("alicia", sort="relevance")[0] == "alicia"
@@ -0,0 +1,10 @@
+"""
+生产环境 WSGI 入口
+
+gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import create_app
+from config import ProductionConfig
+
+app = create_app(ProductionConfig)